@@ -4,13 +4,26 @@ import { motion } from 'framer-motion';
 import { useTheme } from '../../context/ThemeContext';
 import { colors } from '../../utils/theme';
 import { textToSpeechService } from '../../services/tts/textToSpeechService';
-import { preloadImage, getOptimizedImageUrl, isImageCached } from '../../utils/imageLoader';
+import {
+  preloadImage,
+  getOptimizedImageUrl,
+  isImageCached,
+  getAssetInfo,
+  loadAssetManifest,
+  loadImageVariants,
+  getResponsiveImageUrl,
+  loadAtlasManifest,
+  getAtlasSpriteStyle
+} from '../../utils/imageLoader';
 
 interface AnimalCardProps {
   name: string;
   image: string;
   onClick?: () => void;
   speakOnClick?: boolean;
+  // Rendered width of the image in CSS pixels; picks the sprite atlas when its
+  // thumbnails are big enough, otherwise the smallest responsive variant that covers it
+  displayWidth?: number;
 }
 
 const Card = styled(motion.div)<{ $highContrast: boolean }>`
@@ -51,6 +64,22 @@ const AnimalImage = styled(motion.img)<{ $highContrast: boolean }>`
   transition: transform 0.3s ease;
 `;
 
+// Box the sprite is fitted into, the same space the image and loading states take
+const SpriteBox = styled.div`
+  width: 100%;
+  height: 75%;
+  display: flex;
+  align-items: center;
+  justify-content: center;
+`;
+
+const AnimalSprite = styled(motion.div)<{ $highContrast: boolean }>`
+  height: 100%;
+  max-width: 100%;
+  filter: ${props => props.$highContrast ? 'grayscale(1) invert(1) contrast(1000%)' : 'none'};
+  transition: transform 0.3s ease;
+`;
+
 const AnimalName = styled(motion.h3)<{ $highContrast: boolean }>`
   margin: 0;
   font-size: clamp(1rem, 2vh, 1.2rem);
@@ -63,16 +92,25 @@ export const AnimalCard: React.FC<AnimalCardProps> = ({
   name,
   image,
   onClick,
-  speakOnClick = true // Default to true for backward compatibility
+  speakOnClick = true, // Default to true for backward compatibility
+  displayWidth
 }) => {
   const { highContrast } = useTheme();  // Use the getOptimizedImageUrl function from imageLoader utility directly
   // instead of reimplementing the same logic here
   const normalizeImagePath = (path: string): string => {
-    // Use the standardized getOptimizedImageUrl function
-    return getOptimizedImageUrl(path);
+    // Use the standardized getOptimizedImageUrl function, or the variant that fits the card
+    return displayWidth ? getResponsiveImageUrl(path, displayWidth) : getOptimizedImageUrl(path);
   };
   
   const normalizedImagePath = normalizeImagePath(image);
+  // Set once the asset manifest is in, so the blurred placeholder shows up on a first visit too
+  const [assetsReady, setAssetsReady] = useState(() => getAssetInfo(image) !== undefined);
+  // The image is only fetched once the variant list and atlas coordinates are known,
+  // so the card never loads two copies of the same animal
+  const [sourcesReady, setSourcesReady] = useState(!displayWidth);
+  const spriteStyle = sourcesReady && displayWidth ? getAtlasSpriteStyle(image, displayWidth) : null;
+  const hasSprite = spriteStyle !== null;
+  const placeholder = assetsReady ? getAssetInfo(image)?.placeholder : undefined;
   
   // Always start with isLoaded=false to force image loading
   const [isLoaded, setIsLoaded] = useState(false);
@@ -82,6 +120,25 @@ export const AnimalCard: React.FC<AnimalCardProps> = ({
   const [isVisible, setIsVisible] = useState(false);
   const cardRef = React.useRef<HTMLDivElement>(null);
 
+  useEffect(() => {
+    let active = true;
+    loadAssetManifest().then(manifest => {
+      if (active) {
+        setAssetsReady(!!manifest);
+      }
+    });
+    if (displayWidth) {
+      Promise.all([loadImageVariants(), loadAtlasManifest()]).then(() => {
+        if (active) {
+          setSourcesReady(true);
+        }
+      });
+    }
+    return () => {
+      active = false;
+    };
+  }, [displayWidth]);
+
   // Use Intersection Observer for better lazy loading
   useEffect(() => {
     const observer = new IntersectionObserver((entries) => {
@@ -108,8 +165,9 @@ export const AnimalCard: React.FC<AnimalCardProps> = ({
     };
   }, []);  // Load the image only when it becomes visible
   useEffect(() => {
-    // Only load when the image is visible
-    if (!isVisible) {
+    // Only load when the image is visible and its size has been picked;
+    // a sprite comes from the atlas the letter preload already fetched
+    if (!isVisible || !sourcesReady || hasSprite) {
       return;
     }
     
@@ -117,6 +175,7 @@ export const AnimalCard: React.FC<AnimalCardProps> = ({
     // which already includes fallback mechanisms
     preloadImage(normalizedImagePath)
       .then(() => {
+        setImageSrc(normalizedImagePath);
         setIsLoaded(true);
       })
       .catch((err) => {
@@ -138,7 +197,7 @@ export const AnimalCard: React.FC<AnimalCardProps> = ({
             setError(true);
           });
       });
-  }, [normalizedImagePath, isVisible, name]);
+  }, [normalizedImagePath, isVisible, sourcesReady, hasSprite, name]);
   const handleClick = async () => {
     if (speakOnClick) {
       try {
@@ -220,18 +279,40 @@ export const AnimalCard: React.FC<AnimalCardProps> = ({
       tabIndex={0}
       role="button"
       aria-label={`${name} - Click to hear pronunciation`}
-    >{!isLoaded && !error && (
+    >{spriteStyle && (
+        <SpriteBox>
+          <AnimalSprite
+            role="img"
+            aria-label={name}
+            style={spriteStyle}
+            $highContrast={highContrast}
+            animate={{ scale: 1 }}
+            whileHover={{ 
+              scale: 1.1,
+              transition: { duration: 0.2 }
+            }}
+          />
+        </SpriteBox>
+      )}
+      {!spriteStyle && !isLoaded && !error && (
         <div style={{ 
           width: '100%', 
           height: '75%', 
           display: 'flex', 
           alignItems: 'center', 
           justifyContent: 'center',
-          color: highContrast ? colors.highContrast.text : '#ccc'
+          color: highContrast ? colors.highContrast.text : '#ccc',
+          // Blurred placeholder from the asset manifest, when it's loaded
+          ...(placeholder && {
+            backgroundImage: `url(${placeholder})`,
+            backgroundSize: 'contain',
+            backgroundPosition: 'center',
+            backgroundRepeat: 'no-repeat'
+          })
         }}>
-          Loading...
+          {!placeholder && 'Loading...'}
         </div>
-      )}      {(isLoaded || error) && (
+      )}      {!spriteStyle && (isLoaded || error) && (
         <>          {error ? (
             <div style={{
               width: '100%',
@@ -292,6 +292,10 @@ const AnimalContainer = styled(motion.div)`
   }
 `;
 
+// Widest the animal images get inside the current (240px) and next (120px) wrappers
+const CURRENT_ANIMAL_IMAGE_WIDTH = 208;
+const NEXT_ANIMAL_IMAGE_WIDTH = 80;
+
 interface AnimalWrapperProps {
   position: 'current' | 'next';
 }
@@ -582,7 +586,7 @@ export const AlphabetDisplay = () => {
         console.warn('Failed to speak letter:', error);
       });
     }
-    preloadAdjacentLetterImages(currentLetterIndex, alphabet);
+    preloadAdjacentLetterImages(currentLetterIndex, alphabet, CURRENT_ANIMAL_IMAGE_WIDTH);
   }, [currentLetter, isFirstLoad, currentLetterIndex]);
 
   const handleNext = () => {
@@ -793,6 +797,7 @@ export const AlphabetDisplay = () => {
                 <AnimalCard
                   name={animalsForCurrentLetter[currentAnimalIndex].name}
                   image={animalsForCurrentLetter[currentAnimalIndex].fileName}
+                  displayWidth={CURRENT_ANIMAL_IMAGE_WIDTH}
                   onClick={handleAnimalClick}
                 />
               </AnimalWrapper>
@@ -817,6 +822,7 @@ export const AlphabetDisplay = () => {
                     (currentAnimalIndex + 1) % animalsForCurrentLetter.length
                   ].fileName}
                   speakOnClick={false} // Don't speak when clicked in corner position
+                  displayWidth={NEXT_ANIMAL_IMAGE_WIDTH}
                   onClick={handleAnimalClick}
                 />
               </AnimalWrapper>
@@ -8,7 +8,7 @@ import { useTheme } from '../../context/ThemeContext';
 import { colors } from '../../utils/theme';
 import { InteractiveButton } from '../common/InteractiveButton';
 import { soundManager } from '../../utils/sound';
-import { getOptimizedImageUrl } from '../../utils/imageLoader';
+import { getOptimizedImageUrl, getImageLayoutProps, loadAssetManifest, preloadByPriority } from '../../utils/imageLoader';
 
 const Container = styled.div`
   padding: 24px;
@@ -303,6 +303,7 @@ const CategoryBadge = styled.span`
 export const StoryList: React.FC = () => {
   const [selectedStory, setSelectedStory] = useState<Story | null>(null);
   const [selectedAge, setSelectedAge] = useState<number | 'all'>('all');
+  const [, setAssetsReady] = useState(false);
   const { highContrast } = useTheme();
   const allStories = storyService.getAllStories();
   const featuredStories = storyService.getFeaturedStories();
@@ -337,6 +338,13 @@ export const StoryList: React.FC = () => {
     soundManager.loadSound('click', '/sounds/common/click.mp3');
     soundManager.loadSound('tap', '/sounds/common/tap.mp3');
     soundManager.loadSound('success', '/sounds/common/success.mp3');
+    
+    // Re-render with image sizes and placeholders once the manifest is in,
+    // then warm the covers, featured stories first
+    loadAssetManifest().then(manifest => {
+      setAssetsReady(!!manifest);
+      preloadByPriority([...featuredStories, ...allStories].map(story => story.coverImage));
+    });
   }, []);
 
   if (selectedStory) {
@@ -402,6 +410,7 @@ export const StoryList: React.FC = () => {
                 >
                   <FeaturedFlag>Featured</FeaturedFlag>
                   <CoverImage 
+                    {...getImageLayoutProps(story.coverImage)}
                     src={getOptimizedImageUrl(story.coverImage)} 
                     alt={story.title} 
                     $highContrast={highContrast} 
@@ -446,6 +455,7 @@ export const StoryList: React.FC = () => {
               $highContrast={highContrast}
             >
               <CoverImage 
+                {...getImageLayoutProps(story.coverImage)}
                 src={getOptimizedImageUrl(story.coverImage)} 
                 alt={story.title} 
                 $highContrast={highContrast}
@@ -6,7 +6,8 @@ import { InteractiveButton } from '../common/InteractiveButton';
 import { ProgressIndicator } from '../common/ProgressIndicator';
 import { soundManager } from '../../utils/sound';
 import { useScreenReader } from '../../utils/screenReader';
-import { getOptimizedImageUrl } from '../../utils/imageLoader';
+import { getOptimizedImageUrl, getImageLayoutProps } from '../../utils/imageLoader';
+import { prefetchStoryPages } from '../../utils/storyPrefetch';
 import { useTheme } from '../../context/ThemeContext';
 import { colors } from '../../utils/theme';
 import { StoryIcon } from './StoryIcon';
@@ -369,6 +370,12 @@ export const StoryViewer: React.FC<StoryViewerProps> = ({
     }
   }, [currentPageIndex, story, isReading, announce, announceProgress]);
 
+  // Warm the images and sounds of the pages the reader will most likely open next
+  useEffect(() => {
+    if (!story || !story.pages || story.pages.length === 0) return;
+    prefetchStoryPages(story, currentPageIndex);
+  }, [currentPageIndex, story]);
+
   // Effect for initial setup
   useEffect(() => {
     // Skip if no valid story
@@ -619,6 +626,7 @@ export const StoryViewer: React.FC<StoryViewerProps> = ({
             {currentPage && currentPage.image && (
             <StoryImageContainer>
               <StoryImage 
+                {...getImageLayoutProps(currentPage.image)}
                 src={getOptimizedImageUrl(currentPage.image)}
                 alt={`Illustration for page ${currentPageIndex + 1}`}
                 $highContrast={highContrast}
@@ -7,6 +7,50 @@ const IMAGE_CACHE_KEY = 'kids-learn-image-cache';
 const MAX_CACHE_AGE = 7 * 24 * 60 * 60 * 1000; // 7 days in milliseconds
 const DISABLE_CACHE = false; // Image caching is now re-enabled
 
+// Images written to public/images by tools/build_asset_manifest.py
+interface AssetEntry {
+  url: string;
+  hash: string;
+  bytes: number;
+  width: number;
+  height: number;
+  placeholder: string;
+}
+
+interface AssetManifest {
+  version: number;
+  images: Record<string, AssetEntry>;
+}
+
+const ASSET_MANIFEST_URL = '/images/asset-manifest.json';
+// Bytes preloadByPriority fetches ahead of time unless told otherwise
+const DEFAULT_PRELOAD_BUDGET = 1.5 * 1024 * 1024;
+// Assumed size of images the manifest doesn't know about
+const UNKNOWN_IMAGE_BYTES = 100 * 1024;
+let assetManifest: AssetManifest | null = null;
+let assetManifestRequest: Promise<AssetManifest | null> | null = null;
+
+// Content hash of every image loaded before, keyed by manifest URL
+let cachedHashes: Record<string, string> = {};
+// When the hashes were last written or checked against the manifest
+let cacheTimestamp = 0;
+
+/**
+ * Key of an image in the asset manifest: its public URL without PUBLIC_URL or query
+ * @param src Image source URL
+ */
+const manifestKey = (src: string): string => {
+  const publicUrl = process.env.PUBLIC_URL || '';
+  let key = src.split('?')[0];
+  if (publicUrl && key.startsWith(publicUrl)) {
+    key = key.slice(publicUrl.length);
+  }
+  if (key.includes('/animals/') && !key.includes('/images/')) {
+    key = key.replace('/animals/', '/images/animals/');
+  }
+  return key.startsWith('/') ? key : `/${key}`;
+};
+
 // Initialize cache from localStorage if available
 const initializeCache = () => {
   // If caching is disabled, clear localStorage cache and return
@@ -22,19 +66,13 @@ const initializeCache = () => {
   try {
     const cacheData = localStorage.getItem(IMAGE_CACHE_KEY);
     if (cacheData) {
-      const { urls, timestamp } = JSON.parse(cacheData);
-      
-      // Check if cache is still valid (not older than MAX_CACHE_AGE)
-      if (timestamp && Date.now() - timestamp < MAX_CACHE_AGE && Array.isArray(urls)) {
-        // Mark these URLs as "cached" - we don't actually store the image data
-        // but we'll know they've been loaded before
-        urls.forEach(url => {
-          const img = new Image();
-          img.src = url;
-          imageCache[url] = img;
-        });
+      const { hashes, timestamp } = JSON.parse(cacheData);
+      if (hashes && typeof hashes === 'object') {
+        // Only the hashes are kept - validity is checked against the asset manifest
+        cachedHashes = hashes;
+        cacheTimestamp = timestamp || 0;
       } else {
-        // Cache expired, clear it
+        // Entry from before the asset manifest, without hashes
         localStorage.removeItem(IMAGE_CACHE_KEY);
       }
     }
@@ -51,16 +89,126 @@ const updateCachedUrls = () => {
   }
   
   try {
-    const urls = Object.keys(imageCache);
+    cacheTimestamp = Date.now();
     localStorage.setItem(IMAGE_CACHE_KEY, JSON.stringify({
-      urls,
-      timestamp: Date.now()
+      hashes: cachedHashes,
+      timestamp: cacheTimestamp
     }));
   } catch (error) {
     console.warn('Error saving image cache:', error);
   }
 };
 
+/**
+ * Remember that an image finished loading, with the hash it has now
+ * @param src Image source URL
+ * @param img The loaded image
+ */
+const recordLoadedImage = (src: string, img: HTMLImageElement) => {
+  imageCache[src] = img;
+  const key = manifestKey(src);
+  const hash = assetManifest?.images[key]?.hash || '';
+  if (cachedHashes[key] !== hash) {
+    cachedHashes[key] = hash;
+    updateCachedUrls();
+  }
+};
+
+initializeCache();
+
+/**
+ * Load the asset manifest, dropping remembered images whose content has changed
+ * @param manifestUrl URL of the asset-manifest.json file
+ * @returns Promise that resolves to the manifest, or null if it isn't available
+ */
+export const loadAssetManifest = (manifestUrl: string = ASSET_MANIFEST_URL): Promise<AssetManifest | null> => {
+  // Every caller shares one request, so letter preloads don't each fetch it
+  if (!assetManifestRequest) {
+    assetManifestRequest = fetch(getFullImagePath(manifestUrl), { cache: 'no-cache' })
+      .then(response => (response.ok ? response.json() : null))
+      .then((manifest: AssetManifest | null) => {
+        if (!manifest) {
+          return null;
+        }
+        assetManifest = manifest;
+        
+        // A changed hash means the browser's copy is stale; unknown images are forgotten.
+        // Saving also refreshes the timestamp, since the remaining hashes were just confirmed
+        const remembered = Object.entries(cachedHashes);
+        if (remembered.length) {
+          cachedHashes = Object.fromEntries(remembered.filter(([key, hash]) => manifest.images[key]?.hash === hash));
+          updateCachedUrls();
+        }
+        return assetManifest;
+      })
+      .catch(error => {
+        console.warn('Error loading asset manifest:', error);
+        return null;
+      });
+  }
+  return assetManifestRequest;
+};
+
+/**
+ * Get the asset manifest entry of an image
+ * @param src Image source URL
+ * @returns The entry, or undefined if the manifest isn't loaded or doesn't list the image
+ */
+export const getAssetInfo = (src: string): AssetEntry | undefined => {
+  return assetManifest?.images[manifestKey(src)];
+};
+
+/**
+ * Get attributes that reserve an image's layout space and show its blurred
+ * placeholder until the real image has loaded
+ * @param src Image source URL
+ * @returns width/height attributes and a background style, or an empty object if unknown
+ */
+export const getImageLayoutProps = (src: string): {
+  width?: number;
+  height?: number;
+  style?: Record<string, string>;
+} => {
+  const info = getAssetInfo(src);
+  if (!info) {
+    return {};
+  }
+  return {
+    width: info.width,
+    height: info.height,
+    style: {
+      aspectRatio: `${info.width} / ${info.height}`,
+      backgroundImage: `url(${info.placeholder})`,
+      backgroundSize: 'cover',
+      backgroundPosition: 'center'
+    }
+  };
+};
+
+/**
+ * Preload images in priority order until a byte budget is used up
+ * @param urls Image URLs, most important first
+ * @param byteBudget Maximum number of bytes to fetch
+ * @returns Promise that resolves when the chosen images have loaded or failed
+ */
+export const preloadByPriority = async (urls: string[], byteBudget: number = DEFAULT_PRELOAD_BUDGET): Promise<void> => {
+  const chosen: string[] = [];
+  let remaining = byteBudget;
+  for (const url of Array.from(new Set(urls))) {
+    if (isImageCached(url)) {
+      continue;
+    }
+    const bytes = getAssetInfo(url)?.bytes ?? UNKNOWN_IMAGE_BYTES;
+    // The most important image is always loaded, even when it's over budget
+    if (bytes > remaining && chosen.length > 0) {
+      break;
+    }
+    chosen.push(url);
+    remaining -= bytes;
+  }
+  await Promise.allSettled(chosen.map(url => preloadImage(url)));
+};
+
 /**
  * Preloads an image and stores it in cache
  * @param src Image source URL
@@ -71,8 +219,9 @@ export const preloadImage = (src: string): Promise<HTMLImageElement> => {
     // Always load the image directly, ignoring cache completely
     const img = new Image();
     
-    // Correctly process the image path - use a standardized approach
-    let processedSrc = src;
+    // Correctly process the image path - use a standardized approach,
+    // following plain names to content-hashed files
+    let processedSrc = getAssetInfo(src)?.url || src;
     
     // Handle cases where the image path format is inconsistent
     // Step 1: Make sure path has /images/ prefix if needed
@@ -90,6 +239,7 @@ export const preloadImage = (src: string): Promise<HTMLImageElement> => {
     }
     
     img.onload = () => {
+      recordLoadedImage(src, img);
       resolve(img);
     };
     
@@ -137,38 +287,122 @@ export const preloadImage = (src: string): Promise<HTMLImageElement> => {
   });
 };
 
+// Sprite atlases written by tools/build_animal_atlas.py
+interface AtlasSprite {
+  atlas: string;
+  x: number;
+  y: number;
+  width: number;
+  height: number;
+}
+
+interface AtlasManifest {
+  spriteSize: number;
+  atlases: { file: string; width: number; height: number }[];
+  sprites: Record<string, AtlasSprite>;
+}
+
+const ATLAS_MANIFEST_URL = '/images/atlas/animals-atlas.json';
+let atlasManifest: AtlasManifest | null = null;
+let atlasManifestRequest: Promise<AtlasManifest | null> | null = null;
+
+/**
+ * Load the animal sprite atlas manifest
+ * @param manifestUrl URL of the animals-atlas.json file
+ * @returns Promise that resolves to the manifest, or null if it isn't available
+ */
+export const loadAtlasManifest = (manifestUrl: string = ATLAS_MANIFEST_URL): Promise<AtlasManifest | null> => {
+  // Every animal card and letter preload waits on this, so they all share one request
+  if (!atlasManifestRequest) {
+    atlasManifestRequest = fetch(getFullImagePath(manifestUrl))
+      .then(response => (response.ok ? response.json() : null))
+      .then((manifest: AtlasManifest | null) => {
+        atlasManifest = manifest;
+        return atlasManifest;
+      })
+      .catch(error => {
+        console.warn('Error loading sprite atlas manifest:', error);
+        return null;
+      });
+  }
+  return atlasManifestRequest;
+};
+
+/**
+ * Get CSS background styles that show an animal from its sprite atlas.
+ * The background is sized in percentages, so the sprite fills whatever
+ * box it is given; size the element with the returned aspect ratio.
+ * @param src Original image path, e.g. /images/animals/bear.png
+ * @param displaySize Rendered size of the sprite's longest side in CSS pixels
+ * @returns Style properties, or null if the image isn't in an atlas or its sprite has fewer pixels than the slot on this screen
+ */
+export const getAtlasSpriteStyle = (src: string, displaySize: number): Record<string, string> | null => {
+  const sprite = atlasManifest?.sprites[manifestKey(src).toLowerCase()];
+  const atlas = sprite && atlasManifest?.atlases.find(entry => entry.file === sprite.atlas);
+  // Sprites are thumbnails; slots larger in device pixels get the full image instead of a blurry upscale
+  const pixelRatio = typeof window !== 'undefined' ? window.devicePixelRatio || 1 : 1;
+  if (!sprite || !atlas || Math.max(sprite.width, sprite.height) < displaySize * pixelRatio) {
+    return null;
+  }
+  
+  // A percentage position of p% lines up p% of the atlas with p% of the element
+  const position = (offset: number, size: number, total: number) =>
+    (total > size ? (offset / (total - size)) * 100 : 0);
+  return {
+    aspectRatio: `${sprite.width} / ${sprite.height}`,
+    backgroundImage: `url(${getFullImagePath(sprite.atlas)})`,
+    backgroundPosition: `${position(sprite.x, sprite.width, atlas.width)}% ${position(sprite.y, sprite.height, atlas.height)}%`,
+    backgroundSize: `${(atlas.width / sprite.width) * 100}% ${(atlas.height / sprite.height) * 100}%`,
+    backgroundRepeat: 'no-repeat'
+  };
+};
+
 /**
  * Preload images for specific letter
  * @param letter Letter to preload images for
+ * @param displayWidth Rendered width of the images, to preload the responsive variant the cards will use
  * @returns Promise that resolves when all images are loaded
  */
-export const preloadImagesForLetter = async (letter: string): Promise<void> => {
+export const preloadImagesForLetter = async (letter: string, displayWidth?: number): Promise<void> => {
   const images = animalImages[letter.toUpperCase()] || [];
+  // Placeholders and cache hashes come from the asset manifest
+  await Promise.all([loadAssetManifest(), loadAtlasManifest(), displayWidth ? loadImageVariants() : null]);
+  
+  // Animal cards small enough for the atlas show their sprite, so fetch the atlas
+  // files once instead of one image per animal; larger cards load their image when shown
+  const atlases = images.map(animal => atlasManifest?.sprites[manifestKey(animal.fileName).toLowerCase()]?.atlas);
+  if (atlasManifest && atlases.every(Boolean)) {
+    await Promise.allSettled(Array.from(new Set(atlases as string[])).map(atlas => preloadImage(atlas)));
+    return;
+  }
   
-  // Load images in parallel
-  await Promise.allSettled(images.map(animal => preloadImage(animal.fileName)));
+  // Load images in parallel, in the size the cards will ask for
+  await Promise.allSettled(images.map(animal => preloadImage(
+    displayWidth ? getResponsiveImageUrl(animal.fileName, displayWidth) : animal.fileName
+  )));
 };
 
 /**
  * Preload images for current and next letters
  * @param currentLetterIndex Current letter index
  * @param alphabet Array of all letters
+ * @param displayWidth Rendered width of the images (see preloadImagesForLetter)
  */
-export const preloadAdjacentLetterImages = (currentLetterIndex: number, alphabet: string[]): void => {
+export const preloadAdjacentLetterImages = (currentLetterIndex: number, alphabet: string[], displayWidth?: number): void => {
   const currentLetter = alphabet[currentLetterIndex];
   // Load current letter immediately
-  preloadImagesForLetter(currentLetter);
+  preloadImagesForLetter(currentLetter, displayWidth);
   
   // Preload next letter if available
   if (currentLetterIndex < alphabet.length - 1) {
     const nextLetter = alphabet[currentLetterIndex + 1];
-    preloadImagesForLetter(nextLetter);
+    preloadImagesForLetter(nextLetter, displayWidth);
   }
   
   // Preload previous letter if available
   if (currentLetterIndex > 0) {
     const prevLetter = alphabet[currentLetterIndex - 1];
-    preloadImagesForLetter(prevLetter);
+    preloadImagesForLetter(prevLetter, displayWidth);
   }
 };
 
@@ -216,8 +450,8 @@ export const getFullImagePath = (src: string): string => {
  * @returns Optimized image URL
  */
 export const getOptimizedImageUrl = (src: string, width: number = 300): string => {
-  // Process the path directly
-  let processedSrc = src;
+  // Process the path directly, following plain names to content-hashed files
+  let processedSrc = getAssetInfo(src)?.url || src;
   
   // Step 1: Make sure path has /images/ prefix if needed
   if (processedSrc.includes('/animals/') && !processedSrc.includes('/images/')) {
@@ -243,6 +477,68 @@ export const getOptimizedImageUrl = (src: string, width: number = 300): string =
   return processedSrc;
 };
 
+// Responsive variants written by tools/optimize_animal_images.py --sizes
+interface ImageVariant {
+  width: number;
+  height: number;
+  file: string;
+}
+
+interface VariantManifest {
+  defaultSize: number;
+  sizes: number[];
+  images: Record<string, ImageVariant[]>;
+}
+
+const VARIANT_MANIFEST_URL = '/images/animals/variants.json';
+let variantManifest: VariantManifest | null = null;
+let variantManifestRequest: Promise<VariantManifest | null> | null = null;
+
+/**
+ * Load the responsive variant manifest for animal images
+ * @param manifestUrl URL of the variants.json file
+ * @returns Promise that resolves to the manifest, or null if it isn't available
+ */
+export const loadImageVariants = (manifestUrl: string = VARIANT_MANIFEST_URL): Promise<VariantManifest | null> => {
+  // Every animal card waits on this, so they all share one request
+  if (!variantManifestRequest) {
+    variantManifestRequest = fetch(getFullImagePath(manifestUrl))
+      .then(response => (response.ok ? response.json() : null))
+      .then((manifest: VariantManifest | null) => {
+        variantManifest = manifest;
+        return variantManifest;
+      })
+      .catch(error => {
+        console.warn('Error loading image variant manifest:', error);
+        return null;
+      });
+  }
+  return variantManifestRequest;
+};
+
+/**
+ * Get the smallest image variant that covers the rendered width
+ * @param src Original image path, e.g. /images/animals/bear.png
+ * @param displayWidth Rendered width in CSS pixels
+ * @returns URL of the best variant, or the optimized original if no variants are known
+ */
+export const getResponsiveImageUrl = (src: string, displayWidth: number): string => {
+  const fileName = src.split('/').pop() || '';
+  const variants = variantManifest?.images[fileName.replace(/\.[^.]+$/, '').toLowerCase()];
+  if (!variants || variants.length === 0) {
+    return getOptimizedImageUrl(src, displayWidth);
+  }
+  
+  // Account for high-density screens so tablets don't get blurry upscales
+  const pixelRatio = typeof window !== 'undefined' ? window.devicePixelRatio || 1 : 1;
+  const neededWidth = displayWidth * pixelRatio;
+  
+  // Variants are sorted by width; fall back to the largest one
+  const best = variants.find(variant => variant.width >= neededWidth) || variants[variants.length - 1];
+  const directory = src.slice(0, src.length - fileName.length);
+  return getOptimizedImageUrl(`${directory}${best.file}`, displayWidth);
+};
+
 /**
  * Check if an image exists in the cache
  * @param src Image source URL
@@ -253,5 +549,19 @@ export const isImageCached = (src: string): boolean => {
   if (DISABLE_CACHE) {
     return false;
   }
-  return !!imageCache[src];
+  if (imageCache[src]) {
+    return true;
+  }
+  
+  // Loaded in an earlier visit: trust it while its hash matches the manifest,
+  // or, when there is no manifest to check against, for MAX_CACHE_AGE after
+  // the hashes were last saved or confirmed
+  const hash = cachedHashes[manifestKey(src)];
+  if (hash === undefined) {
+    return false;
+  }
+  if (assetManifest) {
+    return assetManifest.images[manifestKey(src)]?.hash === hash;
+  }
+  return Date.now() - cacheTimestamp < MAX_CACHE_AGE;
 };
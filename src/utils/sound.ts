@@ -2,6 +2,7 @@ import { Howl } from 'howler';
 
 class SoundManager {
   private sounds: Map<string, Howl> = new Map();
+  private sources: Map<string, string> = new Map();
 
   constructor() {
     // Preload common sound effects
@@ -24,12 +25,17 @@ class SoundManager {
   }
 
   loadSound(id: string, src: string): void {
+    // Keep a sound that was already loaded (or prefetched) from the same file
+    if (this.sounds.has(id) && this.sources.get(id) === src) {
+      return;
+    }
     const sound = new Howl({
       src: [src],
       html5: true,
       preload: true,
     });
     this.sounds.set(id, sound);
+    this.sources.set(id, src);
   }
 
   play(id: string): void {
@@ -0,0 +1,93 @@
+// Prefetching of the story pages a reader is likely to open next
+import { Story } from '../types/story';
+import { getFullImagePath, preloadByPriority } from './imageLoader';
+import { soundManager } from './sound';
+
+// Branch graph written by tools/build_story_graph.py
+interface PrefetchEntry {
+  page: number;
+  probability: number;
+  steps: number;
+}
+
+interface StoryGraph {
+  depth: number;
+  stories: Record<string, { prefetch: Record<string, PrefetchEntry[]> }>;
+}
+
+const STORY_GRAPH_URL = '/data/story-graph.json';
+const DEFAULT_PREFETCH_COUNT = 2;
+let storyGraph: StoryGraph | null = null;
+let storyGraphRequest: Promise<StoryGraph | null> | null = null;
+
+/**
+ * Load the story branch graph
+ * @param graphUrl URL of the story-graph.json file
+ * @returns Promise that resolves to the graph, or null if it isn't available
+ */
+export const loadStoryGraph = (graphUrl: string = STORY_GRAPH_URL): Promise<StoryGraph | null> => {
+  if (!storyGraphRequest) {
+    storyGraphRequest = fetch(getFullImagePath(graphUrl))
+      .then(response => (response.ok ? response.json() : null))
+      .then(graph => {
+        storyGraph = graph;
+        return storyGraph;
+      })
+      .catch(error => {
+        console.warn('Error loading story graph:', error);
+        return null;
+      });
+  }
+  return storyGraphRequest;
+};
+
+/**
+ * Get the pages most likely to be visited after the given page, best first
+ * @param story Story being read
+ * @param pageIndex Index of the current page
+ * @returns Page indexes; without a graph, the page's choices or the next page
+ */
+export const getLikelyNextPages = (story: Story, pageIndex: number): number[] => {
+  const ranked = storyGraph?.stories[story.id]?.prefetch[String(pageIndex)];
+  if (ranked) {
+    return ranked.map(entry => entry.page);
+  }
+  
+  const page = story.pages[pageIndex];
+  if (page?.choices && page.choices.length > 0) {
+    return page.choices.map(choice => choice.nextPage);
+  }
+  return pageIndex < story.pages.length - 1 ? [pageIndex + 1] : [];
+};
+
+/**
+ * Warm the images and sounds of the pages a reader is likely to open next
+ * @param story Story being read
+ * @param pageIndex Index of the current page
+ * @param count How many of the likeliest pages to prefetch
+ */
+export const prefetchStoryPages = async (
+  story: Story,
+  pageIndex: number,
+  count: number = DEFAULT_PREFETCH_COUNT
+): Promise<void> => {
+  await loadStoryGraph();
+  
+  const pages = getLikelyNextPages(story, pageIndex)
+    .filter(index => index >= 0 && index < story.pages.length)
+    .slice(0, count);
+  
+  pages.forEach(index => {
+    const page = story.pages[index];
+    // Sound ids match the ones StoryViewer plays, so the preloaded sound is reused
+    if (page.soundUrl) {
+      soundManager.loadSound(`page-${index}`, page.soundUrl);
+    }
+  });
+  // Likeliest first, so a tight byte budget drops the least likely pages
+  await preloadByPriority(
+    pages
+      .map(index => story.pages[index].image)
+      .filter((image): image is string => !!image)
+  );
+};
@@ -4,6 +4,7 @@
 param(
     [switch]$CopyExisting = $false,
     [int]$Size = 256,
+    [int]$Jobs = 1,
     [string]$SourceDir = "..\src\resources\images\animals",
     [string]$OutputDir = "..\public\images\animals"
 )
@@ -33,7 +34,7 @@ if (-not $modulesInstalled) {
 }
 
 # Build the command
-$command = "python optimize_animal_images.py --src `"$SourceDir`" --out `"$OutputDir`" --size $Size"
+$command = "python optimize_animal_images.py --src `"$SourceDir`" --out `"$OutputDir`" --size $Size --jobs $Jobs"
 
 if ($CopyExisting) {
     $command += " --copy-existing"
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Batch Reporting for Kids Learn Tools
+
+Shared progress and metrics output for the batch tools, instead of one
+printed line per file:
+1. A progress bar on stderr, redrawn at most every 0.1 seconds and only
+   when stderr is a terminal (so it is cheap even on slow Windows consoles)
+2. Structured JSON-lines events, one per file (file, stage, duration,
+   bytes in/out, error), for dashboards and CI logs (--events)
+3. A throughput summary at the end (files/s and MB in/out)
+
+The tools' own per-file lines are still available with --verbose, and
+errors are always printed.
+
+Used by optimize_animal_images.py, convert_png_to_ico.py,
+generate_story_illustrations.py, story_image_prompt_helper.py and
+story_image_workflow.py.
+"""
+
+import sys
+import json
+import time
+
+# Seconds between progress bar redraws
+REDRAW_INTERVAL = 0.1
+BAR_WIDTH = 24
+
+
+class BatchReporter:
+    """
+    Progress bar, JSON-lines events and throughput summary for one batch.
+
+    Args:
+        tool (str): Name recorded in every event, e.g. "optimize_animal_images"
+        total (int): Number of files expected, for the bar and ETA (optional)
+        events_path (str): JSON-lines file to write events to (optional)
+        verbose (bool): Print each file's own output lines
+        progress (bool): Draw the progress bar (default: when stderr is a terminal)
+    """
+
+    def __init__(self, tool, total=None, events_path=None, verbose=False, progress=None, stream=None):
+        self.tool = tool
+        self.total = total
+        self.verbose = verbose
+        self.stream = stream or sys.stderr
+        self.progress = self.stream.isatty() if progress is None else progress
+        self.events = open(events_path, "a", encoding="utf-8") if events_path else None
+        self.start = time.perf_counter()
+        self.last_draw = 0.0
+        self.bar_length = 0
+        self.done = self.failed = self.skipped = 0
+        self.bytes_in = self.bytes_out = 0
+        self.closed = False
+        self._event("start", total=total)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _event(self, event, **fields):
+        if self.events is not None:
+            record = {"event": event, "tool": self.tool, "time": round(time.time(), 3)}
+            record.update((key, value) for key, value in fields.items() if value is not None)
+            self.events.write(json.dumps(record) + "\n")
+
+    def _clear_bar(self):
+        if self.bar_length:
+            self.stream.write("\r" + " " * self.bar_length + "\r")
+            self.bar_length = 0
+
+    def _draw(self, force=False):
+        now = time.perf_counter()
+        if not self.progress or (not force and now - self.last_draw < REDRAW_INTERVAL):
+            return
+        self.last_draw = now
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        if self.total:
+            filled = min(BAR_WIDTH, BAR_WIDTH * self.done // self.total)
+            line = f"{self.tool} [{'#' * filled}{'-' * (BAR_WIDTH - filled)}] {self.done}/{self.total}"
+            if rate and self.done < self.total:
+                line += f" ETA {(self.total - self.done) / rate:.0f}s"
+        else:
+            line = f"{self.tool} {self.done} files"
+        line += f" {rate:.1f} files/s"
+        if self.failed:
+            line += f" {self.failed} failed"
+        self.stream.write("\r" + line.ljust(self.bar_length))
+        self.stream.flush()
+        self.bar_length = len(line)
+
+    def message(self, text, stream=None):
+        """
+        Print a line (or lines) without breaking the progress bar
+        """
+        text = text.rstrip("\n")
+        if not text:
+            return
+        self._clear_bar()
+        (stream or sys.stdout).write(text + "\n")
+        self._draw(force=True)
+
+    def file(self, file, stage, duration=None, bytes_in=None, bytes_out=None, error=None, output=None):
+        """
+        Record one finished file.
+
+        Args:
+            file (str): File name or path
+            stage (str): What happened, e.g. "optimized", "skipped" or "error"
+            duration (float): Seconds spent on it
+            bytes_in (int): Size of the input
+            bytes_out (int): Total size of the outputs
+            error (str): Error message if it failed
+            output (str): The tool's own lines for this file, shown with verbose
+        """
+        self.done += 1
+        if error:
+            self.failed += 1
+        elif stage == "skipped":
+            self.skipped += 1
+        self.bytes_in += bytes_in or 0
+        self.bytes_out += bytes_out or 0
+        self._event("file", file=str(file), stage=stage,
+                    duration_ms=None if duration is None else round(duration * 1000, 3),
+                    bytes_in=bytes_in, bytes_out=bytes_out, error=error)
+        if self.verbose and output:
+            self.message(output)
+        if error and not (self.verbose and output and error in output):
+            self.message(error if str(file) in error else f"Error: {file}: {error}", sys.stderr)
+        self._draw()
+
+    def summary(self):
+        """
+        Totals and throughput so far
+        """
+        seconds = time.perf_counter() - self.start
+        return {
+            "files": self.done,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "seconds": round(seconds, 3),
+            "files_per_s": round(self.done / seconds, 1) if seconds > 0 else None,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "mb_out_per_s": round(self.bytes_out / (1 << 20) / seconds, 2) if seconds > 0 else None,
+        }
+
+    def close(self):
+        """
+        Finish the bar, print the throughput summary and close the events file
+        """
+        if self.closed:
+            return None
+        self.closed = True
+        summary = self.summary()
+        self._clear_bar()
+        line = (f"{self.tool}: {summary['files']} files in {summary['seconds']:.2f}s"
+                f" ({summary['files_per_s'] or 0:.1f} files/s")
+        if self.bytes_in or self.bytes_out:
+            line += f", {self.bytes_in / (1 << 20):.1f} MB in, {self.bytes_out / (1 << 20):.1f} MB out"
+        line += f"), {self.skipped} skipped, {self.failed} failed"
+        print(line)
+        self._event("summary", **summary)
+        if self.events is not None:
+            self.events.close()
+            self.events = None
+        return summary
+
+
+def add_report_arguments(parser):
+    """
+    Add the shared --verbose/--events/--no-progress options
+    """
+    parser.add_argument("--verbose", action="store_true", help="Print a line for every file")
+    parser.add_argument("--events", default=None,
+                        help="Append JSON-lines events (one per file, plus a summary) to this file")
+    parser.add_argument("--no-progress", action="store_true", help="Don't draw the progress bar")
+
+
+def reporter_from_args(tool, args, total=None):
+    """
+    Build a BatchReporter from the options added by add_report_arguments
+    """
+    return BatchReporter(tool, total, args.events, args.verbose, False if args.no_progress else None)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Reduced-Scale Decode Benchmark for Kids Learn Image Tools
+
+Times optimize_image on large synthetic sources with and without the
+reduced-scale decode fast path (JPEG draft() plus reduce(), see
+optimize_animal_images.load_source_image), and reports:
+1. The median wall time per image
+2. The peak resident memory (RSS) each image adds to a fresh process
+
+Every run happens in its own worker process, so one run's memory
+high-water mark doesn't hide the next one's. Peak RSS is read from /proc
+on Linux, or from psutil or the `resource` module elsewhere; without any of
+them only times are reported.
+
+Usage:
+python benchmark_fast_decode.py
+python benchmark_fast_decode.py --repeat 5 --json fast_decode.json
+
+Requirements:
+- PIL (Pillow) library: pip install Pillow
+"""
+
+import io
+import os
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from PIL import Image
+
+from optimize_animal_images import TARGET_SIZE, optimize_image
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# (name, width, height, format) of the synthetic sources
+FIXTURES = [
+    ("photo-12mp", 4000, 3000, "JPEG"),
+    ("photo-24mp", 6000, 4000, "JPEG"),
+    ("art-12mp", 4000, 3000, "PNG"),
+    # Quantized PNGs decode to palette ("P") images, which reduce() can't take as they are
+    ("palette-4mp", 2048, 2048, "PALETTE"),
+]
+DEFAULT_REPEAT = 3
+
+
+def make_fixture(path, width, height, fmt):
+    """
+    Write a synthetic source image: smooth gradients with noise on top, so
+    it neither compresses to nothing nor decodes unrealistically fast
+    """
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width // 4, height // 4), 40).resize((width, height))
+    img = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.FLIP_LEFT_RIGHT)))
+    if fmt == "PNG":
+        img.putalpha(gradient.point(lambda value: 255 if value > 24 else value * 10))
+        img.save(path, "PNG", compress_level=1)
+    elif fmt == "PALETTE":
+        img.quantize(64).save(path, "PNG", compress_level=1)
+    else:
+        img.save(path, fmt, quality=90)
+
+
+def peak_rss():
+    """
+    Peak resident memory of this process in bytes, or None if unknown
+    """
+    # Linux: VmHWM starts afresh in every new process, unlike ru_maxrss,
+    # which a child inherits from the parent that started it
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    if resource is not None:
+        # macOS reports bytes
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return None
+
+
+def _measure(job):
+    """
+    Run func(*args) once in this (fresh) worker process, returning the wall
+    time and how far it raised the process's memory high-water mark
+    """
+    func, args, kwargs = job
+    # Load Pillow's format plugins up front so the first save isn't charged for them
+    Image.init()
+    before = peak_rss()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        result = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    after = peak_rss()
+    return seconds, None if before is None else after - before, result
+
+
+def measure(func, *args, **kwargs):
+    """
+    Time func(*args, **kwargs) in a new process; returns (seconds, peak RSS
+    growth in bytes or None, result)
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(_measure, (func, args, kwargs)).result()
+
+
+def run_benchmark(work_dir, repeat=DEFAULT_REPEAT, size=TARGET_SIZE):
+    """
+    Benchmark both decode paths on every fixture, returning one result per
+    (fixture, path)
+    """
+    results = []
+    for name, width, height, fmt in FIXTURES:
+        source = Path(work_dir) / f"{name}.{'jpg' if fmt == 'JPEG' else 'png'}"
+        if not source.exists():
+            make_fixture(source, width, height, fmt)
+        for fast_decode in (False, True):
+            output = Path(work_dir) / f"{name}-{'fast' if fast_decode else 'full'}.png"
+            times, peaks = [], []
+            for _ in range(repeat):
+                seconds, peak, ok = measure(optimize_image, source, output, size, fast_decode=fast_decode)
+                if not ok:
+                    raise RuntimeError(f"optimize_image failed on {source}")
+                times.append(seconds)
+                peaks.append(peak)
+            results.append({
+                "fixture": name,
+                "source": f"{width}x{height} {fmt}",
+                "path": "fast" if fast_decode else "full",
+                "median_ms": round(statistics.median(times) * 1000, 1),
+                "peak_rss_mb": None if None in peaks else round(max(peaks) / (1 << 20), 1),
+            })
+    return results
+
+
+def print_results(results):
+    """
+    Print a table of both paths per fixture, with the speed and memory gains
+    """
+    print(f"{'Fixture':<12} {'Source':<18} {'Path':<5} {'Median':>10} {'Peak RSS':>10}")
+    for result in results:
+        rss = "n/a" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.1f} MB"
+        print(f"{result['fixture']:<12} {result['source']:<18} {result['path']:<5} "
+              f"{result['median_ms']:>7.1f} ms {rss:>10}")
+
+    print()
+    for full, fast in zip(results[::2], results[1::2]):
+        line = f"{full['fixture']}: {full['median_ms'] / max(fast['median_ms'], 0.1):.1f}x faster"
+        if full["peak_rss_mb"] and fast["peak_rss_mb"] is not None:
+            line += f", {full['peak_rss_mb'] - fast['peak_rss_mb']:.1f} MB less peak memory"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark optimize_image with and without reduced-scale decoding")
+    parser.add_argument("--repeat", default=DEFAULT_REPEAT, type=int,
+                        help=f"Runs per fixture and path (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--size", default=TARGET_SIZE[0], type=int, help="Target image size (square)")
+    parser.add_argument("--work-dir", default=None, help="Keep fixtures and outputs here instead of a temp dir")
+    parser.add_argument("--json", default=None, help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = args.work_dir or temp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        print(f"Benchmarking {len(FIXTURES)} sources, {args.repeat} runs each...\n")
+        results = run_benchmark(work_dir, args.repeat, (args.size, args.size))
+
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
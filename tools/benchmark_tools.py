@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for Kids Learn Image Tools
+
+Times the hot paths of the Python tools on synthetic fixtures (generated
+into a temp directory, no network or project files needed):
+1. optimize_image and batch_optimize (optimize_animal_images.py)
+2. _create_background for every pattern type, _add_text_to_image and
+   create_page_image (generate_story_illustrations.py)
+3. parse_stories and a cached load_stories (story_data.py)
+
+Each benchmark runs in its own fresh process and reports per-call latency
+(median and p95), throughput and how much it raised the process's peak
+resident memory (see benchmark_fast_decode.peak_rss).
+
+Results can be saved as a JSON baseline. Later runs are compared against
+it, and the script exits with an error when a benchmark's median time or
+peak memory grows past the threshold. Baselines are machine-specific, so
+keep one per machine (or CI runner).
+
+Usage:
+python benchmark_tools.py
+python benchmark_tools.py --save-baseline
+python benchmark_tools.py --filter background --repeat 20
+python benchmark_tools.py --threshold 0.15 --json results.json
+
+Requirements:
+- PIL (Pillow) library: pip install Pillow
+- NumPy (optional): the NumPy background patterns are benchmarked too
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import multiprocessing
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import PIL
+from PIL import Image, ImageDraw
+
+from benchmark_fast_decode import peak_rss
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = SCRIPT_DIR / "benchmark_baseline.json"
+BASELINE_VERSION = 1
+
+# A run fails when a median or peak memory grows by more than this fraction
+DEFAULT_THRESHOLD = 0.25
+# Memory growth below this is noise (allocator pages, lazy imports)
+MEMORY_SLACK_MB = 4.0
+DEFAULT_REPEAT = 10
+
+# Synthetic fixture sizes
+ANIMAL_NAMES = ["bear", "bird", "duck", "fox", "monkey", "pig", "rabbit", "turtle", "wolf", "butterfly"]
+ANIMAL_SOURCE_SIZE = 1024
+STORY_COUNT = 200
+PAGES_PER_STORY = 8
+
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=None):
+    """
+    Register a benchmark. The decorated function gets the fixture directory
+    and returns (call, items per call); call is timed, and the items count
+    gives the throughput (images, stories, ...).
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, repeat)
+        return setup
+    return register
+
+
+def make_animal(path, seed, size=ANIMAL_SOURCE_SIZE):
+    """
+    Write a synthetic animal: overlapping coloured shapes on transparency,
+    like the cut-out animal PNGs
+    """
+    rng = random.Random(seed)
+    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rng.randint(size // 5, size * 4 // 5), rng.randint(size // 5, size * 4 // 5)
+        radius = rng.randint(size // 10, size // 4)
+        color = tuple(rng.randint(0, 255) for _ in range(3)) + (255,)
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color)
+    img.save(path, "PNG")
+
+
+def make_story_source(story_count=STORY_COUNT, pages=PAGES_PER_STORY):
+    """
+    TypeScript source shaped like storyService.ts, with choices, escapes
+    and comments
+    """
+    stories = []
+    for index in range(story_count):
+        page_lines = []
+        for page in range(pages):
+            choices = ""
+            if page == 2:
+                choices = (f",\n        choices: [\n          {{ text: 'Go left', nextPage: 3 }},\n"
+                           f"          {{ text: \"Go right\", nextPage: {pages - 1} }}\n        ]")
+            page_lines.append(
+                f"      {{\n        text: 'Page {page} of story {index}: the animal\\'s day goes on and on, "
+                f"with friends, snacks and a long walk home.',\n"
+                f"        image: '/images/stories/story-{index}-{page}.png'{choices}\n      }}"
+            )
+        stories.append(
+            f"  {{\n    id: 'story-{index}',\n    title: `Story number {index}`,\n"
+            f"    // Synthetic fixture\n    recommendedAge: {3 + index % 5},\n    category: 'animals',\n"
+            f"    coverImage: '/images/stories/story-{index}-cover.png',\n"
+            f"    pages: [\n" + ",\n".join(page_lines) + "\n    ]\n  }"
+        )
+    return ("import { Story } from '../../types/story';\n\n"
+            "const sampleStories: Story[] = [\n" + ",\n".join(stories) + "\n];\n\n"
+            "export const storyService = { getAllStories: () => sampleStories };\n")
+
+
+def make_fixtures(fixture_dir):
+    """
+    Build the project-shaped fixture tree used by every benchmark
+    """
+    fixture_dir = Path(fixture_dir)
+    animals_dir = fixture_dir / "public" / "images" / "animals"
+    sources_dir = fixture_dir / "sources"
+    story_dir = fixture_dir / "src" / "services" / "story"
+    for directory in (animals_dir, sources_dir, story_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+    for seed, name in enumerate(ANIMAL_NAMES):
+        make_animal(sources_dir / f"{name}.png", seed)
+        # The illustration generator uses already optimized 256px animals
+        with Image.open(sources_dir / f"{name}.png") as img:
+            img.resize((256, 256), Image.LANCZOS).save(animals_dir / f"{name}.png")
+    (story_dir / "storyService.ts").write_text(make_story_source(), encoding="utf-8")
+
+
+# --- optimize_animal_images.py ---
+
+@benchmark("optimize_image")
+def bench_optimize_image(fixture_dir):
+    from optimize_animal_images import optimize_image
+    source = Path(fixture_dir) / "sources" / "bear.png"
+    output = Path(fixture_dir) / "out" / "optimize_image" / "bear.png"
+    return lambda: optimize_image(source, output), 1
+
+
+@benchmark("batch_optimize", repeat=3)
+def bench_batch_optimize(fixture_dir):
+    from optimize_animal_images import batch_optimize
+    sources = Path(fixture_dir) / "sources"
+    output = Path(fixture_dir) / "out" / "batch_optimize"
+    # force: every image is re-encoded, as on a clean build
+    return lambda: batch_optimize(sources, output, force=True), len(ANIMAL_NAMES)
+
+
+# --- generate_story_illustrations.py ---
+
+def _generator(fixture_dir):
+    from generate_story_illustrations import StoryIllustrationGenerator
+    return StoryIllustrationGenerator(str(fixture_dir), force=True)
+
+
+def _register_backgrounds():
+    """
+    One benchmark per background pattern, and per renderer for the
+    patterns that have a NumPy version
+    """
+    from generate_story_illustrations import PAGE_HEIGHT, PAGE_WIDTH, PATTERN_TYPES, numpy_backgrounds
+
+    def bench(pattern_type, use_numpy):
+        def setup(fixture_dir):
+            generator = _generator(fixture_dir)
+            generator.use_numpy = use_numpy
+            rng_seed = iter(range(1 << 30))
+
+            def call():
+                random.seed(next(rng_seed))
+                generator._create_background(PAGE_WIDTH, PAGE_HEIGHT, pattern_type=pattern_type)
+            return call, 1
+        return setup
+
+    for pattern_type in PATTERN_TYPES:
+        benchmark(f"background:{pattern_type}")(bench(pattern_type, False))
+        if numpy_backgrounds is not None and pattern_type in ("gradient", "stripes"):
+            benchmark(f"background:{pattern_type}:numpy")(bench(pattern_type, True))
+
+
+_register_backgrounds()
+
+
+@benchmark("add_text_to_image")
+def bench_add_text(fixture_dir):
+    from generate_story_illustrations import PAGE_HEIGHT, PAGE_WIDTH
+    generator = _generator(fixture_dir)
+    random.seed(0)
+    base = generator._create_background(PAGE_WIDTH, PAGE_HEIGHT, pattern_type="circles")
+    text = ("Once upon a time, a little bear went for a long walk in the woods, "
+            "looking for honey and new friends to play with.")
+    return lambda: generator._add_text_to_image(base.copy(), text), 1
+
+
+@benchmark("create_page_image")
+def bench_create_page(fixture_dir):
+    generator = _generator(fixture_dir)
+    pages = iter(range(1 << 30))
+
+    def call():
+        page = next(pages) % PAGES_PER_STORY
+        generator._seed_image("goldilocks", page)
+        generator.create_page_image("goldilocks", page, "The three bears came home and found their porridge gone.")
+    return call, 1
+
+
+# --- story_data.py ---
+
+@benchmark("parse_stories", repeat=5)
+def bench_parse_stories(fixture_dir):
+    from story_data import parse_stories
+    source = (Path(fixture_dir) / "src" / "services" / "story" / "storyService.ts").read_text(encoding="utf-8")
+    return lambda: parse_stories(source), STORY_COUNT
+
+
+@benchmark("load_stories:cached")
+def bench_load_stories(fixture_dir):
+    from story_data import load_stories
+    ts_path = Path(fixture_dir) / "src" / "services" / "story" / "storyService.ts"
+    cache_path = Path(fixture_dir) / "story-cache.json"
+    load_stories(ts_path, cache_path)  # Fill the cache
+    return lambda: load_stories(ts_path, cache_path), STORY_COUNT
+
+
+def _run_one(job):
+    """
+    Run one benchmark in this (fresh) worker process and summarize it
+    """
+    name, fixture_dir, repeat, warmup = job
+    setup, default_repeat = BENCHMARKS[name]
+    repeat = repeat or default_repeat or DEFAULT_REPEAT
+    # Load Pillow's format plugins up front so the first save isn't charged for them
+    Image.init()
+    # The tools print a line per file; keep the report readable
+    with redirect_stdout(io.StringIO()):
+        call, items = setup(fixture_dir)
+        before = peak_rss()
+        for _ in range(warmup):
+            call()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            call()
+            times.append(time.perf_counter() - start)
+        after = peak_rss()
+
+    times.sort()
+    median = statistics.median(times)
+    return {
+        "calls": repeat,
+        "median_ms": round(median * 1000, 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1000, 3),
+        "min_ms": round(times[0] * 1000, 3),
+        "items_per_call": items,
+        "throughput_per_s": round(items / median, 1) if median else None,
+        "peak_rss_mb": None if before is None else round((after - before) / (1 << 20), 1),
+    }
+
+
+def run_suite(names, fixture_dir, repeat=None, warmup=1):
+    """
+    Run the named benchmarks, each in its own spawned process, printing one
+    line per benchmark as it finishes
+    """
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(_run_one, (name, str(fixture_dir), repeat, warmup)).result()
+        results[name] = result
+        rss = "n/a" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.1f} MB"
+        print(f"{name:<28} {result['median_ms']:>10.2f} ms {result['p95_ms']:>10.2f} ms "
+              f"{result['throughput_per_s'] or 0:>10.1f}/s {rss:>10}")
+    return results
+
+
+def environment():
+    """
+    What the numbers depend on besides the code, recorded with baselines
+    """
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "numpy": numpy_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def load_baseline(path):
+    """
+    Load a saved baseline, or None if there is none
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return baseline if baseline.get("version") == BASELINE_VERSION else None
+
+
+def save_baseline(path, results):
+    """
+    Store results as the baseline, keeping entries for benchmarks not run
+    this time (e.g. with --filter)
+    """
+    baseline = load_baseline(path) or {"version": BASELINE_VERSION, "benchmarks": {}}
+    baseline["environment"] = environment()
+    baseline["benchmarks"].update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    List regressions against the baseline, as readable strings
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline["benchmarks"].get(name)
+        if not base:
+            continue
+        if result["median_ms"] > base["median_ms"] * (1 + threshold):
+            regressions.append(f"{name}: median {result['median_ms']:.2f} ms vs {base['median_ms']:.2f} ms "
+                               f"baseline (+{result['median_ms'] / base['median_ms'] - 1:.0%})")
+        if result["peak_rss_mb"] is not None and base.get("peak_rss_mb") is not None \
+                and result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold) + MEMORY_SLACK_MB:
+            regressions.append(f"{name}: peak memory {result['peak_rss_mb']:.1f} MB vs "
+                               f"{base['peak_rss_mb']:.1f} MB baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Kids Learn image tools against a saved baseline")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    parser.add_argument("--repeat", default=None, type=int,
+                        help=f"Timed calls per benchmark (default: {DEFAULT_REPEAT}, fewer for slow ones)")
+    parser.add_argument("--warmup", default=1, type=int, help="Untimed calls before timing (default: 1)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", default=DEFAULT_THRESHOLD, type=float,
+                        help=f"Allowed slowdown or memory growth as a fraction (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--json", default=None, help="Write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    if args.list or not names:
+        print("\n".join(names) if names else f"No benchmark matches {args.filter!r}")
+        sys.exit(0 if names else 1)
+
+    with tempfile.TemporaryDirectory() as fixture_dir:
+        print(f"Building fixtures in {fixture_dir}...")
+        make_fixtures(fixture_dir)
+        print(f"\n{'Benchmark':<28} {'Median':>13} {'p95':>13} {'Throughput':>12} {'Peak RSS':>10}")
+        results = run_suite(names, fixture_dir, args.repeat, args.warmup)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "benchmarks": results}, f, indent=2)
+        print(f"\nResults written to: {args.json}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to: {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    if baseline.get("environment") != environment():
+        print("\nWarning: the baseline was recorded with a different Python, Pillow, NumPy or platform")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressions past {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"\nNo regressions past {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
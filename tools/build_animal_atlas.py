@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Animal Sprite Atlas Builder for Kids Learn App
+
+This script packs the optimized animal images into a few texture atlases by:
+1. Scaling every animal image down to a thumbnail size
+2. Grouping thumbnails per alphabet letter (or into pages under a size budget)
+3. Packing each group with a MaxRects (best short side fit) bin packer
+4. Writing the atlas PNGs plus a JSON manifest of sprite coordinates
+
+The letters screen can then fetch one atlas per letter instead of one
+request per animal.
+
+Usage:
+python build_animal_atlas.py
+python build_animal_atlas.py --group size --max-size 2048
+python build_animal_atlas.py --sprite-size 128 --formats webp
+
+Requirements:
+- PIL (Pillow) library: pip install Pillow
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from pathlib import Path
+from PIL import Image, ImageOps
+
+from image_formats import SizeReport, add_format_arguments, format_path, quality_from_args, save_extra_formats
+
+# Default paths - using absolute paths for clarity
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+ANIMALS_DIR = PROJECT_ROOT / "public" / "images" / "animals"
+ATLAS_DIR = PROJECT_ROOT / "public" / "images" / "atlas"
+IMAGE_MAPPING_PATH = PROJECT_ROOT / "src" / "resources" / "imageMapping.ts"
+ANIMALS_URL = "/images/animals"
+ATLAS_URL = "/images/atlas"
+MANIFEST_NAME = "animals-atlas.json"
+
+SPRITE_SIZE = 128
+MAX_ATLAS_SIZE = 1024
+PADDING = 2
+
+# Responsive variants written by optimize_animal_images.py --sizes (e.g. bear-64.png)
+VARIANT_PATTERN = re.compile(r"-\d+$")
+
+
+class MaxRectsBin:
+    """
+    MaxRects bin packer using the best short side fit heuristic
+
+    Keeps a list of maximal free rectangles. Each placement picks the free
+    rectangle that leaves the smallest leftover on its shorter side, then
+    splits every free rectangle the placement overlaps.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.free_rects = [(0, 0, width, height)]
+
+    def insert(self, width, height):
+        """
+        Place a width x height rectangle, returning its (x, y) or None if it doesn't fit
+        """
+        best = None
+        best_score = None
+        for free_x, free_y, free_w, free_h in self.free_rects:
+            if width <= free_w and height <= free_h:
+                leftover_w = free_w - width
+                leftover_h = free_h - height
+                score = (min(leftover_w, leftover_h), max(leftover_w, leftover_h), free_y, free_x)
+                if best_score is None or score < best_score:
+                    best = (free_x, free_y)
+                    best_score = score
+        if best is None:
+            return None
+        self._split_free_rects((best[0], best[1], width, height))
+        return best
+
+    def _split_free_rects(self, used):
+        used_x, used_y, used_w, used_h = used
+        new_rects = []
+        for rect in self.free_rects:
+            free_x, free_y, free_w, free_h = rect
+            # Keep free rectangles the placement doesn't touch
+            if (used_x >= free_x + free_w or used_x + used_w <= free_x
+                    or used_y >= free_y + free_h or used_y + used_h <= free_y):
+                new_rects.append(rect)
+                continue
+            # Otherwise keep the parts of it left, right, above and below the placement
+            if used_x > free_x:
+                new_rects.append((free_x, free_y, used_x - free_x, free_h))
+            if used_x + used_w < free_x + free_w:
+                new_rects.append((used_x + used_w, free_y, free_x + free_w - used_x - used_w, free_h))
+            if used_y > free_y:
+                new_rects.append((free_x, free_y, free_w, used_y - free_y))
+            if used_y + used_h < free_y + free_h:
+                new_rects.append((free_x, used_y + used_h, free_w, free_y + free_h - used_y - used_h))
+        self.free_rects = _prune_contained(new_rects)
+
+
+def _prune_contained(rects):
+    """
+    Drop duplicate free rectangles and any that lie inside another one
+    """
+    rects = list(dict.fromkeys(rects))
+    pruned = []
+    for i, (x, y, w, h) in enumerate(rects):
+        contained = any(
+            i != j and ox <= x and oy <= y and x + w <= ox + ow and y + h <= oy + oh
+            for j, (ox, oy, ow, oh) in enumerate(rects)
+        )
+        if not contained:
+            pruned.append((x, y, w, h))
+    return pruned
+
+
+def pack_sprites(sprites, max_size=MAX_ATLAS_SIZE, padding=PADDING):
+    """
+    Pack (key, width, height) sprites into as few atlas pages as possible
+
+    Each page starts at the smallest power-of-two width whose square could
+    hold the remaining area and grows up to max_size; sprites that still
+    don't fit spill onto the next page. Pages are trimmed to the placed
+    sprites. Returns a list of (width, height, {key: (x, y, w, h)}).
+    """
+    # Tallest first, then widest, packs tightest with MaxRects
+    remaining = sorted(sprites, key=lambda sprite: (-sprite[2], -sprite[1], sprite[0]))
+    pages = []
+    while remaining:
+        area = sum((w + padding) * (h + padding) for _, w, h in remaining)
+        largest = max(max(w, h) + padding for _, w, h in remaining)
+        if largest > max_size:
+            raise ValueError(f"A sprite of {largest}px doesn't fit in a {max_size}px atlas")
+        side = 64
+        while side < max_size and (side * side < area or side < largest):
+            side *= 2
+        side = min(side, max_size)
+
+        while True:
+            packer = MaxRectsBin(side, side)
+            placed = {}
+            leftover = []
+            for key, w, h in remaining:
+                position = packer.insert(w + padding, h + padding)
+                if position is None:
+                    leftover.append((key, w, h))
+                else:
+                    placed[key] = (position[0], position[1], w, h)
+            if not leftover or side >= max_size:
+                break
+            side = min(side * 2, max_size)
+
+        width = max(x + w + padding for x, y, w, h in placed.values())
+        height = max(y + h + padding for x, y, w, h in placed.values())
+        pages.append((width, height, placed))
+        remaining = leftover
+    return pages
+
+
+def read_letter_mapping(mapping_path=IMAGE_MAPPING_PATH):
+    """
+    Map lower-case image file names to their letter from imageMapping.ts
+    """
+    letters = {}
+    try:
+        with open(mapping_path, "r", encoding="utf-8") as f:
+            content = f.read()
+    except OSError:
+        print(f"Warning: could not read {mapping_path}; grouping by file name", file=sys.stderr)
+        return letters
+    pattern = re.compile(r"fileName:\s*'([^']+)'.*?letter:\s*'([A-Za-z])'", re.DOTALL)
+    for file_name, letter in pattern.findall(content):
+        letters[file_name.split("/")[-1].lower()] = letter.upper()
+    return letters
+
+
+def collect_sprites(animals_dir, sprite_size):
+    """
+    Load every optimized animal PNG (skipping responsive variants) as a thumbnail
+    """
+    sprites = {}
+    for image_path in sorted(Path(animals_dir).glob("*.png")):
+        if VARIANT_PATTERN.search(image_path.stem):
+            continue
+        with Image.open(image_path) as img:
+            thumb = ImageOps.contain(img.convert("RGBA"), (sprite_size, sprite_size), Image.LANCZOS)
+        sprites[image_path.name] = thumb
+    return sprites
+
+
+def group_sprites(sprites, group, letters):
+    """
+    Split sprite names into named groups: one per letter, or a single group
+    that pack_sprites splits into pages by size budget
+    """
+    if group == "size":
+        return {"": sorted(sprites)}
+    groups = {}
+    for name in sorted(sprites):
+        letter = letters.get(name.lower(), name[0].upper())
+        groups.setdefault(letter, []).append(name)
+    return dict(sorted(groups.items()))
+
+
+def atlas_outputs(manifest):
+    """
+    File names of every atlas (and extra format) listed in an atlas manifest
+    """
+    names = set()
+    for atlas in manifest.get("atlases", []):
+        for url in (atlas["file"], *atlas.get("formats", {}).values()):
+            names.add(url.split("/")[-1])
+    return names
+
+
+def build_atlases(animals_dir=ANIMALS_DIR, atlas_dir=ATLAS_DIR, group="letter", sprite_size=SPRITE_SIZE,
+                  max_size=MAX_ATLAS_SIZE, padding=PADDING, formats=None, quality=None,
+                  mapping_path=IMAGE_MAPPING_PATH, size_report=None):
+    """
+    Pack the animal images into atlases and write the coordinates manifest
+
+    With extra formats, a PNG vs. format size comparison is printed;
+    size_report is an optional path for the same data as JSON.
+    """
+    animals_dir = Path(animals_dir)
+    atlas_dir = Path(atlas_dir)
+    if not animals_dir.exists():
+        print(f"Animal image directory not found: {animals_dir}", file=sys.stderr)
+        return False
+
+    sprites = collect_sprites(animals_dir, sprite_size)
+    if not sprites:
+        print(f"No PNG image files found in {animals_dir}")
+        return False
+
+    os.makedirs(atlas_dir, exist_ok=True)
+    manifest_path = atlas_dir / MANIFEST_NAME
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            old_manifest = json.load(f)
+    except (OSError, ValueError):
+        old_manifest = {}
+    letters = read_letter_mapping(mapping_path)
+    manifest = {"version": 1, "spriteSize": sprite_size, "atlases": [], "sprites": {}}
+
+    for group_name, names in group_sprites(sprites, group, letters).items():
+        pages = pack_sprites([(name, *sprites[name].size) for name in names], max_size, padding)
+        for page_index, (width, height, placed) in enumerate(pages):
+            suffix = "-".join(part for part in (group_name, str(page_index) if len(pages) > 1 or not group_name else "")
+                              if part)
+            atlas_name = f"animals-{suffix}.png"
+            atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+            for name, (x, y, w, h) in placed.items():
+                atlas.paste(sprites[name], (x, y))
+                manifest["sprites"][f"{ANIMALS_URL}/{name.lower()}"] = {
+                    "atlas": f"{ATLAS_URL}/{atlas_name}",
+                    "x": x,
+                    "y": y,
+                    "width": w,
+                    "height": h,
+                }
+
+            atlas_path = atlas_dir / atlas_name
+            atlas.save(atlas_path, "PNG", optimize=True)
+            save_extra_formats(atlas, atlas_path, formats or (), quality)
+            manifest["atlases"].append({
+                "file": f"{ATLAS_URL}/{atlas_name}",
+                "group": group_name or None,
+                "width": width,
+                "height": height,
+                "sprites": len(placed),
+                "formats": {fmt: f"{ATLAS_URL}/{format_path(atlas_name, fmt).name}" for fmt in formats or ()},
+            })
+            fill = sum(w * h for _, _, w, h in placed.values()) / (width * height)
+            print(f"Packed {len(placed)} sprites into {atlas_path} ({width}x{height}, {fill:.0%} filled)")
+
+    manifest["sprites"] = dict(sorted(manifest["sprites"].items()))
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Drop atlases the new layout no longer has (e.g. after changing --group or removing animals)
+    for stale_name in sorted(atlas_outputs(old_manifest) - atlas_outputs(manifest)):
+        stale_file = atlas_dir / stale_name
+        if stale_file.exists():
+            stale_file.unlink()
+            print(f"Removed stale atlas: {stale_file}")
+
+    if formats:
+        report = SizeReport(formats)
+        for atlas_entry in manifest["atlases"]:
+            report.add(atlas_dir / Path(atlas_entry["file"]).name)
+        report.print_summary()
+        if size_report:
+            report.write(size_report)
+
+    print(f"\nAtlas build complete: {len(sprites)} sprites in {len(manifest['atlases'])} atlases")
+    print(f"Manifest written to: {manifest_path}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack animal images into sprite atlases for the Kids Learn App")
+    parser.add_argument("--src", default=ANIMALS_DIR, help="Directory with optimized animal images")
+    parser.add_argument("--out", default=ATLAS_DIR, help="Output directory for atlases and manifest")
+    parser.add_argument("--group", choices=["letter", "size"], default="letter",
+                        help="One atlas per alphabet letter, or pages split by --max-size")
+    parser.add_argument("--sprite-size", default=SPRITE_SIZE, type=int,
+                        help="Largest side of each thumbnail in the atlas")
+    parser.add_argument("--max-size", default=MAX_ATLAS_SIZE, type=int, help="Largest atlas width/height")
+    parser.add_argument("--padding", default=PADDING, type=int, help="Transparent gap between sprites")
+    parser.add_argument("--mapping", default=IMAGE_MAPPING_PATH, help="Path to imageMapping.ts")
+    add_format_arguments(parser)
+
+    args = parser.parse_args()
+
+    ok = build_atlases(args.src, args.out, group=args.group, sprite_size=args.sprite_size,
+                       max_size=args.max_size, padding=args.padding, formats=args.formats,
+                       quality=quality_from_args(args), mapping_path=args.mapping, size_report=args.size_report)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Asset Manifest Builder for Kids Learn App
+
+This script indexes every image under public/images into a single
+asset-manifest.json that the app loads at startup. For each image it records:
+1. The URL and a content hash, so the browser cache is invalidated when (and
+   only when) the file changes
+2. The byte size, so preloading can stop at a byte budget
+3. The pixel dimensions, so the layout reserves space before the image arrives
+4. A tiny blurred placeholder (a data URI of about 100-300 bytes)
+
+Images whose hash matches the previous manifest reuse their recorded
+dimensions and placeholder, so only new or changed files are decoded.
+Placeholders already made by optimize_animal_images.py (placeholders.json)
+and generate_story_illustrations.py (illustrations.json) are used as they
+are, so for those images only the header is read.
+Illustrations written with generate_story_illustrations.py --hashed-names are
+also listed under their plain name, pointing at the hashed file.
+
+Usage:
+python build_asset_manifest.py
+python build_asset_manifest.py --placeholder-size 12
+
+Requirements:
+- PIL (Pillow) library: pip install Pillow
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from PIL import Image
+
+from image_formats import PLACEHOLDER_SIZE, placeholder_data_uri
+from optimize_animal_images import file_hash, save_manifest
+
+# Default paths - using absolute paths for clarity
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+PUBLIC_DIR = PROJECT_ROOT / "public"
+IMAGES_DIR = PUBLIC_DIR / "images"
+# Named so it doesn't clash with the asset-manifest.json the React build writes
+ASSET_MANIFEST_PATH = IMAGES_DIR / "asset-manifest.json"
+ILLUSTRATION_MANIFEST_NAME = "illustrations.json"
+PLACEHOLDER_MANIFEST_NAME = "placeholders.json"
+
+ASSET_MANIFEST_VERSION = 1
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".avif", ".gif"}
+# Hex digits of the SHA-256 kept in the manifest
+HASH_LENGTH = 16
+
+
+def load_previous_entries(manifest_path):
+    """
+    Entries of the last manifest, keyed by URL, or {} if there is none
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == ASSET_MANIFEST_VERSION:
+            return manifest.get("images", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def describe_image(path, placeholder_size=PLACEHOLDER_SIZE, placeholder=None):
+    """
+    Pixel dimensions and placeholder of one image; the pixels are only
+    decoded when no placeholder is given
+    """
+    with Image.open(path) as img:
+        width, height = img.size
+        if placeholder:
+            return width, height, placeholder
+        # Decoding at reduced scale is enough for the placeholder (JPEG only)
+        img.draft("RGB", (placeholder_size * 4, placeholder_size * 4))
+        return width, height, placeholder_data_uri(img, placeholder_size)
+
+
+def known_placeholders(images_dir, public_dir):
+    """
+    Placeholders the image tools wrote while encoding, keyed by URL
+    """
+    placeholders = {}
+    for manifest_file in sorted(Path(images_dir).rglob("*.json")):
+        if manifest_file.name not in (PLACEHOLDER_MANIFEST_NAME, ILLUSTRATION_MANIFEST_NAME):
+            continue
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        base = "/" + manifest_file.parent.relative_to(public_dir).as_posix()
+        if manifest_file.name == PLACEHOLDER_MANIFEST_NAME:
+            items = manifest.items()
+        else:
+            items = ((entry.get("file"), entry.get("placeholder")) for entry in manifest.get("entries", {}).values())
+        placeholders.update({f"{base}/{name}": uri for name, uri in items if name and uri})
+    return placeholders
+
+
+def hashed_aliases(illustration_manifest_path, public_dir):
+    """
+    Map plain story illustration URLs to their hashed files, e.g.
+    /images/stories/goldilocks-1.png -> /images/stories/goldilocks-1.3f9a0c1b2d.png
+    """
+    try:
+        with open(illustration_manifest_path, "r", encoding="utf-8") as f:
+            entries = json.load(f).get("entries", {})
+    except (OSError, ValueError):
+        return {}
+    base = "/" + Path(illustration_manifest_path).parent.relative_to(public_dir).as_posix()
+    return {f"{base}/{name}": f"{base}/{entry['file']}" for name, entry in entries.items()
+            if entry.get("file") and entry["file"] != name}
+
+
+def build_asset_manifest(images_dir=IMAGES_DIR, manifest_path=ASSET_MANIFEST_PATH, public_dir=PUBLIC_DIR,
+                         placeholder_size=PLACEHOLDER_SIZE, force=False):
+    """
+    Index every image under images_dir and write the asset manifest
+    """
+    images_dir = Path(images_dir)
+    public_dir = Path(public_dir)
+    if not images_dir.exists():
+        print(f"Image directory not found: {images_dir}", file=sys.stderr)
+        return False
+
+    previous = {} if force else load_previous_entries(manifest_path)
+    # Written at the default size, so only usable when building at that size
+    precomputed = known_placeholders(images_dir, public_dir) if placeholder_size == PLACEHOLDER_SIZE else {}
+    images = {}
+    decoded = 0
+    for path in sorted(images_dir.rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        url = "/" + path.relative_to(public_dir).as_posix()
+        digest = file_hash(path)[:HASH_LENGTH]
+        entry = previous.get(url)
+        if not entry or entry.get("hash") != digest or entry.get("placeholderSize") != placeholder_size:
+            try:
+                width, height, placeholder = describe_image(path, placeholder_size, precomputed.get(url))
+            except OSError as e:
+                print(f"Skipping unreadable image {path}: {e}", file=sys.stderr)
+                continue
+            entry = {"width": width, "height": height, "placeholder": placeholder,
+                     "placeholderSize": placeholder_size}
+            decoded += 1
+        images[url] = {
+            "url": url,
+            "hash": digest,
+            "bytes": path.stat().st_size,
+            "width": entry["width"],
+            "height": entry["height"],
+            "placeholder": entry["placeholder"],
+            "placeholderSize": placeholder_size,
+        }
+
+    # Plain names of hashed illustrations resolve to the hashed file
+    for alias, target in hashed_aliases(images_dir / "stories" / ILLUSTRATION_MANIFEST_NAME, public_dir).items():
+        if target in images:
+            images[alias] = images[target]
+
+    save_manifest(manifest_path, {
+        "version": ASSET_MANIFEST_VERSION,
+        "images": dict(sorted(images.items())),
+    })
+    total = sum(entry["bytes"] for url, entry in images.items() if entry["url"] == url)
+    print(f"Indexed {len(images)} images ({total / 1024:.1f} KB, {decoded} updated, "
+          f"{len(images) - decoded} unchanged)")
+    print(f"Asset manifest written to: {manifest_path}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the image asset manifest for the Kids Learn App")
+    parser.add_argument("--images", default=IMAGES_DIR, help="Directory of images to index")
+    parser.add_argument("--public", default=PUBLIC_DIR, help="Public directory the URLs are relative to")
+    parser.add_argument("--out", default=ASSET_MANIFEST_PATH, help="Output manifest file")
+    parser.add_argument("--placeholder-size", default=PLACEHOLDER_SIZE, type=int,
+                        help=f"Longest side of the placeholder thumbnails (default: {PLACEHOLDER_SIZE})")
+    parser.add_argument("--force", action="store_true", help="Decode every image instead of reusing entries")
+    args = parser.parse_args()
+
+    ok = build_asset_manifest(args.images, args.out, args.public, args.placeholder_size, args.force)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
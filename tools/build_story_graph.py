@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Story Branch Graph Builder for Kids Learn App
+
+Every story in storyService.ts is a small directed graph: a page with
+`choices` leads to each choice's `nextPage`, and any other page leads to the
+page after it (the Next button), except the last page which ends the story.
+
+This script builds that graph for every story and:
+1. Finds pages that can't be reached from the first page
+2. Finds choices whose `nextPage` points outside the story, and stories
+   whose reader can never reach an ending
+3. Computes the shortest path from the first page to every page
+4. Ranks, for every page, the pages a reader is most likely to see within
+   the next few steps (each choice is assumed equally likely)
+
+The rankings are written to public/data/story-graph.json so StoryViewer can
+warm the images and sounds of the next probable pages.
+
+Usage:
+python build_story_graph.py
+python build_story_graph.py --depth 4 --limit 3
+
+Requirements:
+- Python 3
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import deque
+from pathlib import Path
+
+from story_data import STORY_SERVICE_PATH, load_stories
+
+# Default paths - using absolute paths for clarity
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+GRAPH_PATH = PROJECT_ROOT / "public" / "data" / "story-graph.json"
+
+# How many steps ahead to look, and how many pages to keep per page
+PREFETCH_DEPTH = 3
+PREFETCH_LIMIT = 4
+
+
+def story_edges(story):
+    """
+    Adjacency list of a story: page index -> list of next page indexes
+
+    Out-of-range choice targets are kept, so callers can report them.
+    """
+    pages = story.get("pages", [])
+    edges = []
+    for index, page in enumerate(pages):
+        choices = page.get("choices")
+        if choices:
+            edges.append([choice.get("nextPage") for choice in choices])
+        elif index < len(pages) - 1:
+            edges.append([index + 1])
+        else:
+            edges.append([])
+    return edges
+
+
+def dangling_choices(story, edges):
+    """
+    Choices whose nextPage isn't a page of the story, as (page, choice, target)
+    """
+    page_count = len(edges)
+    return [
+        (index, choice_index, target)
+        for index, targets in enumerate(edges)
+        for choice_index, target in enumerate(targets)
+        if not isinstance(target, int) or not 0 <= target < page_count
+    ]
+
+
+def shortest_paths(edges, start=0):
+    """
+    Breadth-first search from start; returns {page: [start, ..., page]}
+    """
+    if not edges:
+        return {}
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        page = queue.popleft()
+        for target in edges[page]:
+            if isinstance(target, int) and 0 <= target < len(edges) and target not in previous:
+                previous[target] = page
+                queue.append(target)
+
+    paths = {}
+    for page in previous:
+        path = []
+        step = page
+        while step is not None:
+            path.append(step)
+            step = previous[step]
+        paths[page] = path[::-1]
+    return dict(sorted(paths.items()))
+
+
+def visit_probabilities(edges, origin, depth=PREFETCH_DEPTH):
+    """
+    Probability of visiting each page within depth steps of origin
+
+    Walks every path of up to depth steps, splitting the probability evenly
+    between a page's exits. Paths are disjoint events, so adding up the first
+    visit of a page along each path gives its total probability. Paths that
+    loop back to a page they already visited (e.g. a "go back" choice) keep
+    going from there, so cycles don't lose probability. Returns
+    {page: (probability, steps to first reach it)}.
+    """
+    page_count = len(edges)
+    reached = {}
+
+    def walk(page, probability, steps, seen):
+        targets = [target for target in edges[page] if isinstance(target, int) and 0 <= target < page_count]
+        if steps == depth or not targets:
+            return
+        share = probability / len(targets)
+        for target in targets:
+            if target not in seen:
+                total, first = reached.get(target, (0.0, steps + 1))
+                reached[target] = (total + share, min(first, steps + 1))
+            walk(target, share, steps + 1, seen | {target})
+
+    walk(origin, 1.0, 0, {origin})
+    return reached
+
+
+def prefetch_order(edges, depth=PREFETCH_DEPTH, limit=PREFETCH_LIMIT):
+    """
+    For every page, the pages most likely to be visited next, best first
+    """
+    order = {}
+    for page in range(len(edges)):
+        reached = visit_probabilities(edges, page, depth)
+        ranked = sorted(reached.items(), key=lambda item: (-item[1][0], item[1][1], item[0]))
+        order[page] = [
+            {"page": target, "probability": round(probability, 4), "steps": steps}
+            for target, (probability, steps) in ranked[:limit]
+        ]
+    return order
+
+
+def analyze_story(story, depth=PREFETCH_DEPTH, limit=PREFETCH_LIMIT):
+    """
+    Build the graph index for one story
+    """
+    edges = story_edges(story)
+    paths = shortest_paths(edges)
+    return {
+        "pages": len(edges),
+        "edges": edges,
+        "endings": [index for index, targets in enumerate(edges) if not targets and index in paths],
+        "unreachable": [index for index in range(len(edges)) if index not in paths],
+        "dangling": [
+            {"page": page, "choice": choice, "nextPage": target}
+            for page, choice, target in dangling_choices(story, edges)
+        ],
+        "shortestPaths": {str(page): path for page, path in paths.items()},
+        "prefetch": {str(page): ranked for page, ranked in prefetch_order(edges, depth, limit).items()},
+    }
+
+
+def build_story_graph(story_path=STORY_SERVICE_PATH, output_path=GRAPH_PATH, depth=PREFETCH_DEPTH,
+                      limit=PREFETCH_LIMIT):
+    """
+    Analyze every story, print a summary of problems and write the graph index
+    """
+    stories = load_stories(story_path)
+    graph = {"version": 1, "depth": depth, "stories": {}}
+    problems = 0
+
+    for story in stories:
+        story_id = story.get("id")
+        if not story_id:
+            continue
+        info = analyze_story(story, depth, limit)
+        graph["stories"][story_id] = info
+
+        deepest = max((len(path) - 1 for path in info["shortestPaths"].values()), default=0)
+        print(f"{story_id}: {info['pages']} pages, {len(info['endings'])} endings, "
+              f"longest shortest path {deepest} steps")
+        for page in info["unreachable"]:
+            print(f"  Unreachable page {page}", file=sys.stderr)
+        for entry in info["dangling"]:
+            print(f"  Page {entry['page']} choice {entry['choice'] + 1} points to missing page {entry['nextPage']}",
+                  file=sys.stderr)
+        if info["pages"] and not info["endings"]:
+            print("  No ending can be reached from the first page", file=sys.stderr)
+            problems += 1
+        problems += len(info["unreachable"]) + len(info["dangling"])
+
+    os.makedirs(Path(output_path).parent, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(graph, f, indent=2)
+
+    print(f"\nStory graph complete: {len(graph['stories'])} stories, {problems} problems found")
+    print(f"Graph index written to: {output_path}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the story branch graph and prefetch order")
+    parser.add_argument("--stories", default=STORY_SERVICE_PATH, help="Path to storyService.ts")
+    parser.add_argument("--out", default=GRAPH_PATH, help="Output JSON file")
+    parser.add_argument("--depth", default=PREFETCH_DEPTH, type=int,
+                        help=f"How many pages ahead to rank (default: {PREFETCH_DEPTH})")
+    parser.add_argument("--limit", default=PREFETCH_LIMIT, type=int,
+                        help=f"Pages to keep in each prefetch list (default: {PREFETCH_LIMIT})")
+    parser.add_argument("--strict", action="store_true",
+                        help="Exit with an error if any problem is found")
+    args = parser.parse_args()
+
+    problems = build_story_graph(args.stories, args.out, args.depth, args.limit)
+    sys.exit(1 if args.strict and problems else 0)
+
+
+if __name__ == "__main__":
+    main()
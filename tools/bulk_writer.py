@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Buffered Bulk Writer for Kids Learn Tools
+
+Collects a tree of generated text files in memory and writes it out in one
+pass at the end, instead of opening and closing a file per output:
+1. Each file is compared with the one on disk by SHA-256 and only written
+   when its contents changed
+2. Changed files are written atomically (temp file, then rename), so an
+   interrupted run never leaves half-written prompts behind
+3. The whole tree can also be packed into one zip or JSON-lines archive
+
+The hashes of the files it wrote are kept in an index next to them, keyed
+on size and mtime, so an unchanged tree is checked with one stat per file
+rather than by reading every file back (which is what makes reruns slow on
+a network share).
+
+Used by story_image_workflow.py.
+"""
+
+import io
+import os
+import json
+import zipfile
+import hashlib
+from contextlib import contextmanager
+from pathlib import Path
+
+INDEX_NAME = ".bulk-writer-index.json"
+INDEX_VERSION = 1
+# Fixed timestamp for archive members, so an unchanged tree packs to the same bytes
+ARCHIVE_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def content_hash(data):
+    """
+    SHA-256 of bytes, as hex
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_atomic(path, data):
+    """
+    Write bytes to path through a temp file and a rename
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class BulkWriter:
+    """
+    In-memory tree of text files under root, written by commit()
+    """
+
+    def __init__(self, root, encoding="utf-8"):
+        self.root = Path(root)
+        self.encoding = encoding
+        # Relative POSIX path -> (bytes, merge function or None), in insertion order
+        self.files = {}
+
+    def add(self, relative_path, text, merge=None):
+        """
+        Queue a file. merge(old_text, new_text), if given, is called when the
+        file on disk differs from text, and returns the text to write instead
+        (e.g. to keep progress ticked by hand).
+        """
+        self.files[Path(relative_path).as_posix()] = (text.encode(self.encoding), merge)
+
+    @contextmanager
+    def open(self, relative_path, merge=None):
+        """
+        File-like buffer that is queued with add() when the block ends
+        """
+        buffer = io.StringIO()
+        yield buffer
+        self.add(relative_path, buffer.getvalue(), merge)
+
+    def path(self, relative_path):
+        """
+        Absolute path a queued file is written to
+        """
+        return self.root / relative_path
+
+    def _load_index(self):
+        try:
+            with open(self.root / INDEX_NAME, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION:
+                return index.get("files", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def commit(self, force=False, reporter=None):
+        """
+        Write every queued file whose contents changed (every file with
+        force), recording each one with reporter (a BatchReporter) if given.
+        Returns (written, unchanged) counts.
+        """
+        previous = {} if force else self._load_index()
+        index = {}
+        made_dirs = set()
+        written = unchanged = 0
+        for name, (data, merge) in self.files.items():
+            path = self.root / name
+            digest = content_hash(data)
+            try:
+                stat = path.stat()
+            except OSError:
+                stat = None
+
+            if stat is not None:
+                entry = previous.get(name)
+                existing = None
+                if entry and entry["bytes"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    # Untouched since the last commit: the recorded hash is current
+                    current = entry["hash"]
+                elif stat.st_size != len(data) and merge is None:
+                    current = None
+                else:
+                    existing = path.read_bytes()
+                    current = content_hash(existing)
+                if merge is not None and current != digest:
+                    # Fold the changes on disk (e.g. progress ticked by hand) into the new text
+                    if existing is None:
+                        existing = path.read_bytes()
+                    data = merge(existing.decode(self.encoding), data.decode(self.encoding)).encode(self.encoding)
+                    digest = content_hash(data)
+                    self.files[name] = (data, merge)
+                if current == digest and not force:
+                    index[name] = {"bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+                    unchanged += 1
+                    if reporter is not None:
+                        reporter.file(name, "skipped")
+                    continue
+
+            if path.parent not in made_dirs:
+                os.makedirs(path.parent, exist_ok=True)
+                made_dirs.add(path.parent)
+            write_atomic(path, data)
+            stat = path.stat()
+            index[name] = {"bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+            written += 1
+            if reporter is not None:
+                reporter.file(name, "written", bytes_out=len(data))
+
+        # Keep entries for files this run didn't produce, so a partial run
+        # doesn't force the next full one to reread them
+        index = {**{name: entry for name, entry in previous.items() if name not in index}, **index}
+        os.makedirs(self.root, exist_ok=True)
+        write_atomic(self.root / INDEX_NAME, json.dumps(
+            {"version": INDEX_VERSION, "files": dict(sorted(index.items()))}, indent=2).encode("utf-8"))
+        return written, unchanged
+
+    def archive_bytes(self, fmt):
+        """
+        The queued tree as one archive: "zip", or "jsonl" with one
+        {"path": ..., "content": ...} object per line
+        """
+        if fmt == "jsonl":
+            lines = (json.dumps({"path": name, "content": data.decode(self.encoding)}, ensure_ascii=False)
+                     for name, (data, _) in self.files.items())
+            return "".join(line + "\n" for line in lines).encode("utf-8")
+        if fmt != "zip":
+            raise ValueError(f"Unknown archive format: {fmt}")
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, (data, _) in self.files.items():
+                info = zipfile.ZipInfo(name, ARCHIVE_DATE)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, data)
+        return buffer.getvalue()
+
+    def write_archive(self, archive_path, fmt=None):
+        """
+        Pack the queued tree into archive_path (format from the extension
+        unless given), writing only if it changed. Returns True if written.
+        """
+        archive_path = Path(archive_path)
+        fmt = fmt or archive_path.suffix.lower().lstrip(".")
+        data = self.archive_bytes(fmt)
+        try:
+            if content_hash(archive_path.read_bytes()) == content_hash(data):
+                return False
+        except OSError:
+            pass
+        os.makedirs(archive_path.parent, exist_ok=True)
+        write_atomic(archive_path, data)
+        return True
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Asset Checker for Kids Learn App
+
+This script cross-checks every image and sound the app refers to against the
+files under public/ by:
+1. Collecting the `coverImage`, `image` and `soundUrl` paths of every story
+   in storyService.ts, and the `fileName`/`sound` paths in imageMapping.ts
+2. Listing the files under public/images and public/sounds
+3. Reporting referenced files that don't exist (and whether they only differ
+   in letter case, which breaks on case-sensitive hosts), files nothing
+   refers to (with the bytes they take up), and files referenced from
+   several places
+4. Hashing same-sized files to find byte-identical copies
+
+Responsive variants (bear-128.png), WebP/AVIF siblings, content-hashed
+illustrations (goldilocks-1.3f9a0c1b2d.png) and sprite atlases are counted
+as built from the PNG they come from, not as orphans.
+
+Usage:
+python check_assets.py
+python check_assets.py --report asset_report.json --verbose
+
+Requirements:
+- Python 3
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from image_formats import FORMAT_OPTIONS
+from optimize_animal_images import file_hash
+from story_data import STORY_SERVICE_PATH, load_stories
+
+# Default paths - using absolute paths for clarity
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+PUBLIC_DIR = PROJECT_ROOT / "public"
+IMAGE_MAPPING_PATH = PROJECT_ROOT / "src" / "resources" / "imageMapping.ts"
+
+# Directories under public/ whose files should all be referenced
+ASSET_DIRS = ["images", "sounds"]
+# Generated by build_animal_atlas.py from the animal images
+GENERATED_DIRS = ["images/atlas"]
+MAPPING_PATTERN = re.compile(r"\b(fileName|sound)\s*:\s*'([^']+)'")
+VARIANT_PATTERN = re.compile(r"-\d+$")
+# Content hash in names written by generate_story_illustrations.py --hashed-names
+HASHED_PATTERN = re.compile(r"\.[0-9a-f]{8,}$")
+# How many entries of each kind to print without --verbose
+PREVIEW = 10
+
+
+def story_references(story_path):
+    """
+    Yield (url, referrer) for every asset path in the stories
+    """
+    name = Path(story_path).name
+    for story in load_stories(story_path):
+        story_id = story.get("id", "?")
+        if story.get("coverImage"):
+            yield story["coverImage"], f"{name}: {story_id} cover"
+        for index, page in enumerate(story.get("pages", [])):
+            for key in ("image", "soundUrl"):
+                if page.get(key):
+                    yield page[key], f"{name}: {story_id} page {index} {key}"
+
+
+def mapping_references(mapping_path):
+    """
+    Yield (url, referrer) for every fileName/sound path in imageMapping.ts
+    """
+    name = Path(mapping_path).name
+    with open(mapping_path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            for match in MAPPING_PATTERN.finditer(line):
+                yield match.group(2), f"{name}:{line_number} {match.group(1)}"
+
+
+def url_to_path(url, public_dir):
+    """
+    Map an app URL such as /images/animals/bear.png to its file under public/
+    """
+    return Path(public_dir) / url.split("?")[0].lstrip("/")
+
+
+def list_asset_files(public_dir):
+    """
+    Map public-relative URLs to the files under the asset directories
+    """
+    files = {}
+    for directory in ASSET_DIRS:
+        root = Path(public_dir) / directory
+        if not root.is_dir():
+            continue
+        for path in sorted(root.rglob("*")):
+            # Manifests such as variants.json sit next to the assets they describe
+            if path.is_file() and path.suffix != ".json":
+                files["/" + path.relative_to(public_dir).as_posix()] = path
+    return files
+
+
+def source_urls(url):
+    """
+    URLs of the PNGs a file could have been built from (including itself)
+    """
+    stem, _, extension = url.rpartition(".")
+    if extension.lower() in FORMAT_OPTIONS:
+        extension = "png"
+    stem = HASHED_PATTERN.sub("", stem)
+    return {url, f"{stem}.{extension}", f"{VARIANT_PATTERN.sub('', stem)}.{extension}"}
+
+
+def find_identical_files(files):
+    """
+    Group byte-identical files: only files of the same size get hashed
+    """
+    by_size = {}
+    for url, path in files.items():
+        by_size.setdefault(path.stat().st_size, []).append(url)
+
+    groups = []
+    for size, urls in by_size.items():
+        if len(urls) < 2:
+            continue
+        by_hash = {}
+        for url in urls:
+            by_hash.setdefault(file_hash(files[url]), []).append(url)
+        for digest, same in by_hash.items():
+            if len(same) > 1:
+                groups.append({"sha256": digest, "bytes": size, "files": sorted(same),
+                               "wasted_bytes": size * (len(same) - 1)})
+    return sorted(groups, key=lambda group: -group["wasted_bytes"])
+
+
+def check_assets(public_dir=PUBLIC_DIR, story_path=STORY_SERVICE_PATH, mapping_path=IMAGE_MAPPING_PATH):
+    """
+    Build the asset index: every referenced or present asset with its referrers
+    """
+    references = {}
+    for url, referrer in [*story_references(story_path), *mapping_references(mapping_path)]:
+        references.setdefault(url, []).append(referrer)
+    files = list_asset_files(public_dir)
+
+    assets = {}
+    for url in sorted(set(references) | set(files)):
+        path = files.get(url) or url_to_path(url, public_dir)
+        exists = path.is_file()
+        assets[url] = {
+            "exists": exists,
+            "bytes": path.stat().st_size if exists else 0,
+            "referencedBy": references.get(url, []),
+        }
+
+    missing = [url for url, asset in assets.items() if asset["referencedBy"] and not asset["exists"]]
+    orphans = [
+        url for url, asset in assets.items()
+        if asset["exists"] and not source_urls(url) & references.keys()
+        and not any(url.startswith(f"/{directory}/") for directory in GENERATED_DIRS)
+    ]
+    # A file that only differs in case works on Windows but not once deployed
+    by_lower = {url.lower(): url for url in files}
+    for url in missing:
+        if url.lower() in by_lower:
+            assets[url]["caseMismatch"] = by_lower[url.lower()]
+    shared = [url for url, asset in assets.items() if len(asset["referencedBy"]) > 1]
+    identical = find_identical_files(files)
+
+    return {
+        "assets": assets,
+        "missing": missing,
+        "orphans": orphans,
+        "orphan_bytes": sum(assets[url]["bytes"] for url in orphans),
+        "shared": shared,
+        "identical": identical,
+        "identical_wasted_bytes": sum(group["wasted_bytes"] for group in identical),
+    }
+
+
+def print_report(report, verbose=False):
+    """
+    Print the problems found, previewing long lists unless verbose
+    """
+    def preview(items):
+        return items if verbose else items[:PREVIEW]
+
+    def more(items):
+        if not verbose and len(items) > PREVIEW:
+            print(f"  ... and {len(items) - PREVIEW} more (use --verbose)")
+
+    assets = report["assets"]
+    print(f"Missing files ({len(report['missing'])}):")
+    for url in preview(report["missing"]):
+        found = f" (found as {assets[url]['caseMismatch']})" if "caseMismatch" in assets[url] else ""
+        print(f"  {url}  <- {assets[url]['referencedBy'][0]}{found}")
+    more(report["missing"])
+
+    print(f"\nOrphaned files ({len(report['orphans'])}, {report['orphan_bytes'] / 1024:.1f} KB):")
+    for url in preview(report["orphans"]):
+        print(f"  {url} ({assets[url]['bytes'] / 1024:.1f} KB)")
+    more(report["orphans"])
+
+    print(f"\nFiles referenced from more than one place ({len(report['shared'])}):")
+    for url in preview(report["shared"]):
+        print(f"  {url} ({len(assets[url]['referencedBy'])} references)")
+    more(report["shared"])
+
+    print(f"\nByte-identical files ({len(report['identical'])} groups, "
+          f"{report['identical_wasted_bytes'] / 1024:.1f} KB duplicated):")
+    for group in preview(report["identical"]):
+        print(f"  {', '.join(group['files'])} ({group['bytes'] / 1024:.1f} KB each)")
+    more(report["identical"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find missing, orphaned and duplicate assets in the Kids Learn App")
+    parser.add_argument("--public", default=PUBLIC_DIR, help="Path to the public directory")
+    parser.add_argument("--stories", default=STORY_SERVICE_PATH, help="Path to storyService.ts")
+    parser.add_argument("--mapping", default=IMAGE_MAPPING_PATH, help="Path to imageMapping.ts")
+    parser.add_argument("--report", default=None, help="Write the full asset index as JSON")
+    parser.add_argument("--verbose", action="store_true", help="List every entry instead of a preview")
+    parser.add_argument("--strict", action="store_true", help="Exit with an error if any file is missing")
+    args = parser.parse_args()
+
+    report = check_assets(args.public, args.stories, args.mapping)
+    print_report(report, args.verbose)
+
+    if args.report:
+        os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nAsset report written to: {args.report}")
+
+    sys.exit(1 if args.strict and report["missing"] else 0)
+
+
+if __name__ == "__main__":
+    main()
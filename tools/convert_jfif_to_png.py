@@ -1,17 +1,73 @@
-from PIL import Image
+"""
+Convert JFIF/JPEG/WebP images to PNG, without resizing.
+
+Uses the same ingestion as optimize_animal_images.py (EXIF orientation
+applied, one file decoded at a time). To resize and optimize at the same
+time, point optimize_animal_images.py --src at the folder instead: it
+accepts these formats directly.
+
+Usage:
+python convert_jfif_to_png.py                       # public/images/animals, in place
+python convert_jfif_to_png.py path/to/input path/to/output --ext .jfif
+"""
+from pathlib import Path
 import os
+import argparse
+
+from optimize_animal_images import JPEG_EXTENSIONS, SOURCE_EXTENSIONS, load_source_image
+
+# Define the default input and output folder
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_FOLDER = PROJECT_ROOT / "public" / "images" / "animals"
+
+
+def convert_folder(input_folder, output_folder=None, extensions=JPEG_EXTENSIONS, overwrite=False):
+    """
+    Convert every image with one of the given extensions to PNG, returning
+    the number of files written
+    """
+    output_folder = Path(output_folder or input_folder)
+    os.makedirs(output_folder, exist_ok=True)
+    converted = 0
+
+    # Iterate through the folder one entry at a time
+    with os.scandir(input_folder) as entries:
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            if not entry.is_file() or Path(entry.name).suffix.lower() not in extensions:
+                continue
+            # Convert the filename to .png
+            png_path = output_folder / (Path(entry.name).stem + ".png")
+            if png_path.exists() and not overwrite:
+                print(f"Skipped {entry.name}: {png_path.name} already exists")
+                continue
+            try:
+                # Full size, so no decode limit: nothing is downscaled here
+                with load_source_image(Path(entry.path), max_pixels=None) as img:
+                    img.save(png_path, "PNG")
+            except (OSError, ValueError) as e:
+                print(f"Error converting {entry.name}: {e}")
+                continue
+            converted += 1
+            print(f"Converted {entry.name} to {png_path.name}")
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert JFIF/JPEG/WebP images to PNG")
+    parser.add_argument("input", nargs="?", default=DEFAULT_FOLDER, help="Folder with the images to convert")
+    parser.add_argument("output", nargs="?", default=None, help="Folder for the PNGs (default: same as input)")
+    parser.add_argument("--ext", default=",".join(sorted(JPEG_EXTENSIONS)),
+                        help="Comma-separated extensions to convert (default: .jfif,.jpeg,.jpg)")
+    parser.add_argument("--overwrite", action="store_true", help="Replace PNGs that already exist")
+    args = parser.parse_args()
+
+    extensions = {f".{ext.strip().lstrip('.').lower()}" for ext in args.ext.split(",") if ext.strip()}
+    unsupported = extensions - set(SOURCE_EXTENSIONS)
+    if unsupported:
+        parser.error(f"unsupported extensions: {', '.join(sorted(unsupported))}")
+    converted = convert_folder(args.input, args.output, extensions, args.overwrite)
+    print(f"Converted {converted} images")
+
 
-# Define the input and output folder
-input_folder = "d:/Workspace/kids-learn/public/images/animals"
-output_folder = "d:/Workspace/kids-learn/public/images/animals"
-
-# Iterate through all files in the input folder
-for filename in os.listdir(input_folder):
-    if filename.endswith(".jfif") and filename.lower().startswith('l'):
-        # Open the .jfif file
-        img = Image.open(os.path.join(input_folder, filename))
-        # Convert the filename to .png
-        png_filename = os.path.splitext(filename)[0] + ".png"
-        # Save the image as .png
-        img.save(os.path.join(output_folder, png_filename), "PNG")
-        print(f"Converted {filename} to {png_filename}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,86 +1,316 @@
 """
 Tool to convert PNG images to ICO format with multiple sizes.
+
+With --icons it builds every app icon from public/logo512.png in one run:
+favicon.ico, the PWA PNG sizes, maskable variants, and the matching
+"icons" entries in public/manifest.json. The logo is decoded once and every
+size is resampled from a chain of halvings, instead of from the full source
+each time.
+
+Usage:
+python convert_png_to_ico.py                  # favicon.ico only
+python convert_png_to_ico.py --icons
+python convert_png_to_ico.py --batch path/to/pngs --jobs 4 --events convert.jsonl
+
 Requires Pillow library: pip install Pillow
 """
 from PIL import Image
+import io
 import os
+import sys
+import json
+import time
+import argparse
+from contextlib import redirect_stdout, redirect_stderr
+
+from batch_report import BatchReporter, add_report_arguments, reporter_from_args
+from optimize_animal_images import resolve_jobs, stream_jobs
+
+# Favicon sizes, and the PWA icon sizes written as logo<size>.png
+ICO_SIZES = [16, 24, 32, 64]
+PWA_SIZES = [192, 512]
+# Maskable icons may be cropped to a circle, so the logo is scaled to fit
+# the 80% safe zone and padded with the manifest's background colour
+MASKABLE_SAFE_ZONE = 0.8
+
+
+def flatten(img, background=(255, 255, 255)):
+    """
+    Paste an image with transparency onto a solid background
+    """
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        flat = Image.new('RGB', img.size, background)
+        # Paste the image on the background using alpha channel as mask
+        flat.paste(img, mask=img.split()[3])
+        return flat
+    return img.convert('RGB')
+
+
+def build_mip_chain(img, sizes):
+    """
+    Resize a square image to every size in sizes, returning {size: image}.
+
+    The image is halved repeatedly with Lanczos filtering, and each size is
+    resampled from the smallest level that is still at least as large, so no
+    resize shrinks by more than 2x at once and none starts from the full
+    source.
+
+    Args:
+        img (PIL.Image): Square source image
+        sizes (list): Sizes to produce
+    """
+    levels = [img]
+    smallest = min(sizes)
+    while levels[-1].width // 2 >= smallest:
+        level = levels[-1]
+        levels.append(level.resize((level.width // 2, level.height // 2), Image.LANCZOS))
+
+    chain = {}
+    for size in sorted(set(sizes), reverse=True):
+        source = min((level for level in levels if level.width >= size), key=lambda level: level.width,
+                     default=levels[0])
+        chain[size] = source if source.width == size else source.resize((size, size), Image.LANCZOS)
+    return chain
+
+
+def save_ico(images, ico_path):
+    """
+    Save already resized images as one ICO file.
+
+    Args:
+        images (dict): Size -> image
+        ico_path (str): Path where the ICO file should be saved
+    """
+    sizes = sorted(images)
+    images[sizes[-1]].save(
+        ico_path,
+        format='ICO',
+        sizes=[(size, size) for size in sizes],
+        append_images=[images[size] for size in sizes[:-1]]
+    )
+
 
 def convert_png_to_ico(png_path, ico_path, sizes=None):
     """
     Convert a PNG file to ICO format with specified sizes.
-    
+
     Args:
         png_path (str): Path to the source PNG file
         ico_path (str): Path where the ICO file should be saved
         sizes (list): List of sizes for the ICO file. Default is [16, 32]
+
+    Returns:
+        bool: True if the ICO file was written
     """
     if sizes is None:
         sizes = [16, 32]  # Default sizes for favicon
-        
+
     try:
-        # Open the PNG image
-        img = Image.open(png_path)
-        
-        # Convert RGBA to RGB if necessary
-        if img.mode == 'RGBA':
-            # Create a white background image
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            # Paste the image on the background using alpha channel as mask
-            background.paste(img, mask=img.split()[3])
-            img = background
-        
+        # Open the PNG image, converting RGBA to RGB on a white background
+        with Image.open(png_path) as img:
+            img = flatten(img)
+
         # Create images in all required sizes
-        icon_sizes = []
-        for size in sizes:
-            resized_img = img.resize((size, size), Image.ANTIALIAS)
-            icon_sizes.append(resized_img)
-            
-        # Save the ICO file with all sizes
-        icon_sizes[0].save(
-            ico_path,
-            format='ICO',
-            sizes=[(size, size) for size in sizes],
-            append_images=icon_sizes[1:]
-        )
+        save_ico(build_mip_chain(img, sizes), ico_path)
         print(f"Successfully converted {png_path} to {ico_path}")
-        
+        return True
+
     except Exception as e:
         print(f"Error converting {png_path}: {str(e)}")
+        return False
 
-def batch_convert_pngs(input_dir, output_dir=None, sizes=None):
+
+def _convert_job(job):
+    """
+    Run convert_png_to_ico in a worker process, capturing its console output
+    so the parent can replay it in submission order
+    """
+    out, err = io.StringIO(), io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(out), redirect_stderr(err):
+        ok = convert_png_to_ico(*job)
+    return ok, out.getvalue(), err.getvalue(), time.perf_counter() - start
+
+
+def batch_convert_pngs(input_dir, output_dir=None, sizes=None, jobs=1, reporter=None):
     """
     Convert multiple PNG files to ICO format.
-    
+
     Args:
         input_dir (str): Directory containing PNG files
         output_dir (str): Directory where ICO files should be saved (default: same as input)
         sizes (list): List of sizes for the ICO files. Default is [16, 32]
+        jobs (int): Number of worker processes (0 or less means one per core)
+        reporter (BatchReporter): Progress and events output (default: a line per file)
+
+    Returns:
+        int: Number of files converted
     """
     if output_dir is None:
         output_dir = input_dir
-        
+
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-        
-    for filename in os.listdir(input_dir):
-        if filename.lower().endswith('.png'):
-            png_path = os.path.join(input_dir, filename)
-            ico_path = os.path.join(output_dir, filename[:-4] + '.ico')
-            convert_png_to_ico(png_path, ico_path, sizes)
+
+    jobs_list = [
+        (os.path.join(input_dir, filename), os.path.join(output_dir, filename[:-4] + '.ico'), sizes)
+        for filename in sorted(os.listdir(input_dir))
+        if filename.lower().endswith('.png')
+    ]
+    if reporter is None:
+        reporter = BatchReporter('convert_png_to_ico', verbose=True, progress=False)
+    reporter.total = len(jobs_list)
+
+    converted = 0
+    # Results come back in submission order, so the log stays stable
+    for (png_path, ico_path, _), (ok, out, err, seconds) in stream_jobs(_convert_job, jobs_list,
+                                                                        resolve_jobs(jobs)):
+        bytes_in = os.path.getsize(png_path)
+        if ok:
+            reporter.file(os.path.basename(png_path), 'converted', seconds, bytes_in, os.path.getsize(ico_path),
+                          output=out)
+        else:
+            reporter.file(os.path.basename(png_path), 'error', seconds, bytes_in,
+                          error=out.strip() or 'failed', output=out)
+        reporter.message(err, sys.stderr)
+        converted += ok
+    reporter.close()
+    return converted
+
+
+def make_maskable(img, background):
+    """
+    Scale an icon into the maskable safe zone on a solid background.
+
+    Args:
+        img (PIL.Image): Square icon at the final size
+        background (tuple): RGB background colour
+    """
+    size = img.width
+    inner = round(size * MASKABLE_SAFE_ZONE)
+    canvas = Image.new('RGB', (size, size), background)
+    logo = img.convert('RGBA').resize((inner, inner), Image.LANCZOS)
+    offset = (size - inner) // 2
+    canvas.paste(logo, (offset, offset), logo)
+    return canvas
+
+
+def parse_color(value, default=(255, 255, 255)):
+    """
+    Turn a CSS hex colour such as #ffffff or #fff into an RGB tuple
+    """
+    value = (value or '').lstrip('#')
+    if len(value) == 3:
+        value = ''.join(char * 2 for char in value)
+    try:
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4)) if len(value) == 6 else default
+    except ValueError:
+        return default
+
+
+def build_icons(logo_path, public_dir, manifest_path=None, ico_sizes=None, pwa_sizes=None):
+    """
+    Build favicon.ico, logo<size>.png and logo<size>-maskable.png from one
+    decode of the logo, and point the manifest's "icons" at them.
+
+    Args:
+        logo_path (str): Path to the source logo (at least as large as the biggest PWA size)
+        public_dir (str): Directory the icons are written to
+        manifest_path (str): Web app manifest to update (default: public_dir/manifest.json)
+        ico_sizes (list): Sizes in favicon.ico. Default is ICO_SIZES
+        pwa_sizes (list): PWA PNG sizes. Default is PWA_SIZES
+
+    Returns:
+        bool: True if every icon was written
+    """
+    ico_sizes = ico_sizes or ICO_SIZES
+    pwa_sizes = pwa_sizes or PWA_SIZES
+    manifest_path = manifest_path or os.path.join(public_dir, 'manifest.json')
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    background = parse_color(manifest.get('background_color'))
+
+    try:
+        with Image.open(logo_path) as img:
+            img = flatten(img, background)
+    except Exception as e:
+        print(f"Error reading {logo_path}: {str(e)}")
+        return False
+    if img.width != img.height or img.width < max(pwa_sizes):
+        print(f"Warning: {logo_path} is {img.width}x{img.height}; a square logo of at least "
+              f"{max(pwa_sizes)}px gives the best icons")
+        img = img.resize((max(img.size),) * 2, Image.LANCZOS)
+
+    chain = build_mip_chain(img, ico_sizes + pwa_sizes)
+
+    favicon_path = os.path.join(public_dir, 'favicon.ico')
+    save_ico({size: chain[size] for size in ico_sizes}, favicon_path)
+    print(f"Wrote {favicon_path}")
+    icons = [{
+        'src': 'favicon.ico',
+        'sizes': ' '.join(f'{size}x{size}' for size in sorted(ico_sizes, reverse=True)),
+        'type': 'image/x-icon'
+    }]
+
+    for size in sorted(pwa_sizes):
+        name = f'logo{size}.png'
+        path = os.path.join(public_dir, name)
+        # The logo itself is already the icon at its own size
+        if os.path.abspath(path) != os.path.abspath(logo_path) or img.width != size:
+            chain[size].save(path, 'PNG', optimize=True)
+            print(f"Wrote {path}")
+        icons.append({'src': name, 'type': 'image/png', 'sizes': f'{size}x{size}'})
+
+    for size in sorted(pwa_sizes):
+        name = f'logo{size}-maskable.png'
+        path = os.path.join(public_dir, name)
+        make_maskable(chain[size], background).save(path, 'PNG', optimize=True)
+        print(f"Wrote {path}")
+        icons.append({'src': name, 'type': 'image/png', 'sizes': f'{size}x{size}', 'purpose': 'maskable'})
+
+    manifest['icons'] = icons
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+    print(f"Updated icons in {manifest_path}")
+    return True
+
 
 def main():
     # Get the project root directory (2 levels up from this script)
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    
+
     # Define paths
-    logo_path = os.path.join(project_root, 'public', 'logo512.png')
-    favicon_path = os.path.join(project_root, 'public', 'favicon.ico')
-    
-    # Convert logo to favicon
-    if os.path.exists(logo_path):
-        convert_png_to_ico(logo_path, favicon_path)
+    public_dir = os.path.join(project_root, 'public')
+    logo_path = os.path.join(public_dir, 'logo512.png')
+
+    parser = argparse.ArgumentParser(description="Convert PNG images to ICO and build the app icons")
+    parser.add_argument('--icons', action='store_true',
+                        help="Build favicon.ico, the PWA icons and maskable icons, and update manifest.json")
+    parser.add_argument('--logo', default=logo_path, help="Source logo for the favicon and --icons")
+    parser.add_argument('--public', default=public_dir, help="Directory the icons are written to")
+    parser.add_argument('--batch', default=None, help="Convert every PNG in this directory to ICO")
+    parser.add_argument('--out', default=None, help="Output directory for --batch (default: same as input)")
+    parser.add_argument('--jobs', default=1, type=int,
+                        help="Worker processes for --batch (0 = one per CPU core)")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    if args.batch:
+        batch_convert_pngs(args.batch, args.out, jobs=args.jobs, reporter=reporter_from_args('convert_png_to_ico', args))
+    elif not os.path.exists(args.logo):
+        print(f"Error: Could not find logo file at {args.logo}")
+        sys.exit(1)
+    elif args.icons:
+        sys.exit(0 if build_icons(args.logo, args.public) else 1)
     else:
-        print(f"Error: Could not find logo file at {logo_path}")
+        # Convert logo to favicon
+        convert_png_to_ico(args.logo, os.path.join(args.public, 'favicon.ico'))
 
 if __name__ == "__main__":
     main()
@@ -6,20 +6,54 @@ This script creates illustrations for the stories in the kids-learn app by:
 1. Generating cover images for each story
 2. Creating illustrations for individual story pages
 3. Utilizing existing animal images with text overlays and backgrounds
+4. Optionally writing WebP/AVIF copies next to each PNG
+
+Usage:
+python generate_story_illustrations.py [root_dir] [--formats webp,avif] [--size-report report.json]
+python generate_story_illustrations.py --jobs 0 --seed 42
+python generate_story_illustrations.py --hashed-names
 
 Requirements:
 - PIL (Pillow) library: pip install Pillow
+- NumPy (optional, renders gradient and stripe backgrounds 2-4x faster): pip install numpy
+
+Profiling:
+python generate_story_illustrations.py --force --profile profile.json [--cprofile] [--trace-memory]
+writes per-stage timings (background, sprite decode/resize, text layout,
+compositing, PNG encoding, ...) to profile.json and a flame graph input to
+profile.folded (see stage_profiler.py).
 """
 
 import os
 import sys
+import io
 import math
-from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
-import json
+import time
+import zlib
+import hashlib
+import functools
+from collections import OrderedDict
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor
+import PIL
+from PIL import Image, ImageDraw, ImageFont, ImageEnhance
 import random
-import shutil
+import argparse
 from pathlib import Path
 
+from batch_report import BatchReporter, add_report_arguments, reporter_from_args
+from image_formats import (SizeReport, add_format_arguments, format_path, placeholder_data_uri, quality_from_args,
+                           save_extra_formats)
+from optimize_animal_images import (file_hash, load_manifest, remove_stale_outputs, resolve_jobs, save_manifest,
+                                    settings_hash)
+from stage_profiler import StageProfiler
+from story_data import load_stories
+
+try:
+    import numpy_backgrounds
+except ImportError:  # NumPy is optional; fall back to ImageDraw
+    numpy_backgrounds = None
+
 # Constants
 FONT_SIZE_TITLE = 65
 FONT_SIZE_SUBTITLE = 35
@@ -28,6 +62,7 @@ COVER_WIDTH = 600
 COVER_HEIGHT = 400
 PAGE_WIDTH = 800
 PAGE_HEIGHT = 500
+PATTERN_TYPES = ['circles', 'stars', 'polka_dots', 'gradient', 'stripes']
 BACKGROUND_COLORS = [
     (255, 223, 186),  # Peach
     (200, 230, 255),  # Light Blue
@@ -37,6 +72,22 @@ BACKGROUND_COLORS = [
     (255, 255, 200),  # Light Yellow
     (200, 255, 230),  # Mint
 ]
+# Default memory budget for decoded, resized animal sprites
+SPRITE_CACHE_MB = 64
+# Base seed for the per-image random streams
+DEFAULT_SEED = 0
+# Bump when the drawing code changes, so every illustration is re-rendered
+RENDER_VERSION = 1
+# Maps each illustration name to its rendered file, written to the stories directory
+ILLUSTRATION_MANIFEST_NAME = "illustrations.json"
+# Hex digits of the content hash used in hashed file names
+HASH_LENGTH = 10
+# Fonts to try, most kid-friendly first; the Pillow default is the last resort
+FONT_FAMILIES = [
+    "Comic Sans MS.ttf",
+    "arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+]
 STORY_THEMES = {
     'red-riding-hood': ['forest', 'girl', 'wolf'],
     'three-little-pigs': ['pig', 'wolf', 'house'],
@@ -52,28 +103,337 @@ STORY_THEMES = {
     'boy-who-cried-wolf': ['wolf', 'sheep', 'boy'],
 }
 
+@functools.lru_cache(maxsize=None)
+def _load_font_family(family, size):
+    """Load one font family at one size, or None if it isn't installed (cached per process)"""
+    try:
+        return ImageFont.truetype(family, size)
+    except IOError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_font(size):
+    """Return the first available font from FONT_FAMILIES at the given size (cached per process)"""
+    for family in FONT_FAMILIES:
+        font = _load_font_family(family, size)
+        if font is not None:
+            return font
+    return ImageFont.load_default()
+
+
+class GlyphAdvances:
+    """Cached advance widths for one font, so text can be measured by summing widths"""
+    
+    def __init__(self, font):
+        self.font = font
+        self.advances = {}
+        self.words = {}
+    
+    def text_width(self, text):
+        """Width of a piece of text as the sum of its glyph advances"""
+        width = self.words.get(text)
+        if width is None:
+            advances = self.advances
+            width = 0.0
+            for char in text:
+                advance = advances.get(char)
+                if advance is None:
+                    advance = advances[char] = self.font.getlength(char)
+                width += advance
+            self.words[text] = width
+        return width
+    
+    def wrap(self, words, max_width):
+        """Greedy word wrap; returns a list of (line, width) pairs"""
+        space = self.text_width(" ")
+        lines = []
+        current_words = [words[0]]
+        current_width = self.text_width(words[0])
+        for word in words[1:]:
+            word_width = self.text_width(word)
+            # Check if adding this word exceeds the max width
+            if current_width + space + word_width <= max_width:
+                current_words.append(word)
+                current_width += space + word_width
+            else:
+                lines.append((" ".join(current_words), current_width))
+                current_words = [word]
+                current_width = word_width
+        lines.append((" ".join(current_words), current_width))  # Add the last line
+        return lines
+
+
+@functools.lru_cache(maxsize=None)
+def glyph_advances(size):
+    """Shared glyph advance table for the resolved font at the given size"""
+    return GlyphAdvances(resolve_font(size))
+
+
+class SpriteCache:
+    """
+    LRU cache of decoded, resized RGBA animal sprites and their alpha masks
+    
+    Entries are keyed on (animal path, bounding box) and the least recently
+    used ones are dropped once the pixel data exceeds max_bytes. Cached
+    sprites are shared, so callers must only read (paste) them.
+    """
+    
+    def __init__(self, max_bytes=SPRITE_CACHE_MB * 1024 * 1024, profiler=None):
+        self.max_bytes = max_bytes
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, animal_path, max_dim):
+        """Return (sprite, mask) for the animal scaled to fit a max_dim square"""
+        key = (animal_path, max_dim)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        
+        with Image.open(animal_path) as animal:
+            # Calculate dimensions to maintain aspect ratio
+            w, h = animal.size
+            scale_factor = min(max_dim / w, max_dim / h)
+            new_size = (int(w * scale_factor), int(h * scale_factor))
+            with self.profiler.stage('sprite_decode'):
+                animal = animal.convert('RGBA')
+            with self.profiler.stage('sprite_resize'):
+                sprite = animal.resize(new_size, Image.LANCZOS)
+        entry = (sprite, sprite.getchannel('A'))
+        
+        # A sprite uses 4 bytes per pixel for RGBA plus 1 for the mask
+        self.entries[key] = entry
+        self.bytes += sprite.width * sprite.height * 5
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, (old_sprite, _) = self.entries.popitem(last=False)
+            self.bytes -= old_sprite.width * old_sprite.height * 5
+            self.evictions += 1
+        return entry
+    
+    def stats(self):
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+        }
+
+
+# Generator owned by each worker process in parallel mode
+_worker_generator = None
+
+
+def _init_worker(root_dir, options):
+    """
+    Build one generator per worker process, so its font and sprite caches
+    are reused by every job the worker runs
+    """
+    global _worker_generator
+    # The "Loaded N animal images" line was already printed by the parent
+    with redirect_stdout(io.StringIO()):
+        _worker_generator = StoryIllustrationGenerator(root_dir, **options)
+
+
+def _render_job(job):
+    """
+    Render one cover or page in a worker process, capturing its console
+    output so the parent can replay it in submission order
+    """
+    cache = _worker_generator.sprite_cache
+    hits, misses = cache.hits, cache.misses
+    result = _worker_generator.run_job(job)
+    # Stage timings go back to the parent with each job, which merges them
+    profiler = _worker_generator.profiler
+    stages = profiler.export() if profiler.enabled else None
+    profiler.reset()
+    return result, cache.hits - hits, cache.misses - misses, stages
+
+
 class StoryIllustrationGenerator:
-    def __init__(self, root_dir):
+    def __init__(self, root_dir, formats=None, quality=None, use_numpy=None, sprite_cache_mb=SPRITE_CACHE_MB,
+                 seed=DEFAULT_SEED, hashed_names=False, force=False, profile=False):
         self.root_dir = root_dir
+        self.formats = list(formats or [])
+        self.quality = quality
+        self.sprite_cache_mb = sprite_cache_mb
+        # Every image gets its own random stream derived from this seed
+        self.seed = seed
+        # Write name.<content hash>.png instead of name.png, for immutable caching
+        self.hashed_names = hashed_names
+        # Re-render everything, including files the generator didn't make
+        self.force = force
+        self.animal_hashes = {}
+        # Use the vectorized background renderer whenever NumPy is available
+        self.use_numpy = numpy_backgrounds is not None if use_numpy is None else use_numpy
         self.stories_dir = os.path.join(root_dir, 'public', 'images', 'stories')
         self.animals_dir = os.path.join(root_dir, 'public', 'images', 'animals')
         self.story_data_path = os.path.join(root_dir, 'src', 'services', 'story', 'storyService.ts')
         self.animal_images = {}
+        # Whether the last render job drew its image rather than keeping the file
+        self.rendered = False
+        # Per-stage timers; a disabled profiler costs next to nothing
+        self.profiler = StageProfiler(enabled=profile)
+        # Animals are reused across stories, so keep their scaled sprites around
+        self.sprite_cache = SpriteCache(int(sprite_cache_mb * 1024 * 1024), self.profiler)
         
         # Create stories directory if it doesn't exist
         Path(self.stories_dir).mkdir(parents=True, exist_ok=True)
+        self.manifest_path = os.path.join(self.stories_dir, ILLUSTRATION_MANIFEST_NAME)
+        self.manifest = load_manifest(self.manifest_path)
         
         # Load available animal images
         self._load_animal_images()
         
+    def reload_animals(self):
+        """
+        Re-read the animal directory, dropping hashes and sprites of the old
+        files (for a long-running generator, e.g. watch_assets.py)
+        """
+        self.animal_images = {}
+        self.animal_hashes = {}
+        self.sprite_cache = SpriteCache(int(self.sprite_cache_mb * 1024 * 1024), self.profiler)
+        self._load_animal_images()
+    
     def _load_animal_images(self):
         """Load available animal images (.png files only)"""
-        for file in os.listdir(self.animals_dir):
+        # Sorted, so partial keyword matches don't depend on directory order
+        for file in sorted(os.listdir(self.animals_dir)):
             if file.endswith('.png'):
                 animal_name = file.split('.')[0].lower()
                 self.animal_images[animal_name] = os.path.join(self.animals_dir, file)
         print(f"Loaded {len(self.animal_images)} animal images")
     
+    def _save_image(self, img, name, inputs):
+        """
+        Save an illustration as PNG plus any extra formats
+        
+        Returns its manifest entry, including a blurred placeholder made from
+        the same image. With hashed names, the file name carries a hash of
+        the PNG bytes, e.g. goldilocks-1.3f9a0c1b2d.png, and a copy is kept
+        under the plain name that storyService.ts refers to, so the pages
+        work before (or without) the asset manifest.
+        """
+        profiler = self.profiler
+        with profiler.stage('png_encode'):
+            buffer = io.BytesIO()
+            img.save(buffer, 'PNG')
+            data = buffer.getvalue()
+        profiler.count('png_bytes', len(data))
+        digest = hashlib.sha256(data).hexdigest()
+        file_name = f"{Path(name).stem}.{digest[:HASH_LENGTH]}.png" if self.hashed_names else name
+        output_path = os.path.join(self.stories_dir, file_name)
+        with profiler.stage('write'):
+            with open(output_path, 'wb') as f:
+                f.write(data)
+            if file_name != name:
+                with open(os.path.join(self.stories_dir, name), 'wb') as f:
+                    f.write(data)
+        with profiler.stage('extra_formats'):
+            formats = save_extra_formats(img, output_path, self.formats, self.quality)
+        with profiler.stage('placeholder'):
+            placeholder = placeholder_data_uri(img)
+        return {
+            'file': file_name,
+            'inputs': inputs,
+            'sha256': digest,
+            'formats': {fmt: path.name for fmt, path in formats.items()},
+            'outputs': [*dict.fromkeys((file_name, name)), *(path.name for path in formats.values())],
+            'placeholder': placeholder,
+        }
+    
+    def _ensure_extra_formats(self, output_path):
+        """Write missing extra formats for an existing PNG illustration"""
+        missing = [fmt for fmt in self.formats if not format_path(output_path, fmt).exists()]
+        if missing:
+            with Image.open(output_path) as img:
+                img.load()
+                save_extra_formats(img, output_path, missing, self.quality)
+            print(f"Added {', '.join(fmt.upper() for fmt in missing)} for: {output_path}")
+        return {fmt: format_path(output_path, fmt).name for fmt in self.formats}
+    
+    def _animal_hash(self, animal_path):
+        """SHA-256 of an animal image, computed once per run"""
+        if animal_path not in self.animal_hashes:
+            self.animal_hashes[animal_path] = file_hash(animal_path)
+        return self.animal_hashes[animal_path]
+    
+    def _render_inputs(self, name, animal_path, **content):
+        """
+        Hash everything that affects an illustration's pixels: the seed, the
+        text, the animal image's contents, the fonts and the renderer
+        """
+        return settings_hash({
+            'render_version': RENDER_VERSION,
+            'pillow': PIL.__version__,
+            'numpy': bool(self.use_numpy),
+            'seed': self.seed,
+            'name': name,
+            'animal': [os.path.basename(animal_path), self._animal_hash(animal_path)],
+            'fonts': {size: getattr(resolve_font(size), 'path', 'default')
+                      for size in (FONT_SIZE_TITLE, FONT_SIZE_PAGE)},
+            **content,
+        })
+    
+    def _existing_output(self, name, inputs):
+        """
+        Return the manifest entry to keep for an illustration, or None if it
+        has to be rendered
+        
+        An illustration is kept when its inputs hash is unchanged. A file the
+        generator didn't record (e.g. hand-drawn art, or images from before
+        the manifest existed) is adopted and never overwritten unless
+        forced; the inputs it was adopted at are recorded, so an adopted
+        file whose story changed afterwards is marked stale and reported.
+        """
+        if self.force:
+            return None
+        entry = self.manifest['entries'].get(name)
+        if entry is None:
+            output_path = os.path.join(self.stories_dir, name)
+            if not os.path.exists(output_path):
+                return None
+            entry = {'file': name, 'adopted_inputs': inputs}
+        elif entry.get('inputs') is not None:
+            if entry['inputs'] != inputs or self.hashed_names != (entry['file'] != name):
+                # Changed inputs, or switched to or from hashed names
+                return None
+        else:
+            # Adopted on an earlier run (entries from before adopted_inputs was recorded start tracking now)
+            adopted_inputs = entry.get('adopted_inputs', inputs)
+            entry = {key: value for key, value in entry.items() if key != 'stale'}
+            entry['adopted_inputs'] = adopted_inputs
+            if adopted_inputs != inputs:
+                entry['stale'] = True
+        
+        output_path = os.path.join(self.stories_dir, entry['file'])
+        if not os.path.exists(output_path):
+            return None
+        plain_path = os.path.join(self.stories_dir, name)
+        if not os.path.exists(plain_path):
+            # Hashed file from before plain copies were kept
+            Path(plain_path).write_bytes(Path(output_path).read_bytes())
+        formats = self._ensure_extra_formats(output_path)
+        entry = dict(entry, formats=formats)
+        if 'outputs' in entry:
+            entry['outputs'] = [*dict.fromkeys((entry['file'], name)), *formats.values()]
+        if 'placeholder' not in entry:
+            # Kept from before placeholders were recorded, or not generated by us
+            with Image.open(output_path) as img:
+                entry['placeholder'] = placeholder_data_uri(img)
+        return entry
+    
     def _find_matching_animal(self, keyword):
         """Find an animal image that matches the keyword"""
         # Direct match
@@ -85,16 +445,26 @@ class StoryIllustrationGenerator:
             if keyword in animal_name or animal_name in keyword:
                 return image_path
         
-        # Return a random animal if no match
-        return random.choice(list(self.animal_images.values()))    def _create_background(self, width, height, theme=None):
-        """Create a colorful background for illustrations with kid-friendly patterns"""
+        # Fall back to an animal picked by the keyword itself, so the choice
+        # doesn't depend on the random stream
+        animals = list(self.animal_images.values())
+        return animals[zlib.crc32(keyword.encode('utf-8')) % len(animals)]
+    
+    def _create_background(self, width, height, theme=None, pattern_type=None):
+        """
+        Create a colorful background for illustrations with kid-friendly patterns
+        
+        pattern_type (one of PATTERN_TYPES) is normally picked at random; it
+        can be fixed, e.g. to benchmark one pattern.
+        """
         # Create base image with background color
         bg_color = random.choice(BACKGROUND_COLORS)
         img = Image.new('RGBA', (width, height), bg_color)
         draw = ImageDraw.Draw(img)
         
         # Select a pattern type for this background
-        pattern_type = random.choice(['circles', 'stars', 'polka_dots', 'gradient', 'stripes'])
+        if pattern_type is None:
+            pattern_type = random.choice(PATTERN_TYPES)
         
         if pattern_type == 'circles':
             # Add colorful, overlapping circles
@@ -168,7 +538,9 @@ class StoryIllustrationGenerator:
             color2 = (*color2, 255)
             
             # Create gradient
-            if direction == 'horizontal':
+            if self.use_numpy:
+                gradient = numpy_backgrounds.render_gradient(width, height, direction, color1, color2)
+            elif direction == 'horizontal':
                 for x in range(width):
                     # Calculate color for this column
                     r = int(color1[0] + (color2[0] - color1[0]) * x / width)
@@ -220,31 +592,12 @@ class StoryIllustrationGenerator:
             # Create colorful stripes
             stripe_width = random.randint(20, 40)
             angle = random.choice([0, 45, 90, 135])
-            
-            # Create a new image for the stripes
-            stripes = Image.new('RGBA', (width * 2, height * 2), (0, 0, 0, 0))
-            stripes_draw = ImageDraw.Draw(stripes)
-            
-            # Create stripe pattern
             colors = [(255, 255, 255, 60), (255, 220, 100, 60), (150, 220, 255, 60), (255, 150, 150, 60)]
             
-            # Draw stripes on a larger canvas then rotate
-            max_dim = max(width, height) * 2
-            stripes = Image.new('RGBA', (max_dim, max_dim), (0, 0, 0, 0))
-            stripes_draw = ImageDraw.Draw(stripes)
-            
-            for i in range(-max_dim, max_dim, stripe_width):
-                color = colors[i // stripe_width % len(colors)]
-                stripes_draw.rectangle([i, -max_dim, i + stripe_width//2, max_dim*2], fill=color)
-            
-            # Rotate the stripes
-            stripes = stripes.rotate(angle, expand=True)
-            
-            # Center and crop to original size
-            stripes_w, stripes_h = stripes.size
-            left = (stripes_w - width) // 2
-            top = (stripes_h - height) // 2
-            stripes = stripes.crop((left, top, left + width, top + height))
+            if self.use_numpy:
+                stripes = numpy_backgrounds.render_stripes(width, height, stripe_width, angle, colors)
+            else:
+                stripes = self._draw_stripes(width, height, stripe_width, angle, colors)
             
             # Composite the stripes onto the base image
             img = Image.alpha_composite(img, stripes)
@@ -255,6 +608,26 @@ class StoryIllustrationGenerator:
         
         return img
     
+    def _draw_stripes(self, width, height, stripe_width, angle, colors):
+        """Draw the rotated stripe layer with ImageDraw (used without NumPy)"""
+        # Draw stripes on a larger canvas then rotate
+        max_dim = max(width, height) * 2
+        stripes = Image.new('RGBA', (max_dim, max_dim), (0, 0, 0, 0))
+        stripes_draw = ImageDraw.Draw(stripes)
+        
+        for i in range(-max_dim, max_dim, stripe_width):
+            color = colors[i // stripe_width % len(colors)]
+            stripes_draw.rectangle([i, -max_dim, i + stripe_width//2, max_dim*2], fill=color)
+        
+        # Rotate the stripes
+        stripes = stripes.rotate(angle, expand=True)
+        
+        # Center and crop to original size
+        stripes_w, stripes_h = stripes.size
+        left = (stripes_w - width) // 2
+        top = (stripes_h - height) // 2
+        return stripes.crop((left, top, left + width, top + height))
+    
     def _draw_star(self, draw, x, y, size, color):
         """Helper method to draw a star shape"""
         # Calculate the points of a 5-pointed star
@@ -279,16 +652,9 @@ class StoryIllustrationGenerator:
     def _add_animal_to_image(self, base_img, animal_path, position='center', scale=0.7):
         """Add an animal image to the base image"""
         try:
-            animal = Image.open(animal_path)
-            
-            # Calculate dimensions to maintain aspect ratio
-            w, h = animal.size
+            # Scaled sprite, maintaining aspect ratio
             max_dim = min(base_img.width, base_img.height) * scale
-            scale_factor = min(max_dim / w, max_dim / h)
-            new_size = (int(w * scale_factor), int(h * scale_factor))
-            
-            # Resize animal image
-            animal = animal.resize(new_size, Image.LANCZOS)
+            animal, mask = self.sprite_cache.get(animal_path, max_dim)
             
             # Calculate position
             if position == 'center':
@@ -307,40 +673,26 @@ class StoryIllustrationGenerator:
                 pos_x = (base_img.width - animal.width) // 2
                 pos_y = base_img.height * 4 // 5 - animal.height // 2
             
-            # Create a new image for transparent paste
-            if animal.mode == 'RGBA':
-                # Create a mask
-                r, g, b, a = animal.split()
-                base_img.paste(animal, (pos_x, pos_y), mask=a)
-            else:
-                # Just paste the image
-                base_img.paste(animal, (pos_x, pos_y))
+            # Paste using the cached alpha mask
+            base_img.paste(animal, (pos_x, pos_y), mask=mask)
                 
             return base_img
         except Exception as e:
             print(f"Error adding animal image: {e}")
-            return base_img    def _add_text_to_image(self, img, text, position='bottom', font_size=FONT_SIZE_PAGE):
+            return base_img
+    
+    def _add_text_to_image(self, img, text, position='bottom', font_size=FONT_SIZE_PAGE):
         """Add text to the image with enhanced design"""
         try:
             # Create a draw object
             draw = ImageDraw.Draw(img)
             
-            # Try to load a font, use default if not available
-            try:
-                # Try to load a more kid-friendly font first if available
-                font = ImageFont.truetype("Comic Sans MS.ttf", font_size)
-            except IOError:
-                try:
-                    font = ImageFont.truetype("arial.ttf", font_size)
-                except IOError:
-                    try:
-                        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", font_size)
-                    except IOError:
-                        font = ImageFont.load_default()
+            # Fonts and glyph widths are resolved once per size and shared
+            font = resolve_font(font_size)
+            advances = glyph_advances(font_size)
             
             # Break text into multiple lines if it's too long
             max_width = img.width * 0.8  # Use 80% of image width
-            lines = []
             
             if not text:
                 return img
@@ -348,34 +700,26 @@ class StoryIllustrationGenerator:
             words = text.split()
             if not words:
                 return img
-                
-            current_line = words[0]
-            
-            for word in words[1:]:
-                test_line = current_line + " " + word
-                # Check if adding this word exceeds the max width
-                test_width = draw.textbbox((0, 0), test_line, font=font)[2]
-                if test_width <= max_width:
-                    current_line = test_line
-                else:
-                    lines.append(current_line)
-                    current_line = word
-            lines.append(current_line)  # Add the last line
-            
-            # Calculate total text height with line spacing
-            line_spacing = font_size * 0.3
-            total_text_height = 0
-            line_heights = []
-            
-            for line in lines:
-                line_bbox = draw.textbbox((0, 0), line, font=font)
-                line_width, line_height = line_bbox[2], line_bbox[3]
-                line_heights.append(line_height)
-                total_text_height += line_height + line_spacing
-            
-            # Adjust total height (remove extra line spacing from last line)
-            if line_heights:
-                total_text_height -= line_spacing
+            
+            with self.profiler.stage('text_layout'):
+                # Summing cached word widths keeps wrapping linear in the word count
+                wrapped = advances.wrap(words, max_width)
+                lines = [line for line, _ in wrapped]
+                line_widths = [width for _, width in wrapped]
+            
+                # Calculate total text height with line spacing
+                line_spacing = font_size * 0.3
+                total_text_height = 0
+                line_heights = []
+            
+                for line in lines:
+                    line_height = draw.textbbox((0, 0), line, font=font)[3]
+                    line_heights.append(line_height)
+                    total_text_height += line_height + line_spacing
+            
+                # Adjust total height (remove extra line spacing from last line)
+                if line_heights:
+                    total_text_height -= line_spacing
             
             # Determine position with improved vertical spacing
             if position == 'bottom':
@@ -388,71 +732,82 @@ class StoryIllustrationGenerator:
                 text_x = (img.width - max_width) // 2
                 text_y = (img.height - total_text_height) // 2
             
-            # Draw a more attractive text background with rounded corners
-            padding = 25
-            margin = 10  # Margin from edges
-            
-            # Create a new RGBA image for the text background with same size as original
-            overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-            overlay_draw = ImageDraw.Draw(overlay)
-            
-            # Calculate text box boundaries
-            left = max(text_x - padding, margin)
-            top = max(text_y - padding, margin)
-            right = min(text_x + max_width + padding, img.width - margin)
-            bottom = min(text_y + total_text_height + padding, img.height - margin)
-            
-            # Draw rounded rectangle with border
-            rectangle_radius = 20
-            border_width = 2
-            
-            # Draw white background with rounded corners and slight transparency
-            overlay_draw.rounded_rectangle(
-                (left, top, right, bottom), 
-                radius=rectangle_radius,
-                fill=(255, 255, 255, 220)  # White with 86% opacity
-            )
-            
-            # Draw colored border around the text box
-            border_color = (0, 153, 204, 255)  # Light blue border
-            overlay_draw.rounded_rectangle(
-                (left, top, right, bottom),
-                radius=rectangle_radius,
-                fill=None,
-                outline=border_color,
-                width=border_width
-            )
-            
-            # Composite the overlay with the original image
-            img = Image.alpha_composite(img.convert('RGBA'), overlay)
-            draw = ImageDraw.Draw(img)
+            with self.profiler.stage('text_draw'):
+                # Draw a more attractive text background with rounded corners
+                padding = 25
+                margin = 10  # Margin from edges
+            
+                # Create a new RGBA image for the text background with same size as original
+                overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
+                overlay_draw = ImageDraw.Draw(overlay)
+            
+                # Calculate text box boundaries
+                left = max(text_x - padding, margin)
+                top = max(text_y - padding, margin)
+                right = min(text_x + max_width + padding, img.width - margin)
+                bottom = min(text_y + total_text_height + padding, img.height - margin)
+            
+                # Draw rounded rectangle with border
+                rectangle_radius = 20
+                border_width = 2
+            
+                # Draw white background with rounded corners and slight transparency
+                overlay_draw.rounded_rectangle(
+                    (left, top, right, bottom), 
+                    radius=rectangle_radius,
+                    fill=(255, 255, 255, 220)  # White with 86% opacity
+                )
             
-            # Draw each line of text
-            y_offset = text_y
-            text_color = (0, 0, 0, 255)  # Black text
+                # Draw colored border around the text box
+                border_color = (0, 153, 204, 255)  # Light blue border
+                overlay_draw.rounded_rectangle(
+                    (left, top, right, bottom),
+                    radius=rectangle_radius,
+                    fill=None,
+                    outline=border_color,
+                    width=border_width
+                )
             
-            for i, line in enumerate(lines):
-                line_width = draw.textbbox((0, 0), line, font=font)[2]
-                # Center each line within the text box
-                x_position = text_x + (max_width - line_width) // 2
-                draw.text((x_position, y_offset), line, fill=text_color, font=font)
-                y_offset += line_heights[i] + line_spacing
+                # Composite the overlay with the original image
+                img = Image.alpha_composite(img.convert('RGBA'), overlay)
+                draw = ImageDraw.Draw(img)
+            
+                # Draw each line of text
+                y_offset = text_y
+                text_color = (0, 0, 0, 255)  # Black text
+            
+                for i, line in enumerate(lines):
+                    line_width = line_widths[i]
+                    # Center each line within the text box
+                    x_position = text_x + (max_width - line_width) // 2
+                    draw.text((x_position, y_offset), line, fill=text_color, font=font)
+                    y_offset += line_heights[i] + line_spacing
             
             return img.convert('RGB')  # Convert back to RGB for saving
         except Exception as e:
             print(f"Error adding text: {e}")
             return img
-      def create_cover_image(self, story_id, title):
-        """Create a cover image for a story"""
-        output_path = os.path.join(self.stories_dir, f"{story_id}-cover.png")
+    
+    def create_cover_image(self, story_id, title):
+        """Create a cover image for a story, returning its manifest entry"""
+        name = f"{story_id}-cover.png"
+        theme_keywords = STORY_THEMES.get(story_id, ['animal'])
+        animal_img_path = self._find_matching_animal(theme_keywords[0])
+        with self.profiler.stage('inputs_hash'):
+            inputs = self._render_inputs(name, animal_img_path, title=title)
         
-        # Skip if file exists
-        if os.path.exists(output_path):
-            print(f"Cover image for '{story_id}' already exists. Skipping.")
-            return output_path
+        # Skip if the file is up to date
+        with self.profiler.stage('up_to_date_check'):
+            entry = self._existing_output(name, inputs)
+        if entry is not None:
+            self.profiler.count('skipped')
+            print(f"Cover image for '{story_id}' is up to date. Skipping.")
+            return entry
+        self.profiler.count('covers_rendered')
         
         # Create background
-        img = self._create_background(COVER_WIDTH, COVER_HEIGHT)
+        with self.profiler.stage('background'):
+            img = self._create_background(COVER_WIDTH, COVER_HEIGHT)
         
         # First create a layout that separates the title area from the animal area
         # Use top 30% for title, bottom 70% for animal
@@ -461,53 +816,61 @@ class StoryIllustrationGenerator:
         animal_height = COVER_HEIGHT - title_height
         
         # Add title at the top with clear separation
-        img = self._add_text_to_image(img, title, position='top', font_size=FONT_SIZE_TITLE)
+        with self.profiler.stage('text'):
+            img = self._add_text_to_image(img, title, position='top', font_size=FONT_SIZE_TITLE)
         
         # Add animal in the bottom part
-        theme_keywords = STORY_THEMES.get(story_id, ['animal'])
-        animal_img_path = self._find_matching_animal(theme_keywords[0])
-        
         try:
-            # Open animal image
-            animal = Image.open(animal_img_path)
-            
-            # Calculate dimensions to maintain aspect ratio and keep in bottom section
-            w, h = animal.size
+            # Scaled sprite, maintaining aspect ratio and kept in the bottom section
             max_dim = min(COVER_WIDTH, animal_height) * 0.8
-            scale_factor = min(max_dim / w, max_dim / h)
-            new_size = (int(w * scale_factor), int(h * scale_factor))
-            
-            # Resize animal image
-            animal = animal.resize(new_size, Image.LANCZOS)
+            with self.profiler.stage('sprite'):
+                animal, mask = self.sprite_cache.get(animal_img_path, max_dim)
             
             # Place in the center of the bottom section
             pos_x = (COVER_WIDTH - animal.width) // 2
             pos_y = title_height + (animal_height - animal.height) // 2
             
-            # Paste with transparency if available
-            if animal.mode == 'RGBA':
-                r, g, b, a = animal.split()
-                img.paste(animal, (pos_x, pos_y), mask=a)
-            else:
-                img.paste(animal, (pos_x, pos_y))
+            # Paste with transparency using the cached mask
+            with self.profiler.stage('composite'):
+                img.paste(animal, (pos_x, pos_y), mask=mask)
         except Exception as e:
             print(f"Error adding animal image to cover: {e}")
         
         # Save the image
-        img.save(output_path)
-        print(f"Created cover image: {output_path}")
-        return output_path
-      def create_page_image(self, story_id, page_num, page_text=""):
-        """Create an image for a story page"""
-        output_path = os.path.join(self.stories_dir, f"{story_id}-{page_num}.png")
-        
-        # Skip if file exists
-        if os.path.exists(output_path):
-            print(f"Page image '{story_id}-{page_num}' already exists. Skipping.")
-            return output_path
+        with self.profiler.stage('save'):
+            entry = self._save_image(img, name, inputs)
+        self.rendered = True
+        print(f"Created cover image: {os.path.join(self.stories_dir, entry['file'])}")
+        return entry
+    
+    def create_page_image(self, story_id, page_num, page_text=""):
+        """Create an image for a story page, returning its manifest entry"""
+        name = f"{story_id}-{page_num}.png"
+        
+        # Add animal related to story theme
+        theme_keywords = STORY_THEMES.get(story_id, ['animal'])
+        # Use different animals for different pages
+        keyword_index = page_num % len(theme_keywords)
+        animal_img_path = self._find_matching_animal(theme_keywords[keyword_index])
+        
+        # Use more of the text, but still keep it reasonable
+        max_length = 120
+        short_text = page_text[:max_length] + ('...' if len(page_text) > max_length else '')
+        with self.profiler.stage('inputs_hash'):
+            inputs = self._render_inputs(name, animal_img_path, text=short_text)
+        
+        # Skip if the file is up to date
+        with self.profiler.stage('up_to_date_check'):
+            entry = self._existing_output(name, inputs)
+        if entry is not None:
+            self.profiler.count('skipped')
+            print(f"Page image '{story_id}-{page_num}' is up to date. Skipping.")
+            return entry
+        self.profiler.count('pages_rendered')
         
         # Create background
-        img = self._create_background(PAGE_WIDTH, PAGE_HEIGHT)
+        with self.profiler.stage('background'):
+            img = self._create_background(PAGE_WIDTH, PAGE_HEIGHT)
         
         # Split the image into zones to prevent overlapping
         text_position = 'bottom' if page_num % 2 == 0 else 'top'  # Alternate between top and bottom
@@ -519,24 +882,11 @@ class StoryIllustrationGenerator:
         # Calculate animal position based on text position
         animal_y = 0 if text_position == 'bottom' else text_height
         
-        # Add animal related to story theme
-        theme_keywords = STORY_THEMES.get(story_id, ['animal'])
-        # Use different animals for different pages
-        keyword_index = page_num % len(theme_keywords)
-        animal_img_path = self._find_matching_animal(theme_keywords[keyword_index])
-        
         try:
-            # Open animal image
-            animal = Image.open(animal_img_path)
-            
-            # Calculate dimensions to maintain aspect ratio
-            w, h = animal.size
+            # Scaled sprite, maintaining aspect ratio
             max_dim = min(PAGE_WIDTH, animal_height) * 0.75
-            scale_factor = min(max_dim / w, max_dim / h)
-            new_size = (int(w * scale_factor), int(h * scale_factor))
-            
-            # Resize animal image
-            animal = animal.resize(new_size, Image.LANCZOS)
+            with self.profiler.stage('sprite'):
+                animal, mask = self.sprite_cache.get(animal_img_path, max_dim)
             
             # Position in the animal zone (either top or bottom zone)
             pos_x = random.randint(50, PAGE_WIDTH - animal.width - 50)  # Random horizontal position with margins
@@ -548,88 +898,291 @@ class StoryIllustrationGenerator:
                 # Animal in bottom zone
                 pos_y = animal_y + (animal_height - animal.height) // 2
             
-            # Paste with transparency if available
-            if animal.mode == 'RGBA':
-                r, g, b, a = animal.split()
-                img.paste(animal, (pos_x, pos_y), mask=a)
-            else:
-                img.paste(animal, (pos_x, pos_y))
+            # Paste with transparency using the cached mask
+            with self.profiler.stage('composite'):
+                img.paste(animal, (pos_x, pos_y), mask=mask)
         except Exception as e:
             print(f"Error adding animal image to page: {e}")
         
         # Add text in the appropriate zone
         if page_text:
-            # Use more of the text, but still keep it reasonable
-            max_length = 120
-            short_text = page_text[:max_length] + ('...' if len(page_text) > max_length else '')
-            img = self._add_text_to_image(img, short_text, position=text_position)
+            with self.profiler.stage('text'):
+                img = self._add_text_to_image(img, short_text, position=text_position)
         
         # Save the image
-        img.save(output_path)
-        print(f"Created page image: {output_path}")
-        return output_path
+        with self.profiler.stage('save'):
+            entry = self._save_image(img, name, inputs)
+        self.rendered = True
+        print(f"Created page image: {os.path.join(self.stories_dir, entry['file'])}")
+        return entry
     
     def extract_story_data(self):
         """Extract story data from storyService.ts file"""
         try:
-            with open(self.story_data_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # This is a very simplified parser for the TypeScript file
-            # A more robust solution would use a proper TS parser
-            stories = []
-            current_story = None
-            
-            for line in content.split('\n'):
-                line = line.strip()
-                
-                # Start of a story
-                if line.startswith('id:'):
-                    if current_story:
-                        stories.append(current_story)
-                    current_story = {'pages': []}
-                    current_story['id'] = line.split("'")[1]
-                
-                # Story title
-                elif line.startswith('title:') and current_story:
-                    current_story['title'] = line.split("'")[1]
-                
-                # Page text
-                elif line.startswith('text:') and current_story:
-                    text = line.split("'")[1]
-                    if len(text) < 3:  # Handle multi-line text
-                        text = line.split('`')[1] if '`' in line else ''
-                    current_story['pages'].append({'text': text})
-            
-            # Add the last story
-            if current_story:
-                stories.append(current_story)
-                
-            return stories
+            stories = load_stories(self.story_data_path)
+            return [story for story in stories if story.get('id') and story.get('title')]
         except Exception as e:
             print(f"Error extracting story data: {e}")
             return []
     
-    def generate_all_illustrations(self):
-        """Generate illustrations for all stories"""
-        stories = self.extract_story_data()
+    def _seed_image(self, story_id, page_num):
+        """
+        Reseed the random module for one image, so its background and layout
+        depend only on the base seed and the image, not on which process or
+        in which order it is rendered
+        """
+        random.seed(f"{self.seed}:{story_id}:{page_num}")
+    
+    def render_job(self, job):
+        """
+        Render one ('cover', story_id, title) or ('page', story_id, page_num, text) job
         
+        Returns (manifest entry, None) on success or (None, error message) on failure.
+        """
+        kind, story_id = job[0], job[1]
+        self.rendered = False
+        try:
+            with self.profiler.stage(kind):
+                if kind == 'cover':
+                    self._seed_image(story_id, 0)
+                    return self.create_cover_image(story_id, job[2]), None
+                self._seed_image(story_id, job[2])
+                return self.create_page_image(story_id, job[2], job[3]), None
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+    
+    def run_job(self, job):
+        """
+        Run render_job, capturing its console output for the reporter
+        
+        Returns (entry, error, stdout text, stderr text, rendered, seconds),
+        where rendered is False for an illustration that was up to date.
+        """
+        out, err = io.StringIO(), io.StringIO()
+        start = time.perf_counter()
+        with redirect_stdout(out), redirect_stderr(err):
+            entry, error = self.render_job(job)
+        return entry, error, out.getvalue(), err.getvalue(), self.rendered, time.perf_counter() - start
+    
+    @staticmethod
+    def job_name(job):
+        """Illustration name of a render job, e.g. goldilocks-cover.png"""
+        return f"{job[1]}-cover.png" if job[0] == 'cover' else f"{job[1]}-{job[2]}.png"
+    
+    @staticmethod
+    def story_jobs(stories):
+        """List the cover and page render jobs for the given stories"""
+        jobs = []
         for story in stories:
-            # Generate cover image
-            self.create_cover_image(story['id'], story['title'])
-            
-            # Generate page images
+            # Cover image first, then the page images
+            jobs.append(('cover', story['id'], story['title']))
             for i, page in enumerate(story['pages'], 1):
-                self.create_page_image(story['id'], i, page.get('text', ''))
+                jobs.append(('page', story['id'], i, page.get('text', '')))
+        return jobs
+    
+    def update_illustrations(self, stories, names=None):
+        """
+        Render the named illustrations of the given stories (all of them when
+        names is None, each still skipped if up to date) plus any the manifest
+        doesn't have yet, keeping the entries of the rest. Entries of removed
+        stories and pages are dropped along with their files.
+        
+        Returns (rendered, skipped): the names of the illustrations that were
+        drawn, and of those checked but kept because they were up to date.
+        """
+        render_jobs = self.story_jobs(stories)
+        old_entries = self.manifest['entries']
+        live_names = {self.job_name(job) for job in render_jobs}
+        entries = {name: entry for name, entry in old_entries.items() if name in live_names}
+        rendered, skipped = [], []
+        for job in render_jobs:
+            name = self.job_name(job)
+            if names is not None and name not in names and name in entries:
+                continue
+            entry, error = self.render_job(job)
+            if error:
+                # Keeps the old entry, if any, so the old file stays usable
+                print(f"Error rendering {job[1]} {job[0]}: {error}", file=sys.stderr)
+                continue
+            entries[name] = entry
+            (rendered if self.rendered else skipped).append(name)
+        
+        live_outputs = {output for entry in entries.values() for output in entry.get('outputs', [entry['file']])}
+        remove_stale_outputs(Path(self.stories_dir), old_entries, live_outputs)
+        self.manifest['entries'] = entries
+        save_manifest(self.manifest_path, self.manifest)
+        self.report_adopted(entries, old_entries)
+        return rendered, skipped
+    
+    @staticmethod
+    def report_adopted(entries, old_entries):
+        """
+        Warn about illustrations kept as hand-drawn art that were adopted on
+        this run, or whose story changed after they were adopted: neither is
+        re-rendered until the generator is run with --force
+        """
+        adopted = sorted(name for name, entry in entries.items()
+                         if entry.get('inputs') is None and name not in old_entries)
+        stale = sorted(name for name, entry in entries.items() if entry.get('stale'))
+        if adopted:
+            print(f"\nWarning: adopted {len(adopted)} existing illustrations the generator has no record of "
+                  f"as hand-drawn art: {', '.join(adopted)}", file=sys.stderr)
+        if stale:
+            print(f"\nWarning: {len(stale)} hand-drawn illustrations are older than their story text: "
+                  f"{', '.join(stale)}", file=sys.stderr)
+        if adopted or stale:
+            print("They are never overwritten; rerun with --force to re-render them "
+                  "(see README_story_illustrations.md)", file=sys.stderr)
+    
+    def generate_all_illustrations(self, size_report=None, jobs=1, profile_report=None, cprofile=False,
+                                   trace_memory=False, reporter=None):
+        """
+        Generate illustrations for all stories, optionally across worker processes
+        
+        Progress goes to reporter (a BatchReporter); without one, every
+        illustration's lines are printed as it finishes.
+        
+        With profile_report, per-stage timings and counters (from every
+        worker) are written to that JSON file, with a collapsed-stack file
+        next to it; cprofile and trace_memory add cProfile and tracemalloc
+        data, captured in this process only.
+        """
+        stories = self.extract_story_data()
+        if not stories:
+            # Keep the manifest (and the files it lists) when the stories can't be read
+            print("No stories found; nothing to render")
+            return
+        if profile_report:
+            self.profiler.enabled = True
+            self.profiler.start_capture(cprofile, trace_memory)
+        start_time = time.perf_counter()
+        report = SizeReport(self.formats)
+        render_jobs = self.story_jobs(stories)
+        failed = []
+        entries = {}
+        if reporter is None:
+            reporter = BatchReporter('generate_story_illustrations', verbose=True, progress=False)
+        reporter.total = len(render_jobs)
+        
+        def record(job, entry, error, out, err, rendered, seconds):
+            name = self.job_name(job)
+            if error:
+                failed.append((job, error))
+                reporter.file(name, 'error', seconds, error=f"Error rendering {job[1]} {job[0]}: {error}",
+                              output=out)
+            else:
+                entries[name] = entry
+                output_path = os.path.join(self.stories_dir, entry['file'])
+                report.add(output_path)
+                reporter.file(name, 'rendered' if rendered else 'skipped', seconds,
+                              bytes_out=os.path.getsize(output_path) if rendered else None, output=out)
+            reporter.message(err, sys.stderr)
+        
+        workers = min(resolve_jobs(jobs), len(render_jobs))
+        if workers <= 1:
+            for job in render_jobs:
+                record(job, *self.run_job(job))
+        else:
+            reporter.message(f"Rendering {len(render_jobs)} illustrations with {workers} worker processes...")
+            options = {
+                'formats': self.formats,
+                'quality': self.quality,
+                'use_numpy': self.use_numpy,
+                'sprite_cache_mb': self.sprite_cache_mb,
+                'seed': self.seed,
+                'hashed_names': self.hashed_names,
+                'force': self.force,
+                'profile': self.profiler.enabled,
+            }
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.root_dir, options)) as executor:
+                # map() yields results in submission order, so the log stays stable
+                results = executor.map(_render_job, render_jobs)
+                for job, (result, hits, misses, stages) in zip(render_jobs, results):
+                    if stages:
+                        self.profiler.merge(stages)
+                    # Each worker has its own sprite cache; add up their counters
+                    self.sprite_cache.hits += hits
+                    self.sprite_cache.misses += misses
+                    record(job, *result)
+        reporter.close()
+        
+        # Failed illustrations keep their old entry, so their old file stays usable
+        old_entries = self.manifest['entries']
+        for job, _ in failed:
+            name = self.job_name(job)
+            if name in old_entries:
+                entries[name] = old_entries[name]
+        # Delete files that re-rendered illustrations (or removed pages) no longer use
+        live_outputs = {output for entry in entries.values() for output in entry.get('outputs', [entry['file']])}
+        remove_stale_outputs(Path(self.stories_dir), old_entries, live_outputs)
+        self.manifest['entries'] = entries
+        save_manifest(self.manifest_path, self.manifest)
+        self.report_adopted(entries, old_entries)
+        
+        stats = self.sprite_cache.stats()
+        print(f"Sprite cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)"
+              + ("" if workers > 1 else
+                 f", {stats['evictions']} evictions, {stats['bytes'] / (1024 * 1024):.1f} MB held"))
+        
+        print(f"\nRendered {len(render_jobs) - len(failed)}/{len(render_jobs)} illustrations successfully")
+        if failed:
+            print(f"{len(failed)} failed:")
+            for job, error in failed:
+                print(f"  {self.job_name(job)}: {error}")
+        
+        # Compare extra formats against the PNGs
+        report.print_summary()
+        if size_report and self.formats:
+            report.write(size_report)
+        
+        if profile_report:
+            self.profiler.stop_capture()
+            self.profiler.print_summary()
+            paths = self.profiler.write_report(profile_report, {
+                'wall_seconds': round(time.perf_counter() - start_time, 3),
+                'jobs': workers,
+                'illustrations': len(render_jobs),
+                'failed': len(failed),
+                'sprite_cache': self.sprite_cache.stats(),
+            })
+            print(f"Profile written to: {', '.join(str(path) for path in paths)}")
 
 if __name__ == "__main__":
-    # Get the workspace root directory
-    if len(sys.argv) > 1:
-        root_dir = sys.argv[1]
-    else:
-        # Assume script is in the tools directory
-        root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Generate story illustrations for the Kids Learn App")
+    # Assume script is in the tools directory
+    parser.add_argument("root_dir", nargs="?",
+                        default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help="Workspace root directory")
+    add_format_arguments(parser)
+    parser.add_argument("--no-numpy", action="store_true",
+                        help="Draw backgrounds with ImageDraw even when NumPy is installed")
+    parser.add_argument("--jobs", default=1, type=int,
+                        help="Number of worker processes (0 = one per CPU core, default: 1)")
+    parser.add_argument("--seed", default=DEFAULT_SEED, type=int,
+                        help=f"Base random seed; the same seed gives the same images (default: {DEFAULT_SEED})")
+    parser.add_argument("--hashed-names", action="store_true",
+                        help="Name files after their content hash, e.g. goldilocks-1.3f9a0c1b2d.png")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-render every illustration, including ones the generator didn't make")
+    parser.add_argument("--sprite-cache-mb", default=SPRITE_CACHE_MB, type=float,
+                        help=f"Memory cap for cached animal sprites in MB (default: {SPRITE_CACHE_MB})")
+    parser.add_argument("--profile", default=None, metavar="REPORT.json",
+                        help="Write per-stage timings to this JSON file, plus a .folded flame graph file")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="With --profile, also capture cProfile data (main process only; use --jobs 1)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="With --profile, also record allocations with tracemalloc (main process only)")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    if (args.cprofile or args.trace_memory) and not args.profile:
+        parser.error("--cprofile and --trace-memory need --profile")
     
-    generator = StoryIllustrationGenerator(root_dir)
-    generator.generate_all_illustrations()
+    generator = StoryIllustrationGenerator(args.root_dir, formats=args.formats, quality=quality_from_args(args),
+                                           use_numpy=False if args.no_numpy else None,
+                                           sprite_cache_mb=args.sprite_cache_mb, seed=args.seed,
+                                           hashed_names=args.hashed_names, force=args.force)
+    generator.generate_all_illustrations(size_report=args.size_report, jobs=args.jobs, profile_report=args.profile,
+                                         cprofile=args.cprofile, trace_memory=args.trace_memory,
+                                         reporter=reporter_from_args('generate_story_illustrations', args))
     print("Illustration generation complete!")
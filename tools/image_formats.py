@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Extra Output Formats for Kids Learn Image Tools
+
+Shared helpers that let the image tools write WebP (and AVIF, when the
+installed Pillow supports it) next to each PNG, from the same in-memory
+image, and report how much each format saves compared to the PNG. Also
+encodes the tiny blurred placeholders shown while an image loads.
+
+Used by optimize_animal_images.py and generate_story_illustrations.py.
+
+Requirements:
+- PIL (Pillow) library: pip install Pillow
+- AVIF needs Pillow 11.3+ or the pillow-avif-plugin package
+"""
+
+import os
+import io
+import json
+import base64
+import argparse
+import warnings
+from pathlib import Path
+from PIL import Image, ImageFilter, features
+
+try:
+    # Older Pillow releases only get AVIF through this plugin
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pillow_avif = None
+
+# Default encoder quality per format (0-100)
+DEFAULT_QUALITY = {
+    "webp": 80,
+    "avif": 60,
+}
+
+# Pillow format names and encoder options for each extra format
+FORMAT_OPTIONS = {
+    "webp": ("WEBP", {"method": 6}),
+    "avif": ("AVIF", {"speed": 6}),
+}
+
+
+def format_supported(fmt):
+    """
+    Check whether the installed Pillow can encode the given extra format
+    """
+    with warnings.catch_warnings():
+        # Pillow warns about unknown feature names on older releases
+        warnings.simplefilter("ignore")
+        try:
+            return bool(features.check(fmt))
+        except ValueError:
+            return False
+
+
+def available_formats():
+    """
+    List the extra formats the installed Pillow can encode
+    """
+    return [fmt for fmt in FORMAT_OPTIONS if format_supported(fmt)]
+
+
+def parse_formats(value):
+    """
+    Parse a --formats value such as "webp,avif". Formats the installed
+    Pillow can't encode are dropped with a warning.
+    """
+    formats = []
+    for part in value.split(","):
+        fmt = part.strip().lower()
+        if not fmt or fmt == "png":
+            continue
+        if fmt not in FORMAT_OPTIONS:
+            raise argparse.ArgumentTypeError(f"unsupported format: {fmt!r} (choose from {', '.join(FORMAT_OPTIONS)})")
+        if not format_supported(fmt):
+            print(f"Warning: this Pillow build can't encode {fmt.upper()}, skipping it")
+            continue
+        if fmt not in formats:
+            formats.append(fmt)
+    return formats
+
+
+def add_format_arguments(parser):
+    """
+    Add the shared --formats/--webp-quality/--avif-quality/--size-report options
+    """
+    parser.add_argument("--formats", default=[], type=parse_formats,
+                        help="Extra formats to write next to each PNG, e.g. webp,avif")
+    for fmt, quality in DEFAULT_QUALITY.items():
+        parser.add_argument(f"--{fmt}-quality", default=quality, type=int,
+                            help=f"{fmt.upper()} encoder quality (default: {quality})")
+    parser.add_argument("--size-report", default=None,
+                        help="Write a JSON report comparing each format's size to the PNG")
+
+
+def quality_from_args(args):
+    """
+    Collect the per-format quality settings from parsed arguments
+    """
+    return {fmt: getattr(args, f"{fmt}_quality") for fmt in DEFAULT_QUALITY}
+
+
+# Longest side of a placeholder thumbnail, in pixels
+PLACEHOLDER_SIZE = 16
+
+
+def placeholder_data_uri(img, size=PLACEHOLDER_SIZE):
+    """
+    Encode a tiny, slightly blurred thumbnail of img as a data URI, small
+    enough to inline in a JSON manifest
+
+    WebP keeps a 16px thumbnail near 100 bytes; without WebP support a
+    32-colour PNG (about 300 bytes) is used instead.
+    """
+    mode = "RGBA" if img.mode in ("RGBA", "LA", "P") or "A" in img.getbands() else "RGB"
+    thumb = img.convert(mode)
+    thumb.thumbnail((size, size), Image.BOX)
+    thumb = thumb.filter(ImageFilter.GaussianBlur(0.5))
+    buffer = io.BytesIO()
+    if format_supported("webp"):
+        thumb.save(buffer, "WEBP", quality=40)
+        mime = "image/webp"
+    else:
+        thumb.quantize(32).save(buffer, "PNG", optimize=True)
+        mime = "image/png"
+    return f"data:{mime};base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def format_path(png_path, fmt):
+    """
+    Path of the extra-format sibling of a PNG, e.g. bear.png -> bear.webp
+    """
+    return Path(png_path).with_suffix(f".{fmt}")
+
+
+def save_extra_formats(img, png_path, formats, quality=None):
+    """
+    Encode img in each extra format next to png_path, keeping any alpha channel
+
+    Returns a dict of format -> written path.
+    """
+    quality = {**DEFAULT_QUALITY, **(quality or {})}
+    written = {}
+    for fmt in formats:
+        pil_format, options = FORMAT_OPTIONS[fmt]
+        # WebP and AVIF both store alpha, so only palette images need converting
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        elif img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        target = format_path(png_path, fmt)
+        img.save(target, pil_format, quality=quality[fmt], **options)
+        written[fmt] = target
+    return written
+
+
+class SizeReport:
+    """
+    Collects PNG vs. extra-format byte sizes and summarizes the savings
+    """
+
+    def __init__(self, formats):
+        self.formats = list(formats)
+        self.rows = []
+
+    def add(self, png_path, formats=None):
+        """
+        Record the on-disk size of a PNG and its extra-format siblings
+        """
+        png_path = Path(png_path)
+        if not png_path.exists():
+            return
+        row = {"file": png_path.name, "png": png_path.stat().st_size}
+        for fmt in formats or self.formats:
+            sibling = format_path(png_path, fmt)
+            if sibling.exists():
+                row[fmt] = sibling.stat().st_size
+        self.rows.append(row)
+
+    def totals(self):
+        """
+        Total bytes per format, only counting files that have that format
+        """
+        totals = {}
+        for fmt in self.formats:
+            rows = [row for row in self.rows if fmt in row]
+            png_bytes = sum(row["png"] for row in rows)
+            fmt_bytes = sum(row[fmt] for row in rows)
+            totals[fmt] = {
+                "files": len(rows),
+                "png_bytes": png_bytes,
+                "bytes": fmt_bytes,
+                "saving": 1 - fmt_bytes / png_bytes if png_bytes else 0.0,
+            }
+        return totals
+
+    def print_summary(self):
+        """
+        Print a short per-format comparison against PNG
+        """
+        if not self.rows or not self.formats:
+            return
+        print(f"\nSize report ({len(self.rows)} images, PNG total {sum(row['png'] for row in self.rows) / 1024:.1f} KB):")
+        for fmt, total in self.totals().items():
+            print(f"  {fmt.upper():5} {total['bytes'] / 1024:10.1f} KB vs PNG {total['png_bytes'] / 1024:10.1f} KB"
+                  f"  ({-total['saving']:+.1%}, {total['files']} files)")
+
+    def write(self, report_path):
+        """
+        Write the full per-file report as JSON
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"formats": self.formats, "totals": self.totals(), "files": self.rows}, f, indent=2)
+        print(f"Size report written to: {report_path}")
@@ -6,19 +6,48 @@ This script optimizes animal images by:
 1. Resizing to 256x256 pixels
 2. Optimizing PNG compression
 3. Preserving transparency
-4. Ensuring all images are in PNG format
+4. Ensuring all images are in PNG format, optionally with WebP/AVIF copies
+   or as 8-bit palette PNGs when that is visually lossless. Sources can be
+   PNG, WebP, JPEG or JFIF; large JPEGs are decoded at reduced scale and
+   EXIF orientation is applied
+5. Skipping images whose source and settings are unchanged since the last run
+6. Writing a tiny blurred placeholder of every image to placeholders.json
 
 Usage:
 python optimize_animal_images.py
+python optimize_animal_images.py --jobs 8
+python optimize_animal_images.py --force
+python optimize_animal_images.py --sizes 64,128,256,512
+python optimize_animal_images.py --formats webp,avif --size-report size_report.json
+python optimize_animal_images.py --quantize --max-delta-e 1.5
+python optimize_animal_images.py --events optimize.jsonl --verbose
 """
 
 import os
 import sys
+import io
+import json
+import hashlib
+import math
+import time
+import itertools
+from contextlib import redirect_stdout, redirect_stderr
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from PIL import Image, ImageOps
+from PIL import Image, ImageCms, ImageOps, features
 import shutil
 import argparse
 
+from batch_report import BatchReporter, add_report_arguments, reporter_from_args
+from image_formats import (PLACEHOLDER_SIZE, SizeReport, add_format_arguments, format_path, placeholder_data_uri,
+                           quality_from_args, save_extra_formats)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Default paths - using absolute paths for clarity
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
@@ -26,50 +55,493 @@ SRC_DIR = PROJECT_ROOT / "src" / "resources" / "images" / "animals"
 OUTPUT_DIR = PROJECT_ROOT / "public" / "images" / "animals"
 TARGET_SIZE = (256, 256)
 
+# Bump whenever the encoding pipeline changes so cached outputs get rebuilt
+PIPELINE_VERSION = 2
+MANIFEST_VERSION = 1
+VARIANT_MANIFEST_NAME = "variants.json"
+PLACEHOLDER_MANIFEST_NAME = "placeholders.json"
+
+# Palette quantization: mean CIE76 delta-E allowed against the truecolour
+# output (about 2.3 is the just-noticeable difference)
+DEFAULT_MAX_DELTA_E = 1.5
+PALETTE_COLORS = 256
+
+# Source formats, lossless first: when two sources share a name, the first wins
+SOURCE_EXTENSIONS = [".png", ".webp", ".jpg", ".jpeg", ".jfif"]
+JPEG_EXTENSIONS = {".jpg", ".jpeg", ".jfif"}
+EXIF_ORIENTATION = 0x0112
+
+# Reduced-scale decoding keeps sources at least this many times the size
+# they are resampled to, so the final Lanczos pass still has detail to use
+REDUCING_GAP = 2
+# Largest source decoded, in pixels after JPEG scaling: about 256 MB as RGBA
+MAX_DECODE_PIXELS = 64_000_000
 
-def optimize_image(image_path, output_path, size=TARGET_SIZE):
+
+def list_source_images(source_path):
+    """
+    Source images in a directory, in name order
+
+    When several sources share a name (bear.png and bear.jpg), only one can
+    own bear.png in the output: lossless formats win and the rest are skipped
+    with a warning.
+    """
+    by_stem = {}
+    with os.scandir(source_path) as entries:
+        for entry in entries:
+            suffix = Path(entry.name).suffix.lower()
+            if suffix in SOURCE_EXTENSIONS and entry.is_file():
+                by_stem.setdefault(Path(entry.name).stem, []).append(Path(entry.path))
+    
+    image_files = []
+    for stem, paths in sorted(by_stem.items()):
+        paths.sort(key=lambda path: (SOURCE_EXTENSIONS.index(path.suffix.lower()), path.name))
+        image_files.append(paths[0])
+        for skipped in paths[1:]:
+            print(f"Skipping {skipped.name}: {paths[0].name} already produces {stem}.png", file=sys.stderr)
+    return image_files
+
+
+def load_source_image(image_path, max_size=None, max_pixels=MAX_DECODE_PIXELS):
+    """
+    Decode a source image (PNG, WebP, JPEG or JFIF) upright, as RGB or RGBA
+
+    max_size is the largest box the image will be fitted into. When given,
+    the image is shrunk by a whole factor as it is decoded: JPEG/JFIF
+    sources are decoded straight at 1/2, 1/4 or 1/8 scale with draft(), and
+    any source is then box-filtered with reduce(), keeping it at least
+    REDUCING_GAP times the size it will be resampled to. EXIF orientation
+    is applied, and JPEG sources are opaque RGB.
+
+    Sources with more than max_pixels pixels (after JPEG scaling) are
+    rejected before decoding, which caps the memory one image can take.
+    """
+    image_path = Path(image_path)
+    img = Image.open(image_path)
+    is_jpeg = img.format == "JPEG" or image_path.suffix.lower() in JPEG_EXTENSIONS
+    
+    if max_size:
+        # The box is given upright; the stored pixels may be rotated by 90 degrees
+        if img.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+            max_size = max_size[::-1]
+        if is_jpeg:
+            img.draft("RGB", (max_size[0] * REDUCING_GAP, max_size[1] * REDUCING_GAP))
+    
+    if max_pixels and img.width * img.height > max_pixels:
+        img.close()
+        raise ValueError(f"{image_path.name} is {img.width}x{img.height}, over the "
+                         f"{max_pixels / 1e6:.0f} megapixel decode limit")
+    
+    # Normalise the mode before reduce(), which doesn't take palette or
+    # 1-bit images and would drop a greyscale transparency entry
+    if is_jpeg:
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+    elif img.mode not in ("RGB", "RGBA"):
+        # Palette and greyscale sources would otherwise resize with nearest neighbour
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        img = img.convert("RGBA" if has_alpha else "RGB")
+    
+    if max_size:
+        factor = int(max(img.width / max_size[0], img.height / max_size[1]) / REDUCING_GAP)
+        if factor >= 2:
+            img = img.reduce(factor)
+    
+    # In place, so an upright source isn't copied
+    ImageOps.exif_transpose(img, in_place=True)
+    return img
+
+
+def pad_to_size(img, size):
+    """
+    Center an image on a blank canvas of exactly the given size
+    """
+    if img.size == size:
+        return img
+    background = Image.new(img.mode, size, (255, 255, 255, 0) if img.mode == "RGBA" else (255, 255, 255))
+    offset = ((size[0] - img.size[0]) // 2, (size[1] - img.size[1]) // 2)
+    background.paste(img, offset)
+    return background
+
+
+def variant_path(output_path, width):
+    """
+    Output path of a responsive variant, e.g. bear.png -> bear-128.png
+    """
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}-{width}.png")
+
+
+def variant_outputs(output_path, size, variant_sizes):
+    """
+    Map each variant width to its PNG file name. The width matching the main
+    size reuses the main output instead of writing a duplicate file.
+    """
+    output_path = Path(output_path)
+    outputs = {size[0]: output_path.name}
+    for width in variant_sizes or ():
+        if width != size[0]:
+            outputs[width] = variant_path(output_path, width).name
+    return dict(sorted(outputs.items()))
+
+
+def _to_lab(img):
+    """
+    Flatten an image onto white (how the cards display it) and convert to CIE Lab
+    """
+    flat = Image.new("RGB", img.size, (255, 255, 255))
+    rgba = img.convert("RGBA")
+    flat.paste(rgba, mask=rgba.getchannel("A"))
+    transform = ImageCms.buildTransformFromOpenProfiles(
+        ImageCms.createProfile("sRGB"), ImageCms.createProfile("LAB"), "RGB", "LAB")
+    return ImageCms.applyTransform(flat, transform)
+
+
+def mean_delta_e(reference, candidate):
+    """
+    Mean CIE76 delta-E between two images of the same size
+    """
+    # 8-bit Lab from littleCMS stores L as 0-255 for 0-100 and a/b offset by 128
+    l_scale = 100 / 255
+    ref_lab = _to_lab(reference).tobytes()
+    cand_lab = _to_lab(candidate).tobytes()
+    if np is not None:
+        diff = (np.frombuffer(ref_lab, np.uint8).astype(np.float32)
+                - np.frombuffer(cand_lab, np.uint8).astype(np.float32)).reshape(-1, 3)
+        diff[:, 0] *= l_scale
+        return float(np.sqrt((diff * diff).sum(axis=1)).mean())
+    
+    total = 0.0
+    for i in range(0, len(ref_lab), 3):
+        dl = (ref_lab[i] - cand_lab[i]) * l_scale
+        da = ref_lab[i + 1] - cand_lab[i + 1]
+        db = ref_lab[i + 2] - cand_lab[i + 2]
+        total += math.sqrt(dl * dl + da * da + db * db)
+    return total / (reference.width * reference.height)
+
+
+def quantize_image(img, max_delta_e=DEFAULT_MAX_DELTA_E, colors=PALETTE_COLORS):
+    """
+    Convert an image to an 8-bit palette (keeping alpha) if the result stays
+    within max_delta_e of the truecolour image
+
+    Returns (image_to_save, delta_e), where image_to_save is the original
+    image when the palette version would be visibly different.
+    """
+    source = img.convert("RGBA")
+    opaque = source.getchannel("A").getextrema()[0] == 255
+    if features.check("libimagequant"):
+        # Best palettes, alpha included, when Pillow is built with it
+        palette = source.quantize(colors=colors, method=Image.Quantize.LIBIMAGEQUANT, dither=Image.Dither.NONE)
+    elif opaque:
+        # Median cut gives the closest built-in palettes but can't do alpha
+        palette = source.convert("RGB").quantize(colors=colors, method=Image.Quantize.MEDIANCUT,
+                                                 dither=Image.Dither.NONE)
+    else:
+        palette = source.quantize(colors=colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    delta_e = mean_delta_e(source, palette)
+    if delta_e > max_delta_e:
+        return img, delta_e
+    return palette, delta_e
+
+
+def optimize_image(image_path, output_path, size=TARGET_SIZE, variant_sizes=None, formats=None, quality=None,
+                   max_delta_e=None, fast_decode=True):
     """
     Optimize a single image
+
+    When variant_sizes is given, square variants (e.g. bear-64.png) are
+    written as well. The source is decoded once and each smaller size is
+    resampled from the previous, larger one.
+
+    With fast_decode (the default), large sources are shrunk by a whole
+    factor while decoding (see load_source_image) before the Lanczos
+    resample; without it they are fully decoded first.
+
+    Each PNG also gets a sibling in every extra format (e.g. bear.webp),
+    encoded from the same resized image with the given per-format quality.
+
+    With max_delta_e set, each PNG is saved as an 8-bit palette image when
+    its mean delta-E against the truecolour version is within the threshold,
+    otherwise it falls back to truecolour.
+
+    Returns the image's placeholder data URI, made from the smallest resized
+    image, or None if the image failed.
     """
     try:
-        # Open the image
-        img = Image.open(image_path)
+        size = tuple(size)
+        targets = sorted({size} | {(width, width) for width in variant_sizes or ()}, reverse=True)
+        # Open the image; only the largest target size needs to be covered
+        img = load_source_image(Path(image_path), targets[0] if fast_decode else None)
         
-        # Convert JFIF to PNG or maintain existing format
-        if img.format == "JPEG" or image_path.suffix.lower() in [".jfif", ".jpg", ".jpeg"]:
-            # Create a white background for JPEG images
-            background = Image.new("RGBA", img.size, (255, 255, 255, 255))
-            if img.mode != "RGBA":
-                img = img.convert("RGBA")
-            background.paste(img, mask=img.split()[3] if len(img.split()) > 3 else None)
-            img = background.convert("RGB")
-        
-        # Resize the image while maintaining aspect ratio
-        img = ImageOps.contain(img, size)
-        
-        # If the image isn't exactly the target size, paste it onto a blank background
-        if img.size != size:
-            background = Image.new(img.mode, size, (255, 255, 255, 0) if img.mode == "RGBA" else (255, 255, 255))
-            offset = ((size[0] - img.size[0]) // 2, (size[1] - img.size[1]) // 2)
-            background.paste(img, offset)
-            img = background
-            
         # Save the optimized image
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Save with optimal compression
-        img.save(output_path, "PNG", optimize=True, quality=90)
-        print(f"Optimized: {image_path} -> {output_path}")
-        return True
+        # Step down from the largest requested size so each resample starts
+        # from the closest larger image rather than the full-size source
+        for target in targets:
+            # Resize the image while maintaining aspect ratio
+            img = ImageOps.contain(img, target)
+            
+            # If the image isn't exactly the target size, paste it onto a blank background
+            padded = pad_to_size(img, target)
+            target_path = output_path if target == size else variant_path(output_path, target[0])
+            
+            # Save with optimal compression
+            if max_delta_e is None:
+                padded.save(target_path, "PNG", optimize=True, quality=90)
+                print(f"Optimized: {image_path} -> {target_path}")
+            else:
+                encoded, delta_e = quantize_image(padded, max_delta_e)
+                encoded.save(target_path, "PNG", optimize=True, quality=90)
+                kind = "palette" if encoded.mode == "P" else "truecolour fallback"
+                print(f"Optimized: {image_path} -> {target_path} ({kind}, mean delta-E {delta_e:.2f})")
+            
+            for extra_path in save_extra_formats(padded, target_path, formats or (), quality).values():
+                print(f"Optimized: {image_path} -> {extra_path}")
+        
+        # The last target is the smallest, so the placeholder needs the least downscaling
+        return placeholder_data_uri(padded)
     
     except Exception as e:
         print(f"Error processing {image_path}: {e}", file=sys.stderr)
-        return False
+        return None
+
+
+def _optimize_job(job):
+    """
+    Run optimize_image in a worker process, capturing its console output
+    so the parent can replay it in submission order
+    """
+    image_path, output_path, options = job
+    out, err = io.StringIO(), io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(out), redirect_stderr(err):
+        placeholder = optimize_image(image_path, output_path, **options)
+    return placeholder, out.getvalue(), err.getvalue(), time.perf_counter() - start
+
+
+def stream_jobs(func, jobs, workers=1, on_pool=None):
+    """
+    Yield (job, func(job)) for every job, in order
+
+    With workers > 1 the jobs run across a process pool, but at most two
+    per worker are in flight, so a lazy job iterator is consumed as the pool
+    works through it instead of all at once. The pool is only started once
+    there are at least two jobs, with no more workers than there are jobs;
+    on_pool(worker count), if given, is called when it starts.
+    """
+    jobs = iter(jobs)
+    # Look ahead far enough to fill the pool before starting it
+    queued = list(itertools.islice(jobs, workers * 2)) if workers > 1 else []
+    if workers <= 1 or len(queued) < 2:
+        for job in itertools.chain(queued, jobs):
+            yield job, func(job)
+        return
+    
+    workers = min(workers, len(queued))
+    if on_pool is not None:
+        on_pool(workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque((job, executor.submit(func, job)) for job in queued)
+        for job in jobs:
+            pending.append((job, executor.submit(func, job)))
+            if len(pending) >= workers * 2:
+                done_job, future = pending.popleft()
+                yield done_job, future.result()
+        # Results are taken in submission order, so the log stays stable
+        while pending:
+            done_job, future = pending.popleft()
+            yield done_job, future.result()
 
 
-def batch_optimize(source_dir, output_dir, size=TARGET_SIZE):
+def resolve_jobs(jobs):
+    """
+    Turn the --jobs value into a worker count (0 or less means one per core)
+    """
+    if jobs is None or jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def build_settings(size, variant_sizes=None, formats=None, quality=None, max_delta_e=None, fast_decode=True):
+    """
+    Describe every setting that affects the bytes written for an image
+    """
+    return {
+        "pipeline": PIPELINE_VERSION,
+        "size": list(size),
+        "variants": sorted(variant_sizes or []),
+        "formats": {fmt: (quality or {}).get(fmt) for fmt in formats or ()},
+        "quantize": None if max_delta_e is None else {"max_delta_e": max_delta_e, "colors": PALETTE_COLORS},
+        "fast_decode": {"reducing_gap": REDUCING_GAP} if fast_decode else None,
+        "format": "PNG",
+        "optimize": True,
+        "placeholder": PLACEHOLDER_SIZE,
+    }
+
+
+def settings_hash(settings):
+    """
+    Stable hash of a settings dictionary
+    """
+    payload = json.dumps(settings, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def file_hash(path):
+    """
+    SHA-256 of a file's contents, read in chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_manifest_path(output_dir):
+    """
+    The build manifest lives next to the output directory, e.g.
+    public/images/.animals.optimize-cache.json
+    """
+    output_dir = Path(output_dir)
+    return output_dir.parent / f".{output_dir.name}.optimize-cache.json"
+
+
+def load_manifest(manifest_path):
+    """
+    Load the build manifest, returning an empty one if it is missing or unreadable
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "entries": {}}
+
+
+def save_manifest(manifest_path, manifest):
+    """
+    Write the build manifest atomically
+    """
+    manifest_path = Path(manifest_path)
+    os.makedirs(manifest_path.parent, exist_ok=True)
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def source_fingerprint(image_path, entry):
+    """
+    Return (size, mtime_ns, sha256) for a source file. The hash from the
+    previous manifest entry is reused when size and mtime are unchanged,
+    so a no-op run doesn't have to read every source.
+    """
+    stat = image_path.stat()
+    if entry and entry.get("bytes") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+        return stat.st_size, stat.st_mtime_ns, entry["source_hash"]
+    return stat.st_size, stat.st_mtime_ns, file_hash(image_path)
+
+
+def write_variant_manifest(output_path, entries, size, variant_sizes, formats=None):
+    """
+    Write variants.json into the output directory so the front end can pick
+    the smallest variant that fits the slot it is rendering into
+    """
+    images = {}
+    for name, entry in sorted(entries.items()):
+        variants = entry.get("variants", {})
+        images[Path(name).stem.lower()] = [
+            {
+                "width": int(width),
+                "height": int(width),
+                "file": file_name,
+                "formats": {fmt: format_path(file_name, fmt).name for fmt in formats or ()},
+            }
+            for width, file_name in sorted(variants.items(), key=lambda item: int(item[0]))
+        ]
+    manifest = {
+        "defaultSize": size[0],
+        "sizes": sorted(set(variant_sizes) | {size[0]}),
+        "images": images,
+    }
+    manifest_file = Path(output_path) / VARIANT_MANIFEST_NAME
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Wrote variant manifest: {manifest_file}")
+
+
+def write_placeholder_manifest(output_path, entries):
+    """
+    Write placeholders.json into the output directory: PNG file name ->
+    blurred placeholder data URI, for the front end to show while loading
+    """
+    placeholders = {
+        Path(name).with_suffix(".png").name: entry["placeholder"]
+        for name, entry in sorted(entries.items()) if entry.get("placeholder")
+    }
+    manifest_file = Path(output_path) / PLACEHOLDER_MANIFEST_NAME
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(placeholders, f, indent=2)
+    print(f"Wrote placeholder manifest: {manifest_file}")
+
+
+def output_names(png_names, formats):
+    """
+    All file names written for a set of PNG outputs, including extra formats
+    """
+    names = set(png_names)
+    for png_name in png_names:
+        names.update(format_path(png_name, fmt).name for fmt in formats or ())
+    return sorted(names)
+
+
+def remove_stale_outputs(output_path, stale_entries, live_outputs):
+    """
+    Delete outputs recorded in old manifest entries (deleted sources, dropped
+    variant sizes), leaving any output that a current source still produces
+    """
+    for name, entry in sorted(stale_entries.items()):
+        for output_name in entry.get("outputs", []):
+            stale_file = output_path / output_name
+            if output_name not in live_outputs and stale_file.exists():
+                stale_file.unlink()
+                print(f"Removed stale output: {stale_file} (from {name})")
+
+
+def batch_optimize(source_dir, output_dir, size=TARGET_SIZE, jobs=1, manifest_path=None, force=False,
+                   variant_sizes=None, formats=None, quality=None, size_report=None, max_delta_e=None,
+                   fast_decode=True, reporter=None):
     """
     Process all images in the source directory
+
+    Sources are streamed: each one is hashed, and if needed decoded and
+    encoded, as it comes up, rather than the whole directory being read
+    first. With jobs > 1 the images are spread across a process pool.
+    Results are still reported in the same (sorted) order as the serial path.
+
+    A manifest of source hashes and settings is kept next to the output
+    directory; images that are already current are skipped unless force is
+    set, and outputs whose sources were removed are deleted.
+
+    With variant_sizes, each image also gets square variants at those widths
+    and a variants.json manifest is written to the output directory.
+
+    With formats (e.g. ["webp", "avif"]), each PNG gets siblings in those
+    formats and a PNG vs. format size comparison is printed; size_report
+    names a JSON file for the full per-file report.
+
+    With max_delta_e set, PNGs are palette-quantized where that stays
+    within the delta-E threshold (see quantize_image).
+
+    fast_decode is passed on to optimize_image.
+
+    Progress goes to reporter (a BatchReporter); without one, every file's
+    lines are printed as they finish.
     """
     source_path = Path(source_dir).resolve()
     output_path = Path(output_dir).resolve()
@@ -81,35 +553,160 @@ def batch_optimize(source_dir, output_dir, size=TARGET_SIZE):
     # Create output directory if it doesn't exist
     os.makedirs(output_path, exist_ok=True)
     
-    # Get only PNG image files
-    image_files = []
-    for ext in [".png"]:
-        image_files.extend(list(source_path.glob(f"*{ext}")))
-        image_files.extend(list(source_path.glob(f"*{ext.upper()}")))
+    # Only the names are listed up front; each source is hashed and decoded
+    # as it streams through the pipeline
+    image_files = list_source_images(source_path)
     
     if not image_files:
-        print(f"No PNG image files found in {source_path}")
+        print(f"No source images ({', '.join(SOURCE_EXTENSIONS)}) found in {source_path}")
         return False
     
+    if reporter is None:
+        reporter = BatchReporter("optimize_animal_images", verbose=True, progress=False)
+    if reporter.total is None:
+        reporter.total = len(image_files)
+    
+    manifest_path = Path(manifest_path) if manifest_path else default_manifest_path(output_path)
+    manifest = load_manifest(manifest_path)
+    old_entries = manifest["entries"]
+    new_entries = {}
+    formats = list(formats or [])
+    options = {"size": size, "variant_sizes": variant_sizes, "formats": formats, "quality": quality,
+               "max_delta_e": max_delta_e, "fast_decode": fast_decode}
+    settings_key = settings_hash(build_settings(size, variant_sizes, formats, quality, max_delta_e, fast_decode))
+    
+    source_names = {img_file.name for img_file in image_files}
+    live_outputs = {
+        name for img_file in image_files
+        for name in output_names(variant_outputs(output_path / f"{img_file.stem}.png", size, variant_sizes).values(),
+                                 formats)
+    }
+    remove_stale_outputs(output_path, {
+        name: entry for name, entry in old_entries.items() if name not in source_names
+    }, live_outputs)
+    
+    pending_entries = {}
+    
+    def plan_jobs():
+        """
+        Yield a job for every image that actually needs to be re-encoded,
+        recording the entries of up-to-date images along the way
+        """
+        for img_file in image_files:
+            # Create output file path with .png extension
+            output_file = output_path / f"{img_file.stem}.png"
+            variants = variant_outputs(output_file, size, variant_sizes)
+            outputs = output_names(variants.values(), formats)
+            entry = old_entries.get(img_file.name)
+            byte_size, mtime_ns, source_hash = source_fingerprint(img_file, entry)
+            new_entry = {
+                "bytes": byte_size,
+                "mtime_ns": mtime_ns,
+                "source_hash": source_hash,
+                "settings_hash": settings_key,
+                "outputs": outputs,
+                "variants": {str(width): name for width, name in variants.items()},
+            }
+            up_to_date = (
+                not force
+                and entry is not None
+                and entry.get("source_hash") == source_hash
+                and entry.get("settings_hash") == settings_key
+                and all((output_path / name).exists() for name in entry.get("outputs", []))
+            )
+            if up_to_date:
+                new_entry["placeholder"] = entry.get("placeholder")
+                new_entries[img_file.name] = new_entry
+                reporter.file(img_file.name, "skipped", bytes_in=byte_size)
+            else:
+                pending_entries[img_file.name] = new_entry
+                yield img_file, output_file, options
+    
+    def announce(workers):
+        reporter.message(f"Optimizing with {workers} worker processes...")
+    
     # Process each image
     success_count = 0
-    for img_file in image_files:
-        # Create output file path with .png extension
-        output_file = output_path / f"{img_file.stem}.png"
-        if optimize_image(img_file, output_file, size):
+    processed = 0
+    results = stream_jobs(_optimize_job, plan_jobs(), resolve_jobs(jobs), announce)
+    for (img_file, _, _), (placeholder, out, err, seconds) in results:
+        processed += 1
+        entry = pending_entries[img_file.name]
+        if placeholder:
             success_count += 1
+            new_entries[img_file.name] = dict(entry, placeholder=placeholder)
+            bytes_out = sum(os.path.getsize(output_path / name) for name in entry["outputs"]
+                            if (output_path / name).exists())
+            reporter.file(img_file.name, "optimized", seconds, entry["bytes"], bytes_out, output=out)
+            reporter.message(err, sys.stderr)
+        else:
+            reporter.file(img_file.name, "error", seconds, entry["bytes"], error=err.strip() or "failed", output=out)
+    reporter.close()
     
-    print(f"\nOptimization complete: {success_count}/{len(image_files)} images processed successfully")
+    # Drop outputs that re-encoded images no longer produce (e.g. removed variant sizes)
+    remove_stale_outputs(output_path, {
+        name: old_entries[name] for name in new_entries if name in old_entries
+    }, live_outputs)
+    
+    # Failed images are left out of the manifest so the next run retries them
+    manifest["entries"] = new_entries
+    save_manifest(manifest_path, manifest)
+    
+    write_placeholder_manifest(output_path, new_entries)
+    if variant_sizes:
+        write_variant_manifest(output_path, new_entries, size, variant_sizes, formats)
+    
+    if formats:
+        report = SizeReport(formats)
+        for entry in new_entries.values():
+            for name in entry.get("variants", {}).values():
+                report.add(output_path / name)
+        report.print_summary()
+        if size_report:
+            report.write(size_report)
+    
+    skipped = len(image_files) - processed
+    print(f"\nOptimization complete: {success_count}/{processed} images processed successfully"
+          f" ({skipped} already up to date)")
     return True
 
 
+def parse_sizes(value):
+    """
+    Parse a --sizes value such as "64,128,256,512"
+    """
+    try:
+        sizes = sorted({int(part) for part in value.split(",") if part.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size list: {value!r}")
+    if not sizes or min(sizes) <= 0:
+        raise argparse.ArgumentTypeError(f"sizes must be positive integers: {value!r}")
+    return sizes
+
+
 def main():
     parser = argparse.ArgumentParser(description="Optimize animal images for the Kids Learn App")
     parser.add_argument("--src", default=SRC_DIR, help="Source directory with original images")
     parser.add_argument("--out", default=OUTPUT_DIR, help="Output directory for optimized images")
     parser.add_argument("--size", default=256, type=int, help="Target image size (square)")
+    parser.add_argument("--sizes", default=None, type=parse_sizes,
+                        help="Comma-separated responsive variant sizes, e.g. 64,128,256,512")
+    add_format_arguments(parser)
+    parser.add_argument("--quantize", action="store_true",
+                        help="Save 8-bit palette PNGs where they are visually identical to truecolour")
+    parser.add_argument("--max-delta-e", default=DEFAULT_MAX_DELTA_E, type=float,
+                        help=f"Mean delta-E allowed for --quantize (default: {DEFAULT_MAX_DELTA_E})")
+    parser.add_argument("--jobs", default=1, type=int,
+                        help="Number of worker processes (0 = one per CPU core)")
+    parser.add_argument("--no-fast-decode", action="store_true",
+                        help="Fully decode every source before resizing (slower, uses more memory)")
+    parser.add_argument("--manifest", default=None,
+                        help="Build manifest path (default: next to the output directory)")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-encode every image even if it is already up to date")
     parser.add_argument("--copy-existing", action="store_true", 
                         help="Copy existing images from build/images/animals to source directory")
+    add_report_arguments(parser)
     
     args = parser.parse_args()
     
@@ -126,14 +723,18 @@ def main():
             os.makedirs(src_dir, exist_ok=True)
             
             for img_file in existing_dir.glob("*.*"):
-                if img_file.suffix.lower() in [".png", ".jpg", ".jpeg", ".jfif"]:
+                if img_file.suffix.lower() in SOURCE_EXTENSIONS:
                     dest_file = src_dir / img_file.name
                     if not dest_file.exists():
                         shutil.copy2(img_file, dest_file)
                         print(f"Copied: {img_file.name}")
     
     # Run the optimization
-    batch_optimize(src_dir, output_dir, target_size)
+    batch_optimize(src_dir, output_dir, target_size, jobs=args.jobs,
+                   manifest_path=args.manifest, force=args.force, variant_sizes=args.sizes,
+                   formats=args.formats, quality=quality_from_args(args), size_report=args.size_report,
+                   max_delta_e=args.max_delta_e if args.quantize else None, fast_decode=not args.no_fast_decode,
+                   reporter=reporter_from_args("optimize_animal_images", args))
 
 
 if __name__ == "__main__":
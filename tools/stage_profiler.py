@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Stage Profiler for Kids Learn Image Tools
+
+Lightweight instrumentation for the image pipelines:
+1. Nested stage timers (`with profiler.stage("background"):`), recorded per
+   stack path, e.g. page;background, with call counts and self time
+2. Named counters (`profiler.count("skipped")`)
+3. Optional cProfile and tracemalloc capture around a whole run
+
+The report is written as JSON, plus a collapsed-stack file (one
+"page;text;text_draw <microseconds>" line per stage path, self time only)
+that flame graph tools such as flamegraph.pl or speedscope read directly.
+
+A disabled profiler hands out a shared no-op stage, so instrumented code
+costs next to nothing when profiling is off.
+
+Used by generate_story_illustrations.py (--profile).
+"""
+
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from pathlib import Path
+
+REPORT_VERSION = 1
+# Functions and allocation sites listed in the report
+TOP_ENTRIES = 25
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        path = tuple(profiler.stack)
+        profiler.stack.pop()
+        totals = profiler.totals.get(path)
+        if totals is None:
+            profiler.totals[path] = [elapsed, 1]
+        else:
+            totals[0] += elapsed
+            totals[1] += 1
+        return False
+
+
+class StageProfiler:
+    """
+    Per-stage timers and counters, with optional cProfile/tracemalloc capture
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stack = []
+        # Stage path tuple -> [seconds, calls]
+        self.totals = {}
+        self.counters = {}
+        self.cprofile = None
+        self.cprofile_stats = None
+        self.memory = None
+
+    def stage(self, name):
+        """
+        Context manager timing one stage, nested under the current one
+        """
+        return _Stage(self, name) if self.enabled else _NULL_STAGE
+
+    def count(self, name, amount=1):
+        """
+        Add to a named counter
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def export(self):
+        """
+        Timers and counters as plain data (picklable, for worker processes)
+        """
+        return {
+            "totals": [[list(path), seconds, calls] for path, (seconds, calls) in self.totals.items()],
+            "counters": dict(self.counters),
+        }
+
+    def reset(self):
+        """
+        Drop the recorded timers and counters
+        """
+        self.totals = {}
+        self.counters = {}
+
+    def merge(self, data):
+        """
+        Add timers and counters exported by another profiler
+        """
+        for path, seconds, calls in data["totals"]:
+            totals = self.totals.setdefault(tuple(path), [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+        for name, amount in data["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def start_capture(self, cprofile=False, trace_memory=False):
+        """
+        Start cProfile and/or tracemalloc for the code that follows (this
+        process only)
+        """
+        if cprofile:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop_capture(self):
+        """
+        Stop the captures started by start_capture and keep their results
+        """
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile_stats = pstats.Stats(self.cprofile, stream=io.StringIO())
+            self.cprofile = None
+        if tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ENTRIES]
+            tracemalloc.stop()
+            self.memory = {
+                "peak_mb": round(peak / (1 << 20), 2),
+                "top": [{"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                         "size_kb": round(stat.size / 1024, 1), "count": stat.count} for stat in top],
+            }
+
+    def stage_report(self):
+        """
+        {"page;background": {calls, total_ms, mean_ms, self_ms}, ...}, with
+        self time being the time not spent in nested stages
+        """
+        child_seconds = {}
+        for path, (seconds, _) in self.totals.items():
+            if len(path) > 1:
+                child_seconds[path[:-1]] = child_seconds.get(path[:-1], 0.0) + seconds
+        return {
+            ";".join(path): {
+                "calls": calls,
+                "total_ms": round(seconds * 1000, 3),
+                "mean_ms": round(seconds * 1000 / calls, 3),
+                "self_ms": round(max(seconds - child_seconds.get(path, 0.0), 0.0) * 1000, 3),
+            }
+            for path, (seconds, calls) in sorted(self.totals.items())
+        }
+
+    def collapsed_stacks(self):
+        """
+        Lines of "stage;substage <self time in microseconds>" for flame graphs
+        """
+        return [f"{name} {round(stage['self_ms'] * 1000)}" for name, stage in self.stage_report().items()
+                if stage["self_ms"] > 0]
+
+    def _cprofile_report(self):
+        if self.cprofile_stats is None:
+            return None
+        rows = []
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in self.cprofile_stats.stats.items():
+            rows.append({"function": f"{os.path.basename(filename)}:{line}({function})", "calls": calls,
+                         "self_ms": round(tottime * 1000, 3), "cumulative_ms": round(cumtime * 1000, 3)})
+        return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:TOP_ENTRIES]
+
+    def write_report(self, report_path, extra=None):
+        """
+        Write the JSON report, the collapsed stacks next to it
+        (report.folded), and the raw cProfile data (report.prof) if captured.
+        Returns the paths written.
+        """
+        report_path = Path(report_path)
+        os.makedirs(report_path.parent, exist_ok=True)
+        report = {
+            "version": REPORT_VERSION,
+            **(extra or {}),
+            "stages": self.stage_report(),
+            "counters": dict(sorted(self.counters.items())),
+        }
+        cprofile_rows = self._cprofile_report()
+        if cprofile_rows is not None:
+            report["cprofile"] = cprofile_rows
+        if self.memory is not None:
+            report["memory"] = self.memory
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        paths = [report_path]
+
+        folded_path = report_path.with_suffix(".folded")
+        with open(folded_path, "w", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in self.collapsed_stacks())
+        paths.append(folded_path)
+
+        if self.cprofile_stats is not None:
+            prof_path = report_path.with_suffix(".prof")
+            self.cprofile_stats.dump_stats(prof_path)
+            paths.append(prof_path)
+        return paths
+
+    def print_summary(self, limit=12):
+        """
+        Print the stages with the most self time
+        """
+        stages = sorted(self.stage_report().items(), key=lambda item: item[1]["self_ms"], reverse=True)
+        total = sum(stage["self_ms"] for _, stage in stages)
+        if not total:
+            return
+        print(f"\n{'Stage':<36} {'Calls':>7} {'Self':>11} {'Share':>6}")
+        for name, stage in stages[:limit]:
+            print(f"{name:<36} {stage['calls']:>7} {stage['self_ms']:>8.1f} ms {stage['self_ms'] / total:>6.1%}")
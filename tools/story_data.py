@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Story Data Parser for Kids Learn Tools
+
+Reads the `sampleStories` literal in src/services/story/storyService.ts into
+plain Python data (a list of story dicts, shaped like the Story interface in
+src/types/story.ts). The source is read in one pass by a small tokenizer that
+understands TypeScript strings (single, double and template literals with
+escapes), comments, numbers and bare identifiers, and a recursive parser
+builds the nested objects and arrays, including each page's `choices`.
+
+The parsed model is cached as JSON next to this script, keyed on the file's
+size, mtime and SHA-256 hash, so repeated tool runs skip the parse.
+
+Used by generate_story_illustrations.py, story_image_prompt_helper.py and
+story_image_workflow.py.
+
+Usage:
+python story_data.py [storyService.ts] [--no-cache]
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+STORY_SERVICE_PATH = PROJECT_ROOT / "src" / "services" / "story" / "storyService.ts"
+CACHE_PATH = SCRIPT_DIR / ".story-data-cache.json"
+
+# Bump when the parsed model changes shape, so old caches are ignored
+PARSER_VERSION = 1
+
+PUNCTUATION = "{}[]:,;="
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+KEYWORDS = {"true": True, "false": False, "null": None, "undefined": None}
+NUMBER = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+# "const sampleStories: Story[] =", up to the start of the initializer
+DECLARATION = re.compile(r"\b(?:const|let|var)\s+sampleStories\b[^=;]*=")
+
+
+class StoryParseError(ValueError):
+    """The storyService.ts source isn't in the expected shape"""
+
+
+def tokenize(source, pos=0):
+    """
+    Yield (kind, value, offset) tokens from TypeScript source, starting at pos
+
+    kind is 'punct', 'string', 'number' or 'name'. Whitespace and comments
+    are skipped and string escapes are decoded.
+    """
+    length = len(source)
+    while pos < length:
+        char = source[pos]
+        if char.isspace():
+            pos += 1
+        elif source.startswith("//", pos):
+            end = source.find("\n", pos)
+            pos = length if end == -1 else end + 1
+        elif source.startswith("/*", pos):
+            end = source.find("*/", pos + 2)
+            if end == -1:
+                raise StoryParseError(f"Unterminated comment at offset {pos}")
+            pos = end + 2
+        elif char in PUNCTUATION:
+            yield "punct", char, pos
+            pos += 1
+        elif char in "'\"`":
+            value, end = _read_string(source, pos)
+            yield "string", value, pos
+            pos = end
+        else:
+            match = NUMBER.match(source, pos) or IDENTIFIER.match(source, pos)
+            if match is None:
+                raise StoryParseError(f"Unexpected character {char!r} at offset {pos}")
+            text = match.group()
+            if IDENTIFIER.fullmatch(text):
+                yield "name", text, pos
+            else:
+                yield "number", float(text) if any(c in text for c in ".eE") else int(text), pos
+            pos = match.end()
+
+
+def _read_string(source, pos):
+    """
+    Decode the string literal starting at pos, returning (value, end offset)
+
+    Template literals are kept verbatim, ${...} included.
+    """
+    quote = source[pos]
+    parts = []
+    start = pos = pos + 1
+    while True:
+        end = min((i for i in (source.find(quote, pos), source.find("\\", pos)) if i != -1), default=-1)
+        if end == -1 or (quote != "`" and "\n" in source[pos:end]):
+            raise StoryParseError(f"Unterminated string at offset {start - 1}")
+        parts.append(source[pos:end])
+        if source[end] == quote:
+            return "".join(parts), end + 1
+        escaped = source[end + 1:end + 2]
+        if escaped == "\n":
+            pass  # Line continuation
+        elif escaped == "u" and source[end + 2:end + 3] == "{":
+            close = source.index("}", end)
+            parts.append(chr(int(source[end + 3:close], 16)))
+            end = close - 1
+        elif escaped == "u":
+            parts.append(chr(int(source[end + 2:end + 6], 16)))
+            end += 4
+        elif escaped == "x":
+            parts.append(chr(int(source[end + 2:end + 4], 16)))
+            end += 2
+        else:
+            parts.append(ESCAPES.get(escaped, escaped))
+        pos = end + 2
+
+
+def _parse_value(tokens, token):
+    """
+    Build a value from the token stream, given its first token
+    """
+    kind, value, offset = token
+    if kind in ("string", "number"):
+        return value
+    if kind == "name":
+        if value in KEYWORDS:
+            return KEYWORDS[value]
+        raise StoryParseError(f"Unsupported expression {value!r} at offset {offset}")
+    if value == "[":
+        items = []
+        for token in tokens:
+            # Trailing commas are allowed
+            if token[:2] == ("punct", "]"):
+                return items
+            items.append(_parse_value(tokens, token))
+            token = next(tokens)
+            if token[:2] == ("punct", "]"):
+                return items
+            _expect(token, ",")
+        raise StoryParseError("Unterminated array")
+    if value == "{":
+        obj = {}
+        for token in tokens:
+            if token[:2] == ("punct", "}"):
+                return obj
+            if token[0] not in ("name", "string"):
+                raise StoryParseError(f"Expected a property name at offset {token[2]}")
+            key = token[1]
+            _expect(next(tokens), ":")
+            obj[key] = _parse_value(tokens, next(tokens))
+            token = next(tokens)
+            if token[:2] == ("punct", "}"):
+                return obj
+            _expect(token, ",")
+        raise StoryParseError("Unterminated object")
+    raise StoryParseError(f"Unexpected {value!r} at offset {offset}")
+
+
+def _expect(token, punct):
+    if token[:2] != ("punct", punct):
+        raise StoryParseError(f"Expected {punct!r} at offset {token[2]}, found {token[1]!r}")
+
+
+def parse_stories(source):
+    """
+    Parse the sampleStories array out of storyService.ts source text
+    """
+    match = DECLARATION.search(source)
+    if not match:
+        raise StoryParseError("Could not find the sampleStories array")
+    tokens = tokenize(source, match.end())
+    try:
+        stories = _parse_value(tokens, next(tokens))
+    except StopIteration:
+        raise StoryParseError("Unexpected end of file in sampleStories") from None
+    if not isinstance(stories, list):
+        raise StoryParseError("sampleStories is not an array literal")
+    return stories
+
+
+def file_fingerprint(path):
+    """
+    Cheap (size, mtime) check used before hashing the file
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_stories(ts_path=STORY_SERVICE_PATH, cache_path=CACHE_PATH, use_cache=True):
+    """
+    Return the parsed stories from storyService.ts, using the JSON cache when
+    the file is unchanged
+
+    An unchanged size and mtime reuse the cache directly; otherwise the file
+    is hashed, and it is only re-parsed when the hash differs too.
+    """
+    ts_path = Path(ts_path)
+    size, mtime_ns = file_fingerprint(ts_path)
+    cache = None
+    if use_cache and cache_path:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = None
+        if not isinstance(cache, dict) or cache.get("version") != PARSER_VERSION \
+                or cache.get("source") != str(ts_path.resolve()):
+            cache = None
+        elif cache.get("bytes") == size and cache.get("mtime_ns") == mtime_ns:
+            return cache["stories"]
+
+    with open(ts_path, "rb") as f:
+        data = f.read()
+    source_hash = hashlib.sha256(data).hexdigest()
+    if cache is not None and cache.get("source_hash") == source_hash:
+        stories = cache["stories"]
+    else:
+        stories = parse_stories(data.decode("utf-8"))
+
+    if use_cache and cache_path:
+        _save_cache(cache_path, {
+            "version": PARSER_VERSION,
+            "source": str(ts_path.resolve()),
+            "bytes": size,
+            "mtime_ns": mtime_ns,
+            "source_hash": source_hash,
+            "stories": stories,
+        })
+    return stories
+
+
+def _save_cache(cache_path, cache):
+    """
+    Write the cache atomically; a read-only checkout just skips caching
+    """
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write story cache {cache_path}: {e}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse the stories in storyService.ts and print them as JSON")
+    parser.add_argument("source", nargs="?", default=STORY_SERVICE_PATH, help="Path to storyService.ts")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse the TypeScript file")
+    args = parser.parse_args()
+
+    stories = load_stories(args.source, use_cache=not args.no_cache)
+    json.dump(stories, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,35 @@ Story Image Prompt Generator
 This script generates detailed image generation prompts for each story and its scenes
 based on the stories defined in the storyService.ts file.
 
+Prompts come from two templates (cover and page). The style text for each
+(category, age) pair is filled into them once, and every output is written
+in a single streaming pass over the stories, so a catalogue of thousands of
+stories is rendered in linear time and without holding the output in memory.
+
 Usage:
 python story_image_prompt_helper.py
+python story_image_prompt_helper.py --json prompts.json --per-file prompts
+python story_image_prompt_helper.py --events prompt-events.jsonl
 
 Output:
 - Creates a story_image_prompts.md file with detailed prompts for each story
 - Creates a story_images_required.md file with a list of required image files
+- Optionally, a JSON file with every prompt, and a directory with one .txt
+  file per prompt (<story id>/cover.txt, <story id>/page_<n>.txt)
 """
 
 import os
 import re
 import json
-from pathlib import Path
+import time
+import argparse
+import functools
+from collections import namedtuple
+from contextlib import ExitStack
+
+from batch_report import add_report_arguments, reporter_from_args
+from bulk_writer import BulkWriter
+from story_data import StoryParseError, load_stories
 
 # Define image style constants
 STYLE_CUTE = "cute, children's book illustration style, bright colors, simple shapes, friendly"
@@ -42,123 +59,96 @@ AGE_STYLE_ELEMENTS = {
 
 def extract_story_data(typescript_file):
     """Extract story data from the TypeScript file"""
-    with open(typescript_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Find the sampleStories array
-    match = re.search(r'const\s+sampleStories\s*:\s*Story\[\]\s*=\s*\[(.*?)\];', content, re.DOTALL)
-    if not match:
-        print("Could not find sampleStories array in the file!")
+    try:
+        parsed = load_stories(typescript_file)
+    except StoryParseError as e:
+        print(f"Could not parse the sampleStories array: {e}")
         return []
     
-    stories_content = match.group(1)
-    
-    # Extract individual story objects
-    story_objects = []
-    bracket_count = 0
-    start_index = None
-    
-    for i, char in enumerate(stories_content):
-        if char == '{' and bracket_count == 0:
-            start_index = i
-            bracket_count += 1
-        elif char == '{':
-            bracket_count += 1
-        elif char == '}':
-            bracket_count -= 1
-            if bracket_count == 0 and start_index is not None:
-                story_objects.append(stories_content[start_index:i+1])
-                start_index = None
-    
-    # Parse each story object
     stories = []
-    for story_obj in story_objects:
-        story = {}
-        
-        # Extract story ID
-        id_match = re.search(r"id:\s*'([^']*)'", story_obj)
-        if id_match:
-            story['id'] = id_match.group(1)
-        else:
-            continue  # Skip if no ID found
-        
-        # Extract story title
-        title_match = re.search(r"title:\s*'([^']*)'", story_obj)
-        if title_match:
-            story['title'] = title_match.group(1)
-        else:
-            continue  # Skip if no title found
+    for parsed_story in parsed:
+        # Skip stories without an ID or title
+        if not parsed_story.get('id') or not parsed_story.get('title'):
+            continue
+        story = {'id': parsed_story['id'], 'title': parsed_story['title']}
         
-        # Extract recommended age
-        age_match = re.search(r"recommendedAge:\s*(\d+)", story_obj)
-        if age_match:
-            story['recommendedAge'] = int(age_match.group(1))
+        for key in ('recommendedAge', 'category'):
+            if key in parsed_story:
+                story[key] = parsed_story[key]
         
-        # Extract category
-        category_match = re.search(r"category:\s*'([^']*)'", story_obj)
-        if category_match:
-            story['category'] = category_match.group(1)
-        
-        # Extract description
-        desc_match = re.search(r"description:\s*'(.*?)',", story_obj, re.DOTALL)
-        if desc_match:
-            # Clean up any newlines and extra whitespace
-            desc = desc_match.group(1).replace('\n', ' ').strip()
+        if 'description' in parsed_story:
             # Remove extra whitespace
-            desc = re.sub(r'\s+', ' ', desc)
-            story['description'] = desc
-        
-        # Extract pages
-        pages = []
-        # Look for text entries
-        text_matches = re.finditer(r"text:\s*'(.*?)'(?=,|\s*})", story_obj, re.DOTALL)
-        image_matches = re.finditer(r"image:\s*'([^']*)'", story_obj)
+            story['description'] = re.sub(r'\s+', ' ', parsed_story['description']).strip()
         
-        # Convert to lists for easier access
-        texts = [m.group(1).replace('\n', ' ').strip() for m in text_matches]
-        images = [m.group(1) for m in image_matches]
-        
-        for i, text in enumerate(texts):
-            if i < len(images):
-                pages.append({
-                    'text': text,
-                    'image_path': images[i]
-                })
-        
-        story['pages'] = pages
+        # Only pages with an image need a prompt
+        story['pages'] = [
+            {'text': re.sub(r'\s+', ' ', page['text']).strip(), 'image_path': page['image']}
+            for page in parsed_story.get('pages', []) if 'image' in page
+        ]
         stories.append(story)
     
     return stories
 
+# Prompt templates; {style} is filled in once per (category, age)
+COVER_TEMPLATE = (
+    "Create a cover illustration for '{title}'. "
+    "The image should capture the essence of this story: {description} "
+    "Style: {style}. "
+    "The illustration should be appealing to young children and include the main character(s). "
+    "Include space at the top for the title text. Composition should be centered and balanced."
+)
+PAGE_TEMPLATE = (
+    "Create an illustration for page {page_number} of '{title}'. "
+    "This scene depicts: {text} "
+    "Style: {style}. "
+    "The illustration should clearly communicate the story text to young children. "
+    "Include ample space for text placement either at the top or bottom. "
+    "The characters should have friendly, appealing expressions appropriate for children."
+)
+
+# Cover and page templates with the style text already filled in
+CompiledTemplates = namedtuple('CompiledTemplates', ['cover', 'page'])
+
+@functools.lru_cache(maxsize=None)
+def compile_templates(category, age):
+    """Fill the style for a (category, age) pair into the prompt templates"""
+    style = f"{CATEGORY_STYLES.get(category, STYLE_CARTOON)}, {AGE_STYLE_ELEMENTS.get(age, '')}"
+    # Braces in the style text must not be taken for fields
+    style = style.replace('{', '{{').replace('}', '}}')
+    return CompiledTemplates(COVER_TEMPLATE.replace('{style}', style), PAGE_TEMPLATE.replace('{style}', style))
+
 def generate_cover_prompt(story):
     """Generate a prompt for a story cover image"""
-    base_style = CATEGORY_STYLES.get(story['category'], STYLE_CARTOON)
-    age_style = AGE_STYLE_ELEMENTS.get(story['recommendedAge'], "")
-    
-    prompt = f"Create a cover illustration for '{story['title']}'. "
-    prompt += f"The image should capture the essence of this story: {story['description']} "
-    prompt += f"Style: {base_style}, {age_style}. "
-    prompt += "The illustration should be appealing to young children and include the main character(s). "
-    prompt += "Include space at the top for the title text. Composition should be centered and balanced."
-    
-    return prompt
+    templates = compile_templates(story['category'], story['recommendedAge'])
+    return templates.cover.format(title=story['title'], description=story['description'])
 
 def generate_page_prompt(story, page, page_number):
     """Generate a prompt for a story page illustration"""
-    base_style = CATEGORY_STYLES.get(story['category'], STYLE_CARTOON)
-    age_style = AGE_STYLE_ELEMENTS.get(story['recommendedAge'], "")
-    
-    prompt = f"Create an illustration for page {page_number} of '{story['title']}'. "
-    prompt += f"This scene depicts: {page['text']} "
-    prompt += f"Style: {base_style}, {age_style}. "
-    prompt += "The illustration should clearly communicate the story text to young children. "
-    prompt += "Include ample space for text placement either at the top or bottom. "
-    prompt += "The characters should have friendly, appealing expressions appropriate for children."
-    
-    return prompt
+    templates = compile_templates(story['category'], story['recommendedAge'])
+    return templates.page.format(page_number=page_number, title=story['title'], text=page['text'])
 
-def generate_all_prompts(stories, output_dir):
-    """Generate all prompts and write to output files"""
+def render_story_prompts(story):
+    """
+    Render every prompt of a story: returns the cover as (image path, prompt)
+    and the pages as (page number, page, image path, prompt) tuples
+    """
+    templates = compile_templates(story['category'], story['recommendedAge'])
+    cover = (f"/images/stories/{story['id']}-cover.png",
+             templates.cover.format(title=story['title'], description=story['description']))
+    pages = [
+        (i, page, f"/images/stories/{story['id']}-{i}.png",
+         templates.page.format(page_number=i, title=story['title'], text=page['text']))
+        for i, page in enumerate(story['pages'], 1)
+    ]
+    return cover, pages
+
+def generate_all_prompts(stories, output_dir, json_path=None, per_file_dir=None, reporter=None):
+    """
+    Generate all prompts and write them to every output in one pass over
+    the stories: the prompts and required images markdown files, and
+    optionally a JSON file and a directory of per-prompt .txt files.
+    Each story is recorded with reporter (a BatchReporter) if given.
+    """
     prompts_file = os.path.join(output_dir, 'story_image_prompts.md')
     required_file = os.path.join(output_dir, 'story_images_required.md')
     
@@ -166,14 +156,28 @@ def generate_all_prompts(stories, output_dir):
     print(f"Writing prompts to: {os.path.abspath(prompts_file)}")
     print(f"Writing required images list to: {os.path.abspath(required_file)}")
     
+    # Per-prompt files only change when a prompt does, so they are written
+    # through a BulkWriter, which skips unchanged files
+    writer = BulkWriter(per_file_dir) if per_file_dir else None
+    
     try:
-        with open(prompts_file, 'w', encoding='utf-8') as f_prompts:
-            # Write header
+        with ExitStack() as stack:
+            f_prompts = stack.enter_context(open(prompts_file, 'w', encoding='utf-8'))
+            f_required = stack.enter_context(open(required_file, 'w', encoding='utf-8'))
+            f_json = stack.enter_context(open(json_path, 'w', encoding='utf-8')) if json_path else None
+            
+            # Write headers
             f_prompts.write("# Story Image Generation Prompts\n\n")
             f_prompts.write("Use these prompts with your preferred image generation tool.\n\n")
+            f_required.write("# Required Story Images\n\n")
+            f_required.write("This file lists all the image files that need to be created.\n\n")
+            if f_json:
+                f_json.write("[")
             
-            # Process each story for prompts
-            for story in stories:
+            for index, story in enumerate(stories):
+                start = time.perf_counter()
+                (cover_image_path, cover_prompt), pages = render_story_prompts(story)
+                
                 # Write story section
                 f_prompts.write(f"## {story['title']} (ID: {story['id']})\n\n")
                 
@@ -184,9 +188,6 @@ def generate_all_prompts(stories, output_dir):
                     f_prompts.write(f"Description: {story['description']}\n\n")
                 
                 # Cover image
-                cover_prompt = generate_cover_prompt(story)
-                cover_image_path = f"/images/stories/{story['id']}-cover.png"
-                
                 f_prompts.write("### Cover Image\n\n")
                 f_prompts.write(f"**File:** `{cover_image_path}`\n\n")
                 f_prompts.write(f"**Prompt:**\n\n{cover_prompt}\n\n")
@@ -194,54 +195,61 @@ def generate_all_prompts(stories, output_dir):
                 # Page images
                 f_prompts.write("### Page Images\n\n")
                 
-                for i, page in enumerate(story['pages'], 1):
-                    page_prompt = generate_page_prompt(story, page, i)
-                    page_image_path = f"/images/stories/{story['id']}-{i}.png"
-                    
+                for i, page, page_image_path, page_prompt in pages:
                     f_prompts.write(f"#### Page {i}\n\n")
                     f_prompts.write(f"**Text:** \"{page['text']}\"\n\n")
                     f_prompts.write(f"**File:** `{page_image_path}`\n\n")
                     f_prompts.write(f"**Prompt:**\n\n{page_prompt}\n\n")
                 
                 f_prompts.write("\n---\n\n")
-            
-            # Ensure content is flushed to disk
-            f_prompts.flush()
-            print(f"Successfully wrote prompts to {os.path.abspath(prompts_file)}")
-    
-    except Exception as e:
-        print(f"Error writing prompts file: {e}")
-    
-    try:
-        with open(required_file, 'w', encoding='utf-8') as f_required:
-            # Write header
-            f_required.write("# Required Story Images\n\n")
-            f_required.write("This file lists all the image files that need to be created.\n\n")
-            
-            # Process each story for required images
-            for story in stories:
-                # Add story to required images
-                f_required.write(f"## {story['title']} (ID: {story['id']})\n\n")
                 
-                # Cover image requirement
-                cover_image_path = f"/images/stories/{story['id']}-cover.png"
+                # Required images for the story
+                f_required.write(f"## {story['title']} (ID: {story['id']})\n\n")
                 f_required.write(f"- [ ] {cover_image_path}\n")
-                
-                # Page image requirements
-                for i in range(1, len(story['pages'])+1):
-                    page_image_path = f"/images/stories/{story['id']}-{i}.png"
+                for _, _, page_image_path, _ in pages:
                     f_required.write(f"- [ ] {page_image_path}\n")
-                
                 f_required.write("\n")
+                
+                if f_json:
+                    # One story at a time, so the whole catalogue is never held as one string
+                    entry = {key: story[key] for key in ('id', 'title', 'recommendedAge', 'category', 'description')
+                             if key in story}
+                    entry['cover'] = {'file': cover_image_path, 'prompt': cover_prompt}
+                    entry['pages'] = [{'page': i, 'text': page['text'], 'file': page_image_path, 'prompt': page_prompt}
+                                      for i, page, page_image_path, page_prompt in pages]
+                    f_json.write(("," if index else "") + "\n  " + json.dumps(entry, ensure_ascii=False))
+                
+                if writer:
+                    writer.add(f"{story['id']}/cover.txt", cover_prompt)
+                    for i, _, _, page_prompt in pages:
+                        writer.add(f"{story['id']}/page_{i}.txt", page_prompt)
+                
+                if reporter is not None:
+                    reporter.file(story['id'], "prompts", time.perf_counter() - start,
+                                  bytes_out=len(cover_prompt) + sum(len(page[3]) for page in pages))
             
-            # Ensure content is flushed to disk
-            f_required.flush()
-            print(f"Successfully wrote required images list to {os.path.abspath(required_file)}")
+            if f_json:
+                f_json.write("\n]\n")
+        
+        print(f"Successfully wrote prompts to {os.path.abspath(prompts_file)}")
+        print(f"Successfully wrote required images list to {os.path.abspath(required_file)}")
+        if json_path:
+            print(f"Successfully wrote prompts JSON to {os.path.abspath(json_path)}")
+        if writer:
+            written, unchanged = writer.commit()
+            print(f"Wrote {written} prompt files to {os.path.abspath(per_file_dir)} ({unchanged} unchanged)")
     
     except Exception as e:
-        print(f"Error writing required images file: {e}")
+        print(f"Error writing prompt files: {e}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate image prompts for every story")
+    parser.add_argument('--json', default=None, help="Also write every prompt to this JSON file")
+    parser.add_argument('--per-file', default=None,
+                        help="Also write one .txt file per prompt under this directory")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    
     # Get the workspace root directory
     script_dir = os.path.dirname(os.path.abspath(__file__))
     root_dir = os.path.dirname(script_dir)
@@ -254,9 +262,10 @@ def main():
     print(f"Extracted data for {len(stories)} stories")
     
     # Generate prompts
-    generate_all_prompts(stories, script_dir)
+    with reporter_from_args('story_image_prompt_helper', args, total=len(stories)) as reporter:
+        generate_all_prompts(stories, script_dir, args.json, args.per_file, reporter)
     print(f"Generated prompts written to: {os.path.join(script_dir, 'story_image_prompts.md')}")
     print(f"Required images list written to: {os.path.join(script_dir, 'story_images_required.md')}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -7,17 +7,28 @@ This script helps organize the workflow for creating story images by:
 2. Creating a directory structure for organizing generated images
 3. Preparing template files for tracking progress
 
+All files are built in memory and written in one pass at the end (see
+bulk_writer.py). With --workflow-dir an existing workflow directory is
+updated in place: only prompts whose text changed are rewritten, and boxes
+already ticked in a story's prompts.md are kept.
+
 Usage:
 python story_image_workflow.py
+python story_image_workflow.py --workflow-dir story_images_workflow_20250101_120000
+python story_image_workflow.py --archive prompts.zip
+python story_image_workflow.py --events workflow-events.jsonl
 """
 
 import os
 import sys
-import shutil
 import re
+import argparse
 from pathlib import Path
 from datetime import datetime
 
+from batch_report import add_report_arguments, reporter_from_args
+from bulk_writer import BulkWriter
+
 # Add parent directory to path so we can import the prompt helper
 script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(script_dir)
@@ -54,90 +65,29 @@ except ImportError:
     # Define our own version of the prompt helper functions
     def extract_story_data(typescript_file):
         """Extract story data from the TypeScript file"""
-        with open(typescript_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Find the sampleStories array
-        match = re.search(r'const\s+sampleStories\s*:\s*Story\[\]\s*=\s*\[(.*?)\];', content, re.DOTALL)
-        if not match:
-            print("Could not find sampleStories array in the file!")
+        from story_data import StoryParseError, load_stories
+        try:
+            parsed = load_stories(typescript_file)
+        except StoryParseError as e:
+            print(f"Could not parse the sampleStories array: {e}")
             return []
         
-        stories_content = match.group(1)
-        
-        # Extract individual story objects
-        story_objects = []
-        bracket_count = 0
-        start_index = None
-        
-        for i, char in enumerate(stories_content):
-            if char == '{' and bracket_count == 0:
-                start_index = i
-                bracket_count += 1
-            elif char == '{':
-                bracket_count += 1
-            elif char == '}':
-                bracket_count -= 1
-                if bracket_count == 0 and start_index is not None:
-                    story_objects.append(stories_content[start_index:i+1])
-                    start_index = None
-        
-        # Parse each story object
         stories = []
-        for story_obj in story_objects:
-            story = {}
-            
-            # Extract story ID
-            id_match = re.search(r"id:\s*'([^']*)'", story_obj)
-            if id_match:
-                story['id'] = id_match.group(1)
-            else:
-                continue  # Skip if no ID found
-            
-            # Extract story title
-            title_match = re.search(r"title:\s*'([^']*)'", story_obj)
-            if title_match:
-                story['title'] = title_match.group(1)
-            else:
-                continue  # Skip if no title found
-            
-            # Extract recommended age
-            age_match = re.search(r"recommendedAge:\s*(\d+)", story_obj)
-            if age_match:
-                story['recommendedAge'] = int(age_match.group(1))
-            
-            # Extract category
-            category_match = re.search(r"category:\s*'([^']*)'", story_obj)
-            if category_match:
-                story['category'] = category_match.group(1)
-            
-            # Extract description
-            desc_match = re.search(r"description:\s*'(.*?)',", story_obj, re.DOTALL)
-            if desc_match:
-                # Clean up any newlines and extra whitespace
-                desc = desc_match.group(1).replace('\n', ' ').strip()
+        for parsed_story in parsed:
+            # Skip stories without an ID or title
+            if not parsed_story.get('id') or not parsed_story.get('title'):
+                continue
+            story = {key: parsed_story[key] for key in ('id', 'title', 'recommendedAge', 'category')
+                     if key in parsed_story}
+            if 'description' in parsed_story:
                 # Remove extra whitespace
-                desc = re.sub(r'\s+', ' ', desc)
-                story['description'] = desc
-            
-            # Extract pages
-            pages = []
-            # Look for text entries
-            text_matches = re.finditer(r"text:\s*'(.*?)'(?=,|\s*})", story_obj, re.DOTALL)
-            image_matches = re.finditer(r"image:\s*'([^']*)'", story_obj)
+                story['description'] = re.sub(r'\s+', ' ', parsed_story['description']).strip()
             
-            # Convert to lists for easier access
-            texts = [m.group(1).replace('\n', ' ').strip() for m in text_matches]
-            images = [m.group(1) for m in image_matches]
-            
-            for i, text in enumerate(texts):
-                if i < len(images):
-                    pages.append({
-                        'text': text,
-                        'image_path': images[i]
-                    })
-            
-            story['pages'] = pages
+            # Only pages with an image need a prompt
+            story['pages'] = [
+                {'text': re.sub(r'\s+', ' ', page['text']).strip(), 'image_path': page['image']}
+                for page in parsed_story.get('pages', []) if 'image' in page
+            ]
             stories.append(story)
             
         return stories
@@ -147,8 +97,10 @@ except ImportError:
         base_style = CATEGORY_STYLES.get(story.get('category', 'fairy-tale'), STYLE_CARTOON)
         age_style = AGE_STYLE_ELEMENTS.get(story.get('recommendedAge', 5), "")
         
+        description = story.get('description', "A children's story")
+        
         prompt = f"Create a cover illustration for '{story['title']}'. "
-        prompt += f"The image should capture the essence of this story: {story.get('description', 'A children\\'s story')} "
+        prompt += f"The image should capture the essence of this story: {description} "
         prompt += f"Style: {base_style}, {age_style}. "
         prompt += "The illustration should be appealing to young children and include the main character(s). "
         prompt += "Include space at the top for the title text. Composition should be centered and balanced."
@@ -172,11 +124,15 @@ except ImportError:
     # Make the prompt_helper namespace contain our functions
     prompt_helper = sys.modules[__name__]
 
-def create_workflow_directories(root_dir):
+# Progress checkboxes in each story's prompts.md
+CHECKBOX_PATTERN = re.compile(r"^- \[([ xX])\] (.+)$")
+
+def create_workflow_directories(root_dir, workflow_dir=None):
     """Create a directory structure for organizing image generation workflow"""
-    # Create workflow directory with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    workflow_dir = os.path.join(root_dir, f"story_images_workflow_{timestamp}")
+    # Create workflow directory with timestamp, unless an existing one is reused
+    if workflow_dir is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        workflow_dir = os.path.join(root_dir, f"story_images_workflow_{timestamp}")
     os.makedirs(workflow_dir, exist_ok=True)
     
     # Create subdirectories for each workflow stage
@@ -198,20 +154,44 @@ def create_workflow_directories(root_dir):
         "final": final_dir
     }
 
-def organize_prompts_by_story(stories, workflow_dirs):
+def keep_progress(old_text, new_text):
+    """Carry ticked checkboxes from an edited prompts.md over to its new text"""
+    ticked = set()
+    section = None
+    for line in old_text.splitlines():
+        if line.startswith("## "):
+            section = line
+        match = CHECKBOX_PATTERN.match(line)
+        if match and match.group(1) != " ":
+            ticked.add((section, match.group(2)))
+    
+    lines = []
+    section = None
+    for line in new_text.split("\n"):
+        if line.startswith("## "):
+            section = line
+        match = CHECKBOX_PATTERN.match(line)
+        if match and (section, match.group(2)) in ticked:
+            line = f"- [x] {match.group(2)}"
+        lines.append(line)
+    return "\n".join(lines)
+
+def organize_prompts_by_story(stories, workflow_dirs, writer=None):
     """Organize prompts by story in the workflow directory"""
-    prompts_dir = workflow_dirs["prompts"]
+    # Without a writer from the caller, write the prompts out right away
+    commit = writer is None
+    if writer is None:
+        writer = BulkWriter(workflow_dirs["root"])
+    prompts_dir = os.path.relpath(workflow_dirs["prompts"], workflow_dirs["root"])
     
     # Generate main prompt index
-    index_path = os.path.join(workflow_dirs["root"], "prompt_index.md")
-    with open(index_path, "w", encoding="utf-8") as index_file:
+    with writer.open("prompt_index.md") as index_file:
         index_file.write("# Story Image Generation Index\n\n")
         index_file.write("This file contains links to prompt files organized by story.\n\n")
         
         for story in stories:
-            # Create directory for each story
+            # Directory for each story
             story_dir = os.path.join(prompts_dir, f"{story['id']}")
-            os.makedirs(story_dir, exist_ok=True)
             
             # Add to index
             index_file.write(f"## [{story['title']}](1_prompts/{story['id']}/prompts.md)\n\n")
@@ -219,9 +199,8 @@ def organize_prompts_by_story(stories, workflow_dirs):
             index_file.write(f"- Category: {story.get('category', 'N/A')}\n")
             index_file.write(f"- Images needed: {len(story['pages']) + 1} (cover + {len(story['pages'])} pages)\n\n")
             
-            # Generate story-specific prompt file
-            story_prompts_path = os.path.join(story_dir, "prompts.md")
-            with open(story_prompts_path, "w", encoding="utf-8") as story_file:
+            # Generate story-specific prompt file, keeping progress ticked by hand
+            with writer.open(os.path.join(story_dir, "prompts.md"), merge=keep_progress) as story_file:
                 story_file.write(f"# {story['title']} Image Prompts\n\n")
                 
                 if 'description' in story:
@@ -239,9 +218,7 @@ def organize_prompts_by_story(stories, workflow_dirs):
                 story_file.write("- [ ] Finalized\n\n")
                 
                 # Create an individual prompt file for the cover
-                cover_prompt_file = os.path.join(story_dir, "cover.txt")
-                with open(cover_prompt_file, "w", encoding="utf-8") as cover_file:
-                    cover_file.write(cover_prompt)
+                writer.add(os.path.join(story_dir, "cover.txt"), cover_prompt)
                 
                 # Page images
                 for i, page in enumerate(story['pages'], 1):
@@ -257,17 +234,19 @@ def organize_prompts_by_story(stories, workflow_dirs):
                     story_file.write("- [ ] Finalized\n\n")
                     
                     # Create an individual prompt file for each page
-                    page_prompt_file = os.path.join(story_dir, f"page_{i}.txt")
-                    with open(page_prompt_file, "w", encoding="utf-8") as page_file:
-                        page_file.write(page_prompt)
+                    writer.add(os.path.join(story_dir, f"page_{i}.txt"), page_prompt)
     
-    return index_path
+    if commit:
+        writer.commit()
+    return str(writer.path("prompt_index.md"))
 
-def create_workflow_readme(workflow_dirs):
+def create_workflow_readme(workflow_dirs, writer=None):
     """Create a README file explaining the workflow"""
-    readme_path = os.path.join(workflow_dirs["root"], "README.md")
+    commit = writer is None
+    if writer is None:
+        writer = BulkWriter(workflow_dirs["root"])
     
-    with open(readme_path, "w", encoding="utf-8") as readme_file:
+    with writer.open("README.md") as readme_file:
         readme_file.write("# Story Image Generation Workflow\n\n")
         readme_file.write("This directory contains all the resources needed to generate images for the kids-learn app stories.\n\n")
         
@@ -297,14 +276,18 @@ def create_workflow_readme(workflow_dirs):
         readme_file.write("4. Save generated images to the appropriate directory\n")
         readme_file.write("5. Track your progress in the story's `prompts.md` file\n")
     
-    return readme_path
+    if commit:
+        writer.commit()
+    return str(writer.path("README.md"))
 
-def create_deployment_script(workflow_dirs, project_dir):
+def create_deployment_script(workflow_dirs, project_dir, writer=None):
     """Create a script to copy final images to the project directory"""
-    # Create PowerShell version
-    ps_script_path = os.path.join(workflow_dirs["root"], "Deploy-Images.ps1")
+    commit = writer is None
+    if writer is None:
+        writer = BulkWriter(workflow_dirs["root"])
     
-    with open(ps_script_path, "w", encoding="utf-8") as ps_file:
+    # Create PowerShell version
+    with writer.open("Deploy-Images.ps1") as ps_file:
         ps_file.write("# Story Images Deployment Script\n")
         ps_file.write("# This script copies finalized images to the project's image directory\n\n")
         
@@ -346,9 +329,7 @@ def create_deployment_script(workflow_dirs, project_dir):
         ps_file.write("Write-Host \"Deployment complete! $fileCount images copied to $targetDir\" -ForegroundColor Green\n")
     
     # Create batch version
-    bat_script_path = os.path.join(workflow_dirs["root"], "deploy_images.bat")
-    
-    with open(bat_script_path, "w", encoding="utf-8") as bat_file:
+    with writer.open("deploy_images.bat") as bat_file:
         bat_file.write("@echo off\n")
         bat_file.write("echo Story Images Deployment Script\n")
         bat_file.write("echo This script copies finalized images to the project's image directory\n\n")
@@ -367,12 +348,25 @@ def create_deployment_script(workflow_dirs, project_dir):
         bat_file.write("echo Images copied to %TARGET_DIR%\n")
         bat_file.write("pause\n")
     
+    if commit:
+        writer.commit()
     return {
-        "powershell": ps_script_path,
-        "batch": bat_script_path
+        "powershell": str(writer.path("Deploy-Images.ps1")),
+        "batch": str(writer.path("deploy_images.bat"))
     }
 
 def main():
+    parser = argparse.ArgumentParser(description="Set up the story image workflow directory and prompts")
+    parser.add_argument("--workflow-dir", default=None,
+                        help="Update this workflow directory instead of creating a new timestamped one")
+    parser.add_argument("--archive", default=None,
+                        help="Also pack all prompts into this .zip or .jsonl file")
+    parser.add_argument("--force", action="store_true", help="Rewrite every file, even unchanged ones")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    if args.archive and Path(args.archive).suffix.lower() not in (".zip", ".jsonl"):
+        parser.error("--archive must end in .zip or .jsonl")
+    
     # Get the workspace root directory
     script_dir = os.path.dirname(os.path.abspath(__file__))
     root_dir = os.path.dirname(script_dir)
@@ -381,24 +375,30 @@ def main():
     story_service_file = os.path.join(root_dir, 'src', 'services', 'story', 'storyService.ts')
     
     print("Creating story image workflow directories...")
-    workflow_dirs = create_workflow_directories(script_dir)
-    print(f"Created workflow directory: {workflow_dirs['root']}")
+    workflow_dirs = create_workflow_directories(script_dir, args.workflow_dir)
+    print(f"Workflow directory: {workflow_dirs['root']}")
     
     # Extract story data
     stories = prompt_helper.extract_story_data(story_service_file)
     print(f"Extracted data for {len(stories)} stories")
     
-    # Organize prompts by story
-    index_path = organize_prompts_by_story(stories, workflow_dirs)
-    print(f"Generated story prompts and index: {index_path}")
-    
-    # Create workflow readme
-    readme_path = create_workflow_readme(workflow_dirs)
-    print(f"Created workflow README: {readme_path}")
+    # Build every file in memory, then write the ones that changed in one pass
+    writer = BulkWriter(workflow_dirs["root"])
+    index_path = organize_prompts_by_story(stories, workflow_dirs, writer)
+    readme_path = create_workflow_readme(workflow_dirs, writer)
+    script_paths = create_deployment_script(workflow_dirs, root_dir, writer)
+    with reporter_from_args("story_image_workflow", args, total=len(writer.files)) as reporter:
+        written, unchanged = writer.commit(force=args.force, reporter=reporter)
+    print(f"Wrote {written} files ({unchanged} unchanged)")
+    print(f"Story prompts and index: {index_path}")
+    print(f"Workflow README: {readme_path}")
+    print(f"Deployment scripts: {script_paths['powershell']} and {script_paths['batch']}")
     
-    # Create deployment script
-    script_paths = create_deployment_script(workflow_dirs, root_dir)
-    print(f"Created deployment scripts: {script_paths['powershell']} and {script_paths['batch']}")
+    if args.archive:
+        if writer.write_archive(args.archive):
+            print(f"Prompt archive written to: {args.archive}")
+        else:
+            print(f"Prompt archive unchanged: {args.archive}")
     
     print("\nWorkflow setup complete!")
     print(f"You can now start generating images using the prompts in: {workflow_dirs['prompts']}")
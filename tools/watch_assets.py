@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Asset Watcher for Kids Learn App
+
+Keeps the generated assets up to date while you edit, instead of rerunning
+every tool by hand. It polls:
+1. src/services/story - on a story edit, only the covers and pages whose
+   title or text changed are re-rendered, and the prompt files are rewritten
+2. src/resources/images/animals - new or edited sources are optimized into
+   public/images/animals (unchanged ones are skipped by the build manifest)
+3. public/images/animals - illustrations that use a changed animal are
+   re-rendered
+4. tools/*.py - the watcher restarts itself, so tool changes take effect
+
+Changes are collected in a debounced queue: a burst of saves (an editor
+writing several files, or a folder of images being copied in) is handled as
+one rebuild once things have been quiet for --debounce seconds. Every
+rebuild finishes with build_asset_manifest.py when any image changed.
+
+Polling compares the size and mtime of each watched file, which costs a few
+stat calls per interval and works the same on every platform and on
+network drives.
+
+Usage:
+python watch_assets.py
+python watch_assets.py --interval 0.5 --debounce 1 --verbose
+
+Requirements:
+- PIL (Pillow) library: pip install Pillow
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import story_image_prompt_helper as prompt_helper
+from build_asset_manifest import ASSET_MANIFEST_PATH, build_asset_manifest
+from generate_story_illustrations import StoryIllustrationGenerator
+from optimize_animal_images import SOURCE_EXTENSIONS, batch_optimize
+from story_data import StoryParseError, load_stories
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+# Seconds between polls, and of quiet before queued changes are rebuilt
+POLL_INTERVAL = 0.25
+DEBOUNCE_SECONDS = 0.3
+
+
+def snapshot(directory, extensions, recursive=True):
+    """
+    {path: (size, mtime_ns)} of the files under directory with one of the
+    extensions; {} if the directory doesn't exist
+    """
+    files = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if recursive and entry.name != "__pycache__":
+                        files.update(snapshot(entry.path, extensions))
+                elif Path(entry.name).suffix.lower() in extensions:
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        pass
+    return files
+
+
+def changed_paths(old, new):
+    """
+    Paths added, removed or modified between two snapshots
+    """
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+class DebouncedQueue:
+    """
+    Changed paths grouped by kind, released once no change has arrived for
+    `debounce` seconds
+    """
+
+    def __init__(self, debounce=DEBOUNCE_SECONDS):
+        self.debounce = debounce
+        self.pending = {}
+        self.last_change = 0.0
+
+    def add(self, kind, paths, now=None):
+        if paths:
+            self.pending.setdefault(kind, set()).update(paths)
+            self.last_change = time.monotonic() if now is None else now
+
+    def ready(self, now=None):
+        now = time.monotonic() if now is None else now
+        return bool(self.pending) and now - self.last_change >= self.debounce
+
+    def drain(self):
+        pending, self.pending = self.pending, {}
+        return pending
+
+
+class AssetWatcher:
+    def __init__(self, root_dir=PROJECT_ROOT, jobs=1, interval=POLL_INTERVAL, debounce=DEBOUNCE_SECONDS,
+                 verbose=False):
+        self.root_dir = Path(root_dir)
+        self.jobs = jobs
+        self.interval = interval
+        self.verbose = verbose
+        self.story_path = self.root_dir / "src" / "services" / "story" / "storyService.ts"
+        self.source_dir = self.root_dir / "src" / "resources" / "images" / "animals"
+        self.public_dir = self.root_dir / "public"
+        self.images_dir = self.public_dir / "images"
+        self.animals_dir = self.images_dir / "animals"
+        # Where story_image_prompt_helper.py writes the prompt files of this tree
+        self.prompt_dir = self.root_dir / "tools"
+        # (kind, directory, extensions, recursive)
+        self.watches = [
+            ("stories", self.story_path.parent, {".ts"}, True),
+            ("sources", self.source_dir, set(SOURCE_EXTENSIONS), False),
+            ("animals", self.animals_dir, {".png"}, False),
+            ("tools", SCRIPT_DIR, {".py"}, False),
+        ]
+        self.snapshots = {kind: snapshot(directory, extensions, recursive)
+                          for kind, directory, extensions, recursive in self.watches}
+        self.queue = DebouncedQueue(debounce)
+        self.generator = None
+        self.stories = None
+        # Illustration name -> render job, to tell which ones a story edit touched
+        self.jobs_by_name = {}
+
+    def _quiet(self):
+        """
+        Swallow the tools' per-file output unless --verbose
+        """
+        return redirect_stdout(sys.stdout if self.verbose else io.StringIO())
+
+    def poll(self):
+        """
+        Queue every change since the last poll
+        """
+        for kind, directory, extensions, recursive in self.watches:
+            current = snapshot(directory, extensions, recursive)
+            self.queue.add(kind, changed_paths(self.snapshots[kind], current))
+            self.snapshots[kind] = current
+
+    def _load_stories(self):
+        """
+        Parsed stories, or None while the file doesn't parse (e.g. mid-edit)
+        """
+        try:
+            stories = load_stories(self.story_path)
+        except (OSError, StoryParseError) as e:
+            print(f"Could not read {self.story_path.name}, waiting for the next save: {e}", file=sys.stderr)
+            return None
+        return [story for story in stories if story.get("id") and story.get("title")]
+
+    def optimize_sources(self):
+        """
+        Optimize new or edited animal sources; returns the public animal
+        images that changed as a result
+        """
+        if not self.source_dir.exists():
+            return set()
+        with self._quiet():
+            batch_optimize(self.source_dir, self.animals_dir, jobs=self.jobs)
+        # Take the optimizer's output now rather than on the next poll, so
+        # the illustrations are updated in this same rebuild
+        kind, directory, extensions, recursive = self.watches[2]
+        current = snapshot(directory, extensions, recursive)
+        changed = changed_paths(self.snapshots[kind], current)
+        self.snapshots[kind] = current
+        return changed
+
+    def update_illustrations(self, names=None, animals_changed=False):
+        """
+        Re-render the named illustrations (all, when names is None, each
+        still skipped if its inputs are unchanged); returns (rendered,
+        skipped) counts
+        """
+        if self.stories is None:
+            return 0, 0
+        if self.generator is None:
+            with self._quiet():
+                self.generator = StoryIllustrationGenerator(str(self.root_dir))
+        elif animals_changed:
+            with self._quiet():
+                self.generator.reload_animals()
+        with self._quiet():
+            rendered, skipped = self.generator.update_illustrations(self.stories, names)
+        return len(rendered), len(skipped)
+
+    def update_prompts(self):
+        """
+        Rewrite the prompt markdown files (one pass over all stories)
+        """
+        stories = prompt_helper.extract_story_data(str(self.story_path))
+        with self._quiet():
+            prompt_helper.generate_all_prompts(stories, str(self.prompt_dir))
+
+    def update_asset_manifest(self):
+        """
+        Re-index the images of this tree into its asset manifest
+        """
+        with self._quiet():
+            build_asset_manifest(self.images_dir, self.images_dir / ASSET_MANIFEST_PATH.name, self.public_dir)
+
+    def refresh_stories(self):
+        """
+        Reload the stories; returns the names of the illustrations whose
+        render job changed, or None if the stories couldn't be read
+        """
+        stories = self._load_stories()
+        if stories is None:
+            return None
+        self.stories = stories
+        jobs = StoryIllustrationGenerator.story_jobs(stories)
+        jobs_by_name = {StoryIllustrationGenerator.job_name(job): job for job in jobs}
+        changed = {name for name, job in jobs_by_name.items() if self.jobs_by_name.get(name) != job}
+        changed |= self.jobs_by_name.keys() - jobs_by_name.keys()
+        self.jobs_by_name = jobs_by_name
+        return changed
+
+    def rebuild(self, changes):
+        """
+        Run the tools for one batch of changes, in dependency order:
+        sources -> animals -> illustrations, stories -> illustrations and
+        prompts, then the asset manifest
+        """
+        start = time.perf_counter()
+        summary = []
+        images_changed = False
+
+        animals = changes.get("animals", set())
+        if "sources" in changes:
+            optimized = self.optimize_sources()
+            animals = animals | optimized
+            summary.append(f"{len(optimized)} animal images optimized")
+            images_changed = images_changed or bool(optimized)
+
+        story_names = set()
+        if "stories" in changes:
+            story_names = self.refresh_stories()
+            if story_names is None:
+                story_names = set()
+            else:
+                self.update_prompts()
+                summary.append("prompts")
+
+        if animals:
+            # Any illustration may have picked a different or edited animal
+            rendered, skipped = self.update_illustrations(animals_changed=True)
+            summary.append(f"{rendered} illustrations rendered ({skipped} up to date) "
+                           f"for {len(animals)} changed animals")
+            images_changed = True
+        elif story_names:
+            rendered, skipped = self.update_illustrations(story_names)
+            summary.append(f"{rendered} illustrations rendered ({skipped} up to date)")
+            images_changed = images_changed or bool(rendered)
+
+        if images_changed:
+            self.update_asset_manifest()
+            summary.append("asset manifest")
+
+        if summary:
+            print(f"[{time.strftime('%H:%M:%S')}] Updated {', '.join(summary)} "
+                  f"in {time.perf_counter() - start:.2f}s")
+
+    def initial_build(self):
+        """
+        Bring everything up to date once at startup; unchanged work is
+        skipped by each tool's own manifest
+        """
+        start = time.perf_counter()
+        self.optimize_sources()
+        self.refresh_stories()
+        self.update_illustrations()
+        self.update_prompts()
+        self.update_asset_manifest()
+        print(f"Initial build finished in {time.perf_counter() - start:.2f}s")
+
+    def run(self):
+        """
+        Poll until interrupted, rebuilding after each debounced batch
+        """
+        self.initial_build()
+        print(f"Watching {', '.join(str(directory) for _, directory, _, _ in self.watches)} (Ctrl+C to stop)")
+        while True:
+            time.sleep(self.interval)
+            self.poll()
+            if not self.queue.ready():
+                continue
+            changes = self.queue.drain()
+            if "tools" in changes:
+                # Reloading modules in place leaves stale references behind;
+                # start over with the new code instead
+                print("Tool code changed, restarting...")
+                sys.stdout.flush()
+                os.execv(sys.executable, [sys.executable, *sys.argv])
+            try:
+                self.rebuild(changes)
+            except Exception as e:
+                # Keep watching; the next save may fix it
+                print(f"Rebuild failed: {type(e).__name__}: {e}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch stories and animal images and rebuild assets on change")
+    parser.add_argument("root_dir", nargs="?", default=PROJECT_ROOT, help="Workspace root directory")
+    parser.add_argument("--interval", default=POLL_INTERVAL, type=float,
+                        help=f"Seconds between polls (default: {POLL_INTERVAL})")
+    parser.add_argument("--debounce", default=DEBOUNCE_SECONDS, type=float,
+                        help=f"Seconds without changes before rebuilding (default: {DEBOUNCE_SECONDS})")
+    parser.add_argument("--jobs", default=1, type=int,
+                        help="Worker processes for optimizing animal images (0 = one per CPU core)")
+    parser.add_argument("--verbose", action="store_true", help="Show every tool's per-file output")
+    args = parser.parse_args()
+
+    watcher = AssetWatcher(args.root_dir, args.jobs, args.interval, args.debounce, args.verbose)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+
+if __name__ == "__main__":
+    main()